@@ -5,14 +5,31 @@ Finite ELement Analysis of Beam structure in 2D (xz), Element formulation based
 
 import os, sys
 import math
+import tempfile
+import hashlib
+import multiprocessing
 import argparse
 import tkinter as tk
 from PIL import Image, ImageDraw, ImageTk
 from configparser import ConfigParser
 import numpy as np
 from scipy import linalg
+from scipy import sparse
 from scipy.sparse import linalg as sclinalg
 
+if __package__ in [None, '']:
+    # run as script from basic directory, shared helpers are imported from repository root
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from basic import report, fileio
+from basic.report import logging_array, logging_matrix, logging_table
+from basic.fileio import config_option, config_output, load_dat, results_init, results_write
+from basic.solvers import (
+    ElementOperator, Factorization, FrontalSolver, PCGSolver, PatternFactorization, SkylineMatrix, assemble_global,
+    bandwidth_profile, element_order, linear_static, preconditioner, renumber_dofs, static_sensitivity)
+from basic.eigen import eigen_buckling, eigen_lanczos, eigen_matrix_free, eigen_subspace, frequency_sensitivity
+from basic.dynamics import (
+    central_difference, critical_time_step, frequency_response, modal_harmonic, modal_transient, newmark, time_function)
+
 import logging
 
 BASIC_FORMAT = logging.Formatter('%(message)s')
@@ -31,7 +48,7 @@ def beam2d_t(x1: np.ndarray, x2: np.ndarray):
     :return:   t  - beam transformation matrix in 2D (6, 6)
     """
     logging.info(f'call beam2d_t()')
-    logging.debug(f'call beam2d_t({x1}, {x2})')
+    logging.debug('call beam2d_t(%s, %s)', x1, x2)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     c = (x2[0] - x1[0]) / length
     s = (x2[1] - x1[1]) / length
@@ -57,7 +74,7 @@ def beam2d_stiffness_lcs(l: float = 0.0, A: float = 1.0, I: float = 1.0, E: floa
     :return:  ke = beam element stiffness matrix in LCS 2D (6, 6)
     """
     logging.info(f'call beam2d_stiffness_lcs()')
-    logging.debug(f'call beam2d_stiffness_lcs({l}, {A}, {I}, {E})')
+    logging.debug('call beam2d_stiffness_lcs(%s, %s, %s, %s)', l, A, I, E)
     l2 = l * l
     l3 = l2 * l
     EA = E * A
@@ -84,7 +101,7 @@ def beam2d_stiffness(x1: np.ndarray, x2: np.ndarray, A: float = 1.0, I: float =
     :return:   ke - beam element stiffness matrix in GCS 2D (6, 6)
     """
     logging.info(f'call beam2d_stiffness()')
-    logging.debug(f'call beam2d_stiffness({x1}, {x2}, {A}, {I}, {E})')
+    logging.debug('call beam2d_stiffness(%s, %s, %s, %s, %s)', x1, x2, A, I, E)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     EA = E * A
     EI = E * I
@@ -113,7 +130,7 @@ def beam2d_stiffness_timoshenko_lcs(l: float = 1.0, A: float = 1.0, I: float = 1
     :return:   ke - shear part of element stiffness matrix in 2D
     """
     logging.info(f'call beam2d_stiffness_timoshenko_lcs()')
-    logging.debug(f'call beam2d_stiffness_timoshenko_lcs({l}, {A}, {E}, {nu}, {k})')
+    logging.debug('call beam2d_stiffness_timoshenko_lcs(%s, %s, %s, %s, %s)', l, A, E, nu, k)
     G = E / (2 * (1 + nu))
     kuu = np.array([[1, -1], [-1, 1]], dtype=float) * E * A / l
     kww = np.array([[1, -1], [-1, 1]], dtype=float) * k * G * A / l
@@ -146,7 +163,7 @@ def beam2d_stiffness_timoshenko(x1: np.ndarray, x2: np.ndarray,
     :return:   ke - beam element stiffness matrix in GCS 2D (6, 6)
     """
     logging.info(f'call beam2d_stiffness_timoshenko()')
-    logging.debug(f'call beam2d_stiffness_timoshenko({x1}, {x2}, {A}, {I}, {E}, {nu})')
+    logging.debug('call beam2d_stiffness_timoshenko(%s, %s, %s, %s, %s, %s)', x1, x2, A, I, E, nu)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     EA = E * A
     EI = E * I
@@ -174,7 +191,7 @@ def beam2d_mass_lumped(L: float = 1.0, A: float = 1.0, ro: float = 1.0, nsm: flo
     :return:    mle - beam element lumped mass matrix in LCS 2D (6, 6)
     """
     logging.info(f'call beam2d_mass_lumped()')
-    logging.debug(f'call beam2d_mass_lumped({L}, {A}, {ro}, {nsm})')
+    logging.debug('call beam2d_mass_lumped(%s, %s, %s, %s)', L, A, ro, nsm)
     # structural mass
     sm = A * L * ro
     # nonstructural mass
@@ -197,7 +214,7 @@ def beam2d_mass_consistent(L: float = 1.0, A: float = 1.0, ro: float = 1.0, nsm:
     :return:    mce - beam element consistent mass matrix in LCS 2D (6, 6)
     """
     logging.info(f'call beam2d_mass_consistent()')
-    logging.debug(f'call beam2d_mass_consistent({L}, {A}, {ro}, {nsm})')
+    logging.debug('call beam2d_mass_consistent(%s, %s, %s, %s)', L, A, ro, nsm)
     # structural mass
     sm = A * L * ro
     # nonstructural mass
@@ -227,7 +244,7 @@ def beam2d_mass(x1: np.ndarray, x2: np.ndarray, A: float = 1.0, ro: float = 1.0,
     :return:    me - beam element mass matrix in GCS 2D (6, 6)
     """
     logging.info(f'call beam2d_mass()')
-    logging.debug(f'call beam2d_mass({x1}, {x2}, {A}, {ro}, {nsm})')
+    logging.debug('call beam2d_mass(%s, %s, %s, %s, %s)', x1, x2, A, ro, nsm)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     # get mass in LCS
     ml = (1.0 - mi) * beam2d_mass_consistent(length, A, ro, nsm) + mi * beam2d_mass_lumped(length, A, ro, nsm)
@@ -250,7 +267,7 @@ def beam2d_load(x1: np.ndarray, x2: np.ndarray, fx: float = 0.0, fz: float = 0.0
     :return:   fe - element load vector in GCS 2D (6, 1)
     """
     logging.info(f'call beam2d_load()')
-    logging.debug(f'call beam2d_load({x1}, {x2}, {fx}, {fz})')
+    logging.debug('call beam2d_load(%s, %s, %s, %s)', x1, x2, fx, fz)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     # load vector in LCS
     fl = np.array([fx * length / 2.0,
@@ -281,7 +298,7 @@ def beam2d_temp(x1: np.ndarray, x2: np.ndarray, A: float = 1.0, E: float = 1.0,
     :return:   fe - load vector from uniform thermal load on beam in 2D GCS (6, 1)
     """
     logging.info(f'call beam2d_temp()')
-    logging.debug(f'beam2d_temp({A}, {E}, {a}, {t}, {t0})')
+    logging.debug('beam2d_temp(%s, %s, %s, %s, %s)', A, E, a, t, t0)
     EA = E * A
     # load vector in LCS
     fl = np.array([-EA * a * (t - t0),
@@ -310,7 +327,7 @@ def beam2d_initialstress(x1: np.ndarray, x2: np.ndarray, N: float = 0.0):
     :return:   ks - matrix of element initial stresses in GCS (6, 6)
     """
     logging.info(f'call beam2d_initialstress()')
-    logging.debug(f'call beam2d_initialstress({x1}, {x2}, {N})')
+    logging.debug('call beam2d_initialstress(%s, %s, %s)', x1, x2, N)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     l = length
     l2 = l * l
@@ -335,41 +352,502 @@ def beam2d_initialstress(x1: np.ndarray, x2: np.ndarray, N: float = 0.0):
     return ks
 
 
-def assemble(lm: np.ndarray, K: np.ndarray, ke: np.ndarray, eID: int):
+def beam2d_length_batch(x1: np.ndarray, x2: np.ndarray):
     """
-    Function for localisation of element matrix into global matrix
-    :param lm:  Array of code numbers
-    :param K:   Global matrix
-    :param ke:  Element matrix
-    :param eID: Element ID (1 based)
-    :return:    K - Global stiffness matrix
+    Function computes lengths of beam elements in 2D for all elements at once
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :return:   length - element lengths (nelem, )
     """
-    logging.info(f'call assemble() element {eID}')
-    logging.debug(f'call assemble({lm}, {K}, {ke}, {eID})')
-    ndof = ke.shape[0]
-    for i in range(ndof):
-        ia = lm[eID - 1][i]
-        if ia != 0:
-            for j in range(ndof):
-                ja = lm[eID - 1][j]
-                if ja != 0:
-                    K[ia - 1][ja - 1] += ke[i][j]
+    return np.hypot(x2[:, 0] - x1[:, 0], x2[:, 1] - x1[:, 1])
+
+
+def beam2d_t_batch(x1: np.ndarray, x2: np.ndarray):
+    """
+    Function computes transformation matrices (GCS -> LCS) of beams in 2d for all elements at once
+    (Rl = T * Rg)
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :return:   t  - stack of beam transformation matrices in 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_t_batch()')
+    length = beam2d_length_batch(x1, x2)
+    c = (x2[:, 0] - x1[:, 0]) / length
+    s = (x2[:, 1] - x1[:, 1]) / length
+    o = np.zeros_like(c)
+    i = np.ones_like(c)
+
+    t = np.array([[c, s, o, o, o, o],
+                  [-s, c, o, o, o, o],
+                  [o, o, i, o, o, o],
+                  [o, o, o, c, s, o],
+                  [o, o, o, -s, c, o],
+                  [o, o, o, o, o, i]],
+                 dtype=float)
+
+    return np.moveaxis(t, -1, 0)
+
+
+def beam2d_gcs_batch(t: np.ndarray, kl: np.ndarray):
+    """
+    Function transforms stack of element matrices from LCS to GCS (ke = T^T * kl * T)
+    :param t:  Stack of transformation matrices (nelem, 6, 6)
+    :param kl: Stack of element matrices in LCS (nelem, 6, 6)
+    :return:   ke - stack of element matrices in GCS (nelem, 6, 6)
+    """
+    return np.einsum('nji,njk,nkl->nil', t, kl, t, optimize=True)
+
+
+def beam2d_stiffness_lcs_batch(l: np.ndarray, A: np.ndarray, I: np.ndarray, E: np.ndarray):
+    """
+    Function to compute stiffness matrices of beam elements in LCS for all elements at once (Kirchhoff, 2D)
+    :param l: Element lengths (nelem, )
+    :param A: Section Areas (nelem, )
+    :param I: Moments of Inertia (nelem, )
+    :param E: Youngs Moduli (nelem, )
+    :return:  ke = stack of beam element stiffness matrices in LCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_stiffness_lcs_batch()')
+    l = np.asarray(l, dtype=float)
+    l2 = l * l
+    l3 = l2 * l
+    EA = np.broadcast_to(E * A, l.shape)
+    EI = np.broadcast_to(E * I, l.shape)
+    o = np.zeros_like(l)
+    ke = np.array([[EA / l, o, o, -EA / l, o, o],
+                   [o, 12.0 * EI / l3, -6.0 * EI / l2, o, -12.0 * EI / l3, -6.0 * EI / l2],
+                   [o, -6.0 * EI / l2, 4.0 * EI / l, o, 6.0 * EI / l2, 2.0 * EI / l],
+                   [-EA / l, o, o, EA / l, o, o],
+                   [o, -12.0 * EI / l3, 6.0 * EI / l2, o, 12.0 * EI / l3, 6.0 * EI / l2],
+                   [o, -6.0 * EI / l2, 2.0 * EI / l, o, 6.0 * EI / l2, 4.0 * EI / l]],
+                  dtype=float)
+
+    return np.moveaxis(ke, -1, 0)
+
+
+def beam2d_stiffness_batch(x1: np.ndarray, x2: np.ndarray, A: np.ndarray, I: np.ndarray, E: np.ndarray):
+    """
+    Function to compute stiffness matrices of beam elements in GCS for all elements at once (Kirchhoff, 2D)
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param A:  Section Areas (nelem, )
+    :param I:  Moments of Inertia (nelem, )
+    :param E:  Youngs Moduli (nelem, )
+    :return:   ke - stack of beam element stiffness matrices in GCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_stiffness_batch()')
+    length = beam2d_length_batch(x1, x2)
+    # local element stiffness
+    kl = beam2d_stiffness_lcs_batch(length, A, I, E)
+    # transformation matrix
+    t = beam2d_t_batch(x1, x2)
+
+    # transformation LCS -> GCS
+    return beam2d_gcs_batch(t, kl)
+
+
+def beam2d_stiffness_timoshenko_lcs_batch(l: np.ndarray, A: np.ndarray, I: np.ndarray, E: np.ndarray,
+                                          nu: np.ndarray, k: float = (5.0 / 6.0)):
+    """
+    Element stiffness matrices of beam elements for all elements at once (Timoshenko, 2D)
+    axial + bending 1 integration point, shear 2 integration points, reduced integration
+    due to shear locking
+    :param l:  Element lengths (nelem, )
+    :param A:  Cross section areas (nelem, )
+    :param I:  Moments of Inertia (nelem, )
+    :param E:  Young's Moduli (nelem, )
+    :param nu: Poisson's ratios (nelem, )
+    :param k:  Timoshenko shear correction coefficient (5/6 = rectangular section, 6/7 = circular section)
+    :return:   ke - stack of element stiffness matrices in LCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_stiffness_timoshenko_lcs_batch()')
+    l = np.asarray(l, dtype=float)
+    G = E / (2 * (1 + nu))
+    EA = np.broadcast_to(E * A, l.shape)[:, None, None]
+    EI = np.broadcast_to(E * I, l.shape)[:, None, None]
+    kGA = np.broadcast_to(k * G * A, l.shape)[:, None, None]
+    l = l[:, None, None]
+    kuu = np.array([[1, -1], [-1, 1]], dtype=float) * EA / l
+    kww = np.array([[1, -1], [-1, 1]], dtype=float) * kGA / l
+    kwf = np.array([[-0.5, -0.5], [0.5, 0.5]], dtype=float) * kGA
+    kff = np.array([[1, -1], [-1, 1]], dtype=float) * EI / l \
+          + np.array([[1 / 4, 1 / 4], [1 / 4, 1 / 4]], dtype=float) * kGA * l    # reduced integration
+
+    ke = np.zeros((l.shape[0], 6, 6), dtype=float)
+    ke[:, [0, 3], [[0], [3]]] += kuu
+    ke[:, [1, 4], [[1], [4]]] += kww
+    ke[:, [1, 4], [[2], [5]]] += kwf.transpose(0, 2, 1)
+    ke[:, [2, 5], [[1], [4]]] += kwf
+    ke[:, [2, 5], [[2], [5]]] += kff
+
+    return ke
+
+
+def beam2d_stiffness_timoshenko_batch(x1: np.ndarray, x2: np.ndarray,
+                                      A: np.ndarray, I: np.ndarray, E: np.ndarray, nu: np.ndarray):
+    """
+    Function to compute stiffness matrices of beam elements in GCS for all elements at once (Timoshenko, 2D)
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param A:  Section Areas (nelem, )
+    :param I:  Moments of Inertia (nelem, )
+    :param E:  Young's Moduli (nelem, )
+    :param nu: Poison's ratios (nelem, )
+    :return:   ke - stack of beam element stiffness matrices in GCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_stiffness_timoshenko_batch()')
+    length = beam2d_length_batch(x1, x2)
+    # local element stiffness
+    kl = beam2d_stiffness_timoshenko_lcs_batch(length, A, I, E, nu, 5.0 / 6.0)
+    # transformation matrix
+    t = beam2d_t_batch(x1, x2)
+
+    # transformation LCS -> GCS
+    return beam2d_gcs_batch(t, kl)
+
+
+def beam2d_mass_lumped_batch(L: np.ndarray, A: np.ndarray, ro: np.ndarray, nsm: np.ndarray = 0.0):
+    """
+    Function to compute lumped mass matrices of beam elements in LCS for all elements at once (2D)
+    :param L:   Element Lengths (nelem, )
+    :param A:   Section Areas (nelem, )
+    :param ro:  Element Material Densities (nelem, )
+    :param nsm: Nonstructural Masses per unit length (nelem, )
+    :return:    mle - stack of beam element lumped mass matrices in LCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_mass_lumped_batch()')
+    L = np.asarray(L, dtype=float)
+    # structural + nonstructural mass
+    m = A * L * ro + L * nsm
+    # local lumped element mass matrix
+    mle = np.zeros((L.shape[0], 6, 6), dtype=float)
+    mle[:, [0, 1, 3, 4], [0, 1, 3, 4]] = (m / 2)[:, None]
+
+    return mle
+
+
+def beam2d_mass_consistent_batch(L: np.ndarray, A: np.ndarray, ro: np.ndarray, nsm: np.ndarray = 0.0):
+    """
+    Function to compute consistent mass matrices of beam elements in LCS for all elements at once (2D)
+    :param L:   Element Lengths (nelem, )
+    :param A:   Section Areas (nelem, )
+    :param ro:  Element Material Densities (nelem, )
+    :param nsm: Nonstructural Masses per unit length (nelem, )
+    :return:    mce - stack of beam element consistent mass matrices in LCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_mass_consistent_batch()')
+    L = np.asarray(L, dtype=float)
+    # structural + nonstructural mass
+    m = A * L * ro + L * nsm
+    o = np.zeros_like(L)
+    c = np.full_like(L, 1.0)
+    L2 = L ** 2.0
+    mce = np.array([[140.0 * c, o, o, 70.0 * c, o, o],
+                    [o, 156.0 * c, 22.0 * L, o, 54.0 * c, -13.0 * L],
+                    [o, 22.0 * L, 4.0 * L2, o, 13.0 * L, -3.0 * L2],
+                    [70.0 * c, o, o, 140.0 * c, o, o],
+                    [o, 54.0 * c, 13.0 * L, o, 156.0 * c, -22.0 * L],
+                    [o, -13.0 * L, -3.0 * L2, o, -22.0 * L, 4.0 * L2]], dtype=float)
+    mce = np.moveaxis(mce, -1, 0) * (m / 420.0)[:, None, None]
+
+    return mce
+
+
+def beam2d_mass_batch(x1: np.ndarray, x2: np.ndarray, A: np.ndarray, ro: np.ndarray, nsm: np.ndarray = 0.0,
+                      mi: float = 0.5):
+    """
+    Function to compute mass matrices of beam elements in GCS for all elements at once (2D)
+    :param x1:  Coordinates of start of elements (nelem, 2)
+    :param x2:  Coordinates of end of elements (nelem, 2)
+    :param A:   Section Areas (nelem, )
+    :param ro:  Element Material Densities (nelem, )
+    :param nsm: Nonstructural Masses (nelem, )
+    :param mi:  Consistent to Lumped Mass Matrix ratio M = (1 - mi) * Mc + mi * Ml
+    :return:    me - stack of beam element mass matrices in GCS 2D (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_mass_batch()')
+    length = beam2d_length_batch(x1, x2)
+    # get mass in LCS
+    ml = (1.0 - mi) * beam2d_mass_consistent_batch(length, A, ro, nsm) \
+         + mi * beam2d_mass_lumped_batch(length, A, ro, nsm)
+    # transformation matrix
+    t = beam2d_t_batch(x1, x2)
+
+    # transformation LCS -> GCS
+    return beam2d_gcs_batch(t, ml)
+
+
+def beam2d_mass_diagonal_batch(x1: np.ndarray, x2: np.ndarray, A: np.ndarray, ro: np.ndarray,
+                               nsm: np.ndarray = 0.0):
+    """
+    Function to compute diagonal (lumped) mass matrices of beam elements in GCS for all elements at once (2D),
+    translational mass is lumped to nodes, rotational inertia is scaled from diagonal of consistent mass matrix
+    (HRZ lumping, m * L ** 2 / 78) so the diagonal mass matrix is not singular (explicit integration)
+    :param x1:  Coordinates of start of elements (nelem, 2)
+    :param x2:  Coordinates of end of elements (nelem, 2)
+    :param A:   Section Areas (nelem, )
+    :param ro:  Element Material Densities (nelem, )
+    :param nsm: Nonstructural Masses per unit length (nelem, )
+    :return:    md - element mass matrix diagonals in GCS (nelem, 6), invariant to rotation
+    """
+    logging.info(f'call beam2d_mass_diagonal_batch()')
+    L = beam2d_length_batch(x1, x2)
+    # structural + nonstructural mass
+    m = A * L * ro + L * nsm
+    md = np.empty((L.shape[0], 6), dtype=float)
+    md[:, [0, 1, 3, 4]] = (m / 2.0)[:, None]
+    md[:, [2, 5]] = (m * L ** 2.0 / 78.0)[:, None]
+
+    return md
+
+
+def beam2d_stiffness_derivative_batch(x1: np.ndarray, x2: np.ndarray, E: np.ndarray):
+    """
+    Function to compute derivatives of stiffness matrices of beam elements in GCS with respect to section area and
+    moment of inertia for all elements at once (Kirchhoff, 2D), stiffness is linear in A and I, so the derivatives
+    are stiffness matrices of unit section values
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param E:  Youngs Moduli (nelem, )
+    :return:   dke - stack of derivatives [dke/dA, dke/dI] in GCS 2D (2, nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_stiffness_derivative_batch()')
+    length = beam2d_length_batch(x1, x2)
+    t = beam2d_t_batch(x1, x2)
+    o, i = np.zeros_like(length), np.ones_like(length)
+    return np.stack((beam2d_gcs_batch(t, beam2d_stiffness_lcs_batch(length, i, o, E)),
+                     beam2d_gcs_batch(t, beam2d_stiffness_lcs_batch(length, o, i, E))))
+
+
+def beam2d_mass_derivative_batch(x1: np.ndarray, x2: np.ndarray, ro: np.ndarray, mi: float = 0.5):
+    """
+    Function to compute derivatives of mass matrices of beam elements in GCS with respect to section area and
+    moment of inertia for all elements at once (2D), rotary inertia is not included, so dme/dI = 0
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param ro: Element Material Densities (nelem, )
+    :param mi: Consistent to Lumped Mass Matrix ratio M = (1 - mi) * Mc + mi * Ml
+    :return:   dme - stack of derivatives [dme/dA, dme/dI] in GCS 2D (2, nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_mass_derivative_batch()')
+    dmA = beam2d_mass_batch(x1, x2, np.ones(x1.shape[0]), ro, 0.0, mi)
+    return np.stack((dmA, np.zeros_like(dmA)))
+
+
+def beam2d_load_batch(x1: np.ndarray, x2: np.ndarray, fx: np.ndarray, fz: np.ndarray):
+    """
+    Function computes element load vectors from distributed elemental loads for all elements at once (2D)
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param fx: Element axial distributed loads (positive = x1 -> x2) (nelem, )
+    :param fz: Element transversal distributed loads (positive = if x1 -> x2 = left to right (nelem, )
+    :return:   fe - element load vectors in GCS 2D (nelem, 6)
+    """
+    logging.info(f'call beam2d_load_batch()')
+    length = beam2d_length_batch(x1, x2)
+    fx = np.broadcast_to(fx, length.shape)
+    fz = np.broadcast_to(fz, length.shape)
+    # load vector in LCS
+    fl = np.array([fx * length / 2.0,
+                   -fz * length / 2.0,
+                   1 / 12 * fz * length * length,
+                   fx * length,
+                   - fz * length / 2.0,
+                   - 1 / 12 * fz * length * length],
+                  dtype=float).T
+    # transformation matrix
+    t = beam2d_t_batch(x1, x2)
+    # load vector in GCS
+    return np.einsum('nji,nj->ni', t, fl)
+
+
+def beam2d_temp_batch(x1: np.ndarray, x2: np.ndarray, A: np.ndarray, E: np.ndarray, a: np.ndarray,
+                      t: np.ndarray, t0: np.ndarray = 0.0):
+    """
+    Function computes the load vectors from uniform thermal load on beams for all elements at once (2D)
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param A:  Section Areas (nelem, )
+    :param E:  Youngs Moduli (nelem, )
+    :param a:  Longitudinal Thermal expansion coefficients (nelem, )
+    :param t:  Uniform thermal loads on beam elements (nelem, )
+    :param t0: Base Temperatures (nelem, )
+    :return:   fe - load vectors from uniform thermal load on beams in 2D GCS (nelem, 6)
+    """
+    logging.info(f'call beam2d_temp_batch()')
+    N = np.broadcast_to(E * A * a * (t - t0), (x1.shape[0], ))
+    o = np.zeros_like(N)
+    # load vector in LCS
+    fl = np.array([-N, o, o, N, o, o], dtype=float).T
+    # transformation matrix
+    tr = beam2d_t_batch(x1, x2)
+    # load vector in GCS
+    return np.einsum('nji,nj->ni', tr, fl)
+
+
+def beam2d_initialstress_batch(x1: np.ndarray, x2: np.ndarray, N: np.ndarray):
+    """
+    Function computes the matrices of beam initial stresses for use in stability for all elements at once
+    (Kirchhoff, 2D)
+    :param x1: Coordinates of start of elements (nelem, 2)
+    :param x2: Coordinates of end of elements (nelem, 2)
+    :param N:  Axial forces in elements (nelem, )
+    :return:   ks - stack of matrices of element initial stresses in GCS (nelem, 6, 6)
+    """
+    logging.info(f'call beam2d_initialstress_batch()')
+    l = beam2d_length_batch(x1, x2)
+    l2 = l * l
+    o = np.zeros_like(l)
+    c = np.ones_like(l)
+    # initial stress matrix in LCS
+    kl = np.array([[o, o, o, o, o, o],
+                   [o, 6.0 / 5.0 * c, -l / 10.0, o, -6.0 / 5.0 * c, -l / 10.0],
+                   [o, -l / 10.0, 2.0 * l2 / 15.0, o, l / 10.0, -l2 / 30.0],
+                   [o, o, o, o, o, o],
+                   [o, -6.0 / 5.0 * c, l / 10.0, o, 6.0 / 5.0 * c, l / 10.0],
+                   [o, -l / 10.0, -l2 / 30.0, o, l / 10.0, 2.0 * l2 / 15.0]],
+                  dtype=float)
+    kl = np.moveaxis(kl, -1, 0) * (N / l)[:, None, None]
+    kl[:, 0, 0] = np.minimum(np.abs(kl[:, 1, 1]), np.abs(kl[:, 2, 2])) / 1000.0
+    kl[:, 0, 3] = -kl[:, 0, 0]
+    kl[:, 3, 0] = kl[:, 0, 3]
+    kl[:, 3, 3] = kl[:, 0, 0]
+    # transformation matrix
+    t = beam2d_t_batch(x1, x2)
+
+    # initial stress matrix in GCS
+    return beam2d_gcs_batch(t, kl)
+
+
+def beam2d_corotational_batch(x1: np.ndarray, x2: np.ndarray, ue: np.ndarray, A: np.ndarray, I: np.ndarray,
+                              E: np.ndarray):
+    """
+    Function computes internal forces and tangent stiffness matrices of co-rotational beam elements for all elements
+    at once (Kirchhoff, 2D, large displacements and rotations, small strains). Rigid body motion is removed by the
+    chord of the deformed element (beam2d_t_batch of current coordinates), local deformations (elongation and end
+    rotations relative to the chord) are resisted by the linear stiffness in LCS (beam2d_stiffness_lcs_batch).
+    :param x1: Initial coordinates of start of elements (nelem, 2)
+    :param x2: Initial coordinates of end of elements (nelem, 2)
+    :param ue: Element displacements in GCS [dX1, dZ1, dFi1, dX2, dZ2, dFi2] (nelem, 6)
+    :param A:  Section Areas (nelem, )
+    :param I:  Moments of Inertia (nelem, )
+    :param E:  Youngs Moduli (nelem, )
+    :return:   fe - internal force vectors in GCS (nelem, 6)
+               ke - tangent stiffness matrices in GCS (nelem, 6, 6)
+               q  - local forces [N, M1, M2] (nelem, 3)
+    """
+    logging.info(f'call beam2d_corotational_batch()')
+    length0 = beam2d_length_batch(x1, x2)
+    x1n, x2n = x1 + ue[:, 0:2], x2 + ue[:, 3:5]
+    length = beam2d_length_batch(x1n, x2n)
+    # chord direction e = (c, s) and normal n = (-s, c) of deformed element
+    t0 = beam2d_t_batch(x1, x2)
+    t = beam2d_t_batch(x1n, x2n)
+    # rigid rotation of chord, rotations are positive from z to x (Fi = -dw/dx)
+    rigid = -np.arctan2(np.einsum('ni,ni->n', t0[:, 1, :2], t[:, 0, :2]),
+                        np.einsum('ni,ni->n', t0[:, 0, :2], t[:, 0, :2]))
+    # local deformations [elongation, rotation 1, rotation 2] and natural stiffness from the linear beam in LCS
+    p = np.column_stack((length - length0, ue[:, 2] - rigid, ue[:, 5] - rigid))
+    idx = [3, 2, 5]
+    D = beam2d_stiffness_lcs_batch(length0, A, I, E)[:, idx][:, :, idx]
+    q = np.einsum('nij,nj->ni', D, p)
+
+    # variations of elongation r and chord rotation z / length
+    o = np.zeros_like(length)
+    r = np.column_stack((-t[:, 0, 0], -t[:, 0, 1], o, t[:, 0, 0], t[:, 0, 1], o))
+    z = np.column_stack((-t[:, 1, 0], -t[:, 1, 1], o, t[:, 1, 0], t[:, 1, 1], o))
+    B = np.stack((r, z / length[:, None], z / length[:, None]), axis=1)
+    B[:, 1, 2] += 1.0
+    B[:, 2, 5] += 1.0
+
+    fe = np.einsum('nji,nj->ni', B, q)
+    ke = np.einsum('nji,njk,nkl->nil', B, D, B, optimize=True) \
+         + (q[:, 0] / length)[:, None, None] * np.einsum('ni,nj->nij', z, z) \
+         - ((q[:, 1] + q[:, 2]) / length ** 2)[:, None, None] * (np.einsum('ni,nj->nij', r, z)
+                                                                  + np.einsum('ni,nj->nij', z, r))
+    return fe, ke, q
+
+
     # K[lm[eID - 1] - 1, :][:, lm[eID - 1] - 1] += ke
 
 
-def assemble_load_nodal(f: np.ndarray, lmn: np.ndarray, fn: np.ndarray):
+def load_patterns(fn: np.ndarray, fe: np.ndarray):
+    """
+    Function to collect load pattern IDs from nodal and elemental loads
+    :param fn: Array of nodal loads [lpatID, ndID, Fx, Fz, My]
+    :param fe: Array of elemental loads [lpatID, eID, fx, fz, dt]
+    :return:   lpat - sorted array of unique load pattern IDs (at least one pattern)
+    """
+    lpat = [l[:, 0].astype(int) for l in (fn, fe) if l is not None]
+    lpat = np.unique(np.hstack(lpat)) if len(lpat) > 0 else np.array([], dtype=int)
+    if lpat.shape[0] == 0:
+        lpat = np.array([1], dtype=int)
+    return lpat
+
+
+def assemble_loads(ndofs: int, lmn: np.ndarray, lme: np.ndarray, fn: np.ndarray, fe: np.ndarray,
+                   x1: np.ndarray, x2: np.ndarray, A: np.ndarray, E: np.ndarray, alpha: np.ndarray):
+    """
+    Function to assemble load vectors of all load patterns (nodal, elemental and thermal loads)
+    :param ndofs: Number of DOFs
+    :param lmn:   Node DOF numbers
+    :param lme:   Element DOF numbers
+    :param fn:    Nodal loads [lpatID, ndID, Fx, Fz, My] or None
+    :param fe:    Elemental loads [lpatID, eID, fx, fz, dt] or None
+    :param x1:    Coordinates of start of elements (nelem, 2)
+    :param x2:    Coordinates of end of elements (nelem, 2)
+    :param A:     Section Areas (nelem, )
+    :param E:     Youngs Moduli (nelem, )
+    :param alpha: Thermal expansion coefficients (nelem, )
+    :return:      lpat - load pattern IDs (nlpat, ), f - load vectors (ndofs, nlpat)
+    """
+    logging.info(f'call assemble_loads()')
+    lpat = load_patterns(fn, fe)
+    f = np.zeros((ndofs, lpat.shape[0]))
+    if fn is not None:
+        assemble_load_nodal(f, lmn, fn, lpat)
+    if fe is not None:
+        eID = fe[:, 1].astype(int)
+        col = np.searchsorted(lpat, fe[:, 0].astype(int))
+        assemble_load_elemental_batch(lme, f, beam2d_load_batch(x1[eID - 1], x2[eID - 1], fe[:, 2], fe[:, 3]),
+                                      eID, col)
+        assemble_load_elemental_batch(lme, f, beam2d_temp_batch(x1[eID - 1], x2[eID - 1], A[eID - 1], E[eID - 1],
+                                                                alpha[eID - 1], fe[:, 4]), eID, col)
+    return lpat, f
+
+
+def internal_forces(lme: np.ndarray, ke: np.ndarray, u: np.ndarray, ndofs: int):
+    """
+    Function to compute global vector of internal forces K * u element by element (no global matrix)
+    :param lme:   Elemental localisation matrix
+    :param ke:    Stack of element matrices (nelem, ndof, ndof)
+    :param u:     Global displacements (ndofs, ) or (ndofs, nrhs)
+    :param ndofs: Number of DOFs total
+    :return:      f - internal forces of the same shape as u
+    """
+    logging.info(f'call internal_forces()')
+    # code number 0 = DOF not assembled, maps to zero row
+    u0 = np.concatenate((np.zeros((1, ) + u.shape[1:]), u))
+    fe = np.einsum('nij,nj...->ni...', ke, u0[lme])
+    f = np.zeros((ndofs + 1, ) + u.shape[1:])
+    np.add.at(f, lme, fe)
+    return f[1:]
+
+
+def assemble_load_nodal(f: np.ndarray, lmn: np.ndarray, fn: np.ndarray, lpat: np.ndarray = None):
     """
     Function to assemble nodal loads into global right side vector
-    :param f:    Global load vector
+    :param f:    Global load vector, one column per load pattern (ndofs, nlpat)
     :param lmn:  Node DOF localisation matrix
     :param fn:   Array of nodal loads [lpatID, ndID, Fx, Fz, My]
+    :param lpat: Array of load pattern IDs (column order of f), if None all loads go to the first column
     :return:     f - right side vector of nodal loads
     """
     for fi in fn:
-        lpat = int(fi[0])
+        col = 0 if lpat is None else int(np.searchsorted(lpat, int(fi[0])))
         ndID = int(fi[1])
         for i in range(lmn[ndID - 1].shape[0]):
-            f[lmn[ndID - 1][i] - 1] = fi[i + 2]
+            f[lmn[ndID - 1][i] - 1, col] = fi[i + 2]
 
 
 def assemble_load_elemental(lme: np.ndarray, f: np.ndarray, fe: np.ndarray, eID: int):
@@ -382,7 +860,7 @@ def assemble_load_elemental(lme: np.ndarray, f: np.ndarray, fe: np.ndarray, eID:
     :return: None
     """
     logging.info(f'call assemble_load() element {eID}')
-    logging.debug(f'call assemble_load({lme}, {f}, {fe}, {eID})')
+    logging.debug('call assemble_load(%s, %s, %s, %s)', lme, f, fe, eID)
     ndof = fe.shape[0]
     for i in range(ndof):
         ia = lme[eID - 1][i]
@@ -390,6 +868,25 @@ def assemble_load_elemental(lme: np.ndarray, f: np.ndarray, fe: np.ndarray, eID:
             f[ia - 1] += fe[i]
 
 
+def assemble_load_elemental_batch(lme: np.ndarray, f: np.ndarray, fe: np.ndarray, eID: np.ndarray,
+                                  col: np.ndarray = None):
+    """
+    Function to assemble element load vectors of several elements into global load vector in GCS at once
+    :param lme: Array of code numbers
+    :param f:   Global load vector, one column per load pattern (edited by function)
+    :param fe:  Element load vectors (nload, ndof)
+    :param eID: Element IDs (1 based) (nload, )
+    :param col: Column of f (load pattern index) for each load (nload, ), if None first column is used
+    :return: None
+    """
+    logging.info(f'call assemble_load_elemental_batch()')
+    lm = lme[np.asarray(eID, dtype=int) - 1]
+    col = np.zeros(lm.shape[0], dtype=int) if col is None else np.asarray(col, dtype=int)
+    col = np.repeat(col[:, None], lm.shape[1], axis=1)
+    mask = lm != 0
+    np.add.at(f, (lm[mask] - 1, col[mask]), fe[mask])
+
+
 def beam2d_postpro(x1: np.ndarray, x2: np.ndarray, u: np.ndarray, A: float = 1.0, I: float = 1.0, E: float = 1.0):
     """
     Function to get element inner forces in LCS (2D)
@@ -402,7 +899,7 @@ def beam2d_postpro(x1: np.ndarray, x2: np.ndarray, u: np.ndarray, A: float = 1.0
     :return:   s - vector of beam inner forces in LCS (2D)
     """
     logging.info(f'call beam2d_postpro()')
-    logging.debug(f'call beam2d_postpro({x1}, {x2}, {u}, {A}, {I}, {E})')
+    logging.debug('call beam2d_postpro(%s, %s, %s, %s, %s, %s)', x1, x2, u, A, I, E)
     length = math.sqrt((x2[0] - x1[0]) ** 2 + (x2[1] - x1[1]) ** 2)
     EA = E * A
     EI = E * I
@@ -417,12 +914,38 @@ def beam2d_postpro(x1: np.ndarray, x2: np.ndarray, u: np.ndarray, A: float = 1.0
     return s
 
 
-def localisation_matrix(nd: np.ndarray, el: np.ndarray, cs: np.ndarray):
+def beam2d_postpro_batch(x1: np.ndarray, x2: np.ndarray, u: np.ndarray, A: np.ndarray, I: np.ndarray,
+                         E: np.ndarray):
+    """
+    Function to get element inner forces in LCS for all elements at once (2D)
+    :param x1: coordinates of start of elements (nelem, 2)
+    :param x2: coordinates of end of elements (nelem, 2)
+    :param u:  beam end displacements in GCS (nelem, 6) or (nelem, 6, nlpat)
+    :param A:  Section Areas (nelem, )
+    :param I:  Moments of Inertia (nelem, )
+    :param E:  Youngs Moduli (nelem, )
+    :return:   s - beam inner forces in LCS (nelem, 6) or (nelem, 6, nlpat)
+    """
+    logging.info(f'call beam2d_postpro_batch()')
+    length = beam2d_length_batch(x1, x2)
+    # local element stiffness matrix
+    kl = beam2d_stiffness_lcs_batch(length, A, I, E)
+    # transformation matrix
+    t = beam2d_t_batch(x1, x2)
+
+    return np.einsum('nij,njk,nk...->ni...', kl, t, u, optimize=True)
+
+
+def localisation_matrix(nd: np.ndarray, el: np.ndarray, cs: np.ndarray, renumber: str = None,
+                        se: np.ndarray = None):
     """
     Function to create nodal and elemental localisation matrix
-    :param nd: Array of nodes
-    :param el: Array of elements
-    :param cs: Array of constraints
+    :param nd:       Array of nodes
+    :param el:       Array of elements
+    :param cs:       Array of constraints
+    :param renumber: Free DOF renumbering method (None/'none', 'rcm', 'mindegree'), see renumber_dofs()
+    :param se:       Array of superelement instance boundary nodes [instID, seID, bnd, nID], their nodes
+                     get DOFs even if not connected to any element
     :return:   ndofs  - number of DOFs total
                ncdofs - number of DOFs constrained
                lmn    - node to DOF localisation matrix
@@ -430,7 +953,7 @@ def localisation_matrix(nd: np.ndarray, el: np.ndarray, cs: np.ndarray):
                lmd    - DOF to node localisation matrix
     """
     logging.info(f'call localisation_matrix()')
-    logging.debug(f'call localisation_matrix({nd}, {el}, {cs})')
+    logging.debug('call localisation_matrix(%s, %s, %s)', nd, el, cs)
     ndofs = 0
     lmn = np.zeros((nd.shape[0], 3), dtype=int)
     lme = np.zeros((el.shape[0], 6), dtype=int)
@@ -463,143 +986,411 @@ def localisation_matrix(nd: np.ndarray, el: np.ndarray, cs: np.ndarray):
                 else:
                     lme[i][j * 3 + k] = lmn[el[i][j + 2] - 1][k]
 
+    # then process superelement boundary nodes
+    if se is not None:
+        for nID in np.unique(se[:, 3]):
+            for k in range(3):
+                if lmn[nID - 1][k] == 0:
+                    ndofs += 1
+                    lmn[nID - 1][k] = ndofs
+                    lmd.append([nID, k + 1])
+
     lmd = np.array(lmd, dtype=int)
 
+    if renumber is not None and renumber != 'none':
+        lmn, lme, lmd = renumber_dofs(lmn, lme, lmd, ncdofs, renumber)
+
     return ndofs, ncdofs, lmn, lme, lmd
 
 
-def format_norm(value, format_spec):
-    return format_spec.format(value)
+def superelement_hash(path: str, mi: float = 0.5, modes: int = 0):
+    """
+    Function to compute hash of superelement inputs, the condensed matrices are valid as long as it is not changed
+    :param path:  Superelement directory (nd.dat, el.dat, mt.dat, pt.dat, cs.dat, bn.dat)
+    :param mi:    Consistent to Lumped Mass Matrix ratio
+    :param modes: Number of fixed interface modes (Craig-Bampton)
+    :return:      key - sha256 hex digest
+    """
+    h = hashlib.sha256()
+    for name in ['nd.dat', 'el.dat', 'mt.dat', 'pt.dat', 'cs.dat', 'bn.dat']:
+        file = os.path.join(path, name)
+        h.update(name.encode())
+        if os.path.exists(file):
+            with open(file, 'rb') as f:
+                h.update(f.read())
+    h.update(f'mi={mi}, modes={modes}'.encode())
+    return h.hexdigest()
+
+
+def superelement_condense(path: str, mi: float = 0.5, cache: bool = True, modes: int = 0):
+    """
+    Function to condense superelement to its boundary nodes (Guyan static condensation), interior DOFs are
+    eliminated by u_i = -Kii^-1 * Kib * u_b, the same transformation reduces the mass matrix.
+    With modes > 0 the constraint modes are enriched by fixed interface modes of the interior (Craig-Bampton),
+    u_i = Psi * u_b + Phi * q, the modal coordinates q are kept as additional DOFs of the superelement.
+    Reduced matrices are cached in superelement.npz (superelement_cb<modes>.npz) in the superelement directory,
+    keyed by hash of inputs.
+    :param path:  Superelement directory, model files as structure (nd.dat, el.dat, mt.dat, pt.dat, optional
+                  cs.dat for supports inside) and bn.dat with boundary node IDs in order of boundary index
+    :param mi:    Consistent to Lumped Mass Matrix ratio
+    :param cache: Use and write cached reduced matrices
+    :param modes: Number of fixed interface modes (Craig-Bampton), 0 = Guyan
+    :return:      dictionary K - reduced stiffness (3 * nb + modes, 3 * nb + modes), M - reduced mass,
+                  xb - boundary node coordinates (nb, 2), nd - node coordinates (nnode, 2),
+                  X - nodal displacements of reduced DOFs in superelement coordinates (nnode * 3, 3 * nb + modes)
+    """
+    logging.info(f'call superelement_condense({path}, {modes})')
+    key = superelement_hash(path, mi, modes)
+    file = os.path.join(path, 'superelement.npz' if modes == 0 else f'superelement_cb{modes:n}.npz')
+    if cache and os.path.exists(file):
+        data = np.load(file)
+        if str(data['key']) == key:
+            logging.info(f'superelement {path} read from cache')
+            return {k: data[k] for k in ['K', 'M', 'xb', 'nd', 'X']}
+
+    nd = load_dat(os.path.join(path, 'nd.dat'), dtype=float)
+    el = load_dat(os.path.join(path, 'el.dat'), dtype=int)
+    mt = load_dat(os.path.join(path, 'mt.dat'), dtype=float)
+    pt = load_dat(os.path.join(path, 'pt.dat'), dtype=float)
+    cs = load_dat(os.path.join(path, 'cs.dat'), dtype=int) if os.path.exists(os.path.join(path, 'cs.dat')) else None
+    bn = load_dat(os.path.join(path, 'bn.dat'), dtype=int)[:, 0]
+
+    # boundary DOFs are numbered first together with supports, interior DOFs are condensed
+    cb = np.column_stack((bn, np.ones((bn.shape[0], 3), dtype=int)))
+    if cs is not None:
+        cb = np.vstack((cb, cs[~np.isin(cs[:, 0], bn)]))
+    ndofs, ncdofs, lmn, lme, lmd = localisation_matrix(nd, el, cb)
+    b = lmn[bn - 1].ravel() - 1
+    i = np.arange(ncdofs, ndofs)
+
+    x1, x2 = nd[el[:, 2] - 1], nd[el[:, 3] - 1]
+    A, I = pt[el[:, 1] - 1, 0], pt[el[:, 1] - 1, 1]
+    ro, E = mt[el[:, 0] - 1, 0], mt[el[:, 0] - 1, 1]
+    K = assemble_global(lme, beam2d_stiffness_batch(x1, x2, A, I, E), ndofs)
+    M = assemble_global(lme, beam2d_mass_batch(x1, x2, A, ro, mi=mi), ndofs)
+
+    # transformation of boundary to interior displacements (constraint modes)
+    Kib = K[i][:, b].toarray()
+    Mib = M[i][:, b].toarray()
+    Kii, Mii = K[i][:, i], M[i][:, i]
+    factor = Factorization(Kii)
+    T = -factor.solve(Kib)
+    Kr = K[b][:, b].toarray() + Kib.T @ T
+    Mr = M[b][:, b].toarray() + T.T @ Mib + Mib.T @ T + T.T @ (Mii @ T)
+    if modes > 0:
+        # fixed interface modes, mass normalised, uncoupled from boundary in stiffness
+        modes = min(modes, i.shape[0])
+        if modes < i.shape[0] - 1:
+            eigenvalue, phi = eigen_lanczos(Kii, Mii, modes)
+        else:
+            eigenvalue, phi = linalg.eigh(Kii.toarray(), Mii.toarray())
+            eigenvalue, phi = eigenvalue[:modes], phi[:, :modes]
+        phi /= np.sqrt(np.einsum('ij,ij->j', phi, Mii @ phi))
+        Mbq = (Mib.T + T.T @ Mii) @ phi
+        Kr = np.block([[Kr, np.zeros((b.shape[0], modes))], [np.zeros((modes, b.shape[0])), np.diag(eigenvalue)]])
+        Mr = np.block([[Mr, Mbq], [Mbq.T, np.eye(modes)]])
+        T = np.hstack((T, phi))
+    Kr, Mr = (Kr + Kr.T) / 2.0, (Mr + Mr.T) / 2.0
+    xb = nd[bn - 1]
+
+    # nodal displacements of reduced DOFs for expansion, supports stay zero
+    X = np.zeros((ndofs + 1, b.shape[0] + modes))
+    X[b + 1, np.arange(b.shape[0])] = 1.0
+    X[i + 1] = T
+    X = X[lmn.ravel()]
+    logging_table(f'Superelement {path}', [['nodes', nd.shape[0]], ['elements', el.shape[0]],
+                                          ['boundary nodes', bn.shape[0]], ['dofs condensed', i.shape[0]],
+                                          ['modes', modes]])
+    if cache:
+        # replaced atomically, instances of the same superelement may be condensed in parallel
+        try:
+            with tempfile.NamedTemporaryFile(dir=path, suffix='.npz', delete=False) as f:
+                np.savez(f, key=key, K=Kr, M=Mr, xb=xb, nd=nd, X=X)
+            os.replace(f.name, file)
+        except OSError as e:
+            logging.warning(f'Superelement cache {file} not written: {e}')
+    return {'K': Kr, 'M': Mr, 'xb': xb, 'nd': nd, 'X': X}
+
+
+def superelement_transformation(xb: np.ndarray, x: np.ndarray):
+    """
+    Function to find rigid placement (rotation in xz plane and translation) of superelement instance
+    :param xb: Boundary node coordinates of superelement (nb, 2)
+    :param x:  Coordinates of instance nodes in the structure (nb, 2)
+    :return:   R - transformation of boundary DOFs to GCS (3 * nb, 3 * nb), rotation DOFs are invariant
+    """
+    angle = 0.0
+    j = np.argmax(np.linalg.norm(xb - xb[0], axis=1))
+    if j > 0:
+        a, b = xb[j] - xb[0], x[j] - x[0]
+        angle = math.atan2(b[1], b[0]) - math.atan2(a[1], a[0])
+    c, s = math.cos(angle), math.sin(angle)
+    r = np.array([[c, -s], [s, c]])
+    scale = max(np.max(np.abs(xb)), 1.0)
+    if not np.allclose((xb - xb[0]) @ r.T + x[0], x, rtol=0.0, atol=1.0E-06 * scale):
+        raise ValueError(f'Superelement instance nodes {x.tolist()} are not rigid placement of boundary nodes')
+    return np.kron(np.eye(xb.shape[0]), np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]]))
+
+
+def superelement_instances(se: np.ndarray, nd: np.ndarray, lmn: np.ndarray, lmd: np.ndarray, definitions: dict,
+                           ndofs: int):
+    """
+    Function to create superelement instances as blocks for assembly, instances of one superelement are
+    stacked like elements (one localisation row and one matrix per instance). Modal DOFs of Craig-Bampton
+    superelements are numbered after all structure DOFs, separately for each instance.
+    :param se:          Superelement instance boundary nodes [instID, seID, bnd, nID]
+    :param nd:          Array of nodes
+    :param lmn:         Node DOF numbers
+    :param lmd:         DOF to node localisation matrix
+    :param definitions: Condensed superelements {seID: superelement_condense()}
+    :param ndofs:       Number of DOFs total
+    :return:            instances - list of dictionaries, seID, instID - instance IDs (ninst, ),
+                        lm - localisation matrix (ninst, 3 * nb + modes), R - transformations to GCS,
+                        K, M - stacks of instance matrices in GCS (ninst, 3 * nb + modes, 3 * nb + modes),
+                        ndofs - number of DOFs total including modal DOFs,
+                        lmd - DOF to node localisation matrix extended by modal DOFs [-instID, mode]
+    """
+    logging.info(f'call superelement_instances()')
+    instances = []
+    modal = []
+    for seID in np.unique(se[:, 1]):
+        d = definitions[seID]
+        nb = d['xb'].shape[0]
+        n = d['K'].shape[0]
+        rows = se[se[:, 1] == seID]
+        inst = np.unique(rows[:, 0])
+        lm = np.zeros((inst.shape[0], n), dtype=int)
+        R = np.tile(np.eye(n), (inst.shape[0], 1, 1))
+        for k, instID in enumerate(inst):
+            r = rows[rows[:, 0] == instID]
+            nodes = np.zeros(nb, dtype=int)
+            nodes[r[:, 2] - 1] = r[:, 3]
+            if np.any(nodes == 0):
+                raise ValueError(f'Superelement instance {instID} does not connect all {nb} boundary nodes')
+            lm[k, :3 * nb] = lmn[nodes - 1].ravel()
+            lm[k, 3 * nb:] = ndofs + np.arange(1, n - 3 * nb + 1)
+            modal.append(np.column_stack((np.full(n - 3 * nb, -instID), np.arange(1, n - 3 * nb + 1))))
+            ndofs += n - 3 * nb
+            R[k, :3 * nb, :3 * nb] = superelement_transformation(d['xb'], nd[nodes - 1])
+        instances.append({'seID': seID, 'instID': inst, 'lm': lm, 'R': R,
+                          'K': np.einsum('nij,jk,nlk->nil', R, d['K'], R, optimize=True),
+                          'M': np.einsum('nij,jk,nlk->nil', R, d['M'], R, optimize=True)})
+    lmd = np.vstack([lmd] + modal).astype(int)
+    return instances, ndofs, lmd
+
+
+def superelement_expand(instance: dict, definition: dict, u: np.ndarray):
+    """
+    Function to expand displacements (mode shapes) of superelement instances to all superelement nodes
+    :param instance:   Superelement instances of one superelement from superelement_instances()
+    :param definition: Condensed superelement from superelement_condense()
+    :param u:          Global displacements (ndofs, ) or (ndofs, nmodes)
+    :return:           ui - nodal displacements in GCS (ninst, nnode, 3, ...)
+    """
+    logging.info(f'call superelement_expand()')
+    u0 = np.concatenate((np.zeros((1, ) + u.shape[1:]), u))
+    # reduced DOFs in superelement coordinates, rotation of boundary DOFs back
+    ur = np.einsum('nji,nj...->ni...', instance['R'], u0[instance['lm']])
+    ui = np.einsum('ij,nj...->ni...', definition['X'], ur)
+    ui = ui.reshape((ui.shape[0], -1, 3) + u.shape[1:])
+    # nodal rotation to GCS, rotation DOFs are invariant
+    r = instance['R'][:, :3, :3]
+    return np.einsum('nij,nkj...->nki...', r, ui)
+
+
+def assemble_superelements(instances: list, ndofs: int, matrix: str = 'K', assembly: str = 'sparse'):
+    """
+    Function to assemble superelement instances into global matrix
+    :param instances: Superelement instances from superelement_instances()
+    :param ndofs:     Number of DOFs total
+    :param matrix:    'K' or 'M'
+    :param assembly:  Global matrix storage 'sparse' (CSR) or 'dense' (debugging only)
+    :return:          K - Global matrix of superelements (ndofs, ndofs)
+    """
+    K = assemble_global(np.zeros((0, 6), dtype=int), np.zeros((0, 6, 6)), ndofs, assembly)
+    for instance in instances:
+        K = K + assemble_global(instance['lm'], instance[matrix], ndofs, assembly)
+    return K
 
 
-def format_eng(value, format_spec: str = ' {0:9.3f}E{1:+03n}'):
-    try:
-        if value == 0.0:
-            return format_spec.format(0.0, 0)
-        exponent = int(math.log10(abs(value)))
-        exponent = exponent - exponent % 3
-        mantissa = value / (10 ** exponent)
-        return format_spec.format(mantissa, exponent)
-    except OverflowError as e:
-        logging.exception(e)
-        return str('{0:' + str(len(format_eng(1.1, format_spec))) + 'n}').format(np.infty)
-    except ValueError as e:
-        logging.exception(e)
-        return str('{0:' + str(len(format_eng(1.1, format_spec))) + 'n}').format(np.nan)
-
-
-def logging_array(title: str, arr: np.ndarray, header_list: list, dtype: list = None, eng: bool = False):
-    """
-    Function to print numpy ndarray to logger, int is printed as %8n, float as %16.5f, row number is printed
-    also, 1 based.
-    :param title:       Data Title to be printed
-    :param arr:         2D Data Array
-    :param header_list: List of Column Names
-    :param dtype:       List of column types for print (str/int/float/eng) eng is  for engineering format 1.0E+03
-    :param eng:         True/False, if True, floats are printed in engineering format %8.3fE%+03d, False %16.5f
-    :return: None
+def line_search(residual, u: np.ndarray, du: np.ndarray, r: np.ndarray, free: slice, tol: float = 0.5,
+                maxiter: int = 5):
     """
-    fmth = []
-    fmtv = []
-    if dtype is None:
-        fmth.append('  {0:^8s}')
-        fmtv.append([format_norm, '  {0:8n}'])
-        for i, val in enumerate(arr[0]):
-            if 'int' in type(val).__name__:
-                fmth.append(' {0:^8s}')
-                fmtv.append([format_norm, ' {0:8n}'])
-            elif 'float' in type(val).__name__:
-                if eng:
-                    fmth.append(' {0:^12s}')
-                    fmtv.append([format_eng, ' {0:8.3f}E{1:+03n}'])
-                else:
-                    fmth.append(' {0:^16s}')
-                    fmtv.append([format_norm, ' {0:16.5f}'])
-            else:
-                fmth.append(' {0:^16s}')
-                fmtv.append([format_norm, ' {0:16s}'])
-    else:
-        for dt in dtype:
-            if dt == 'int':
-                fmth.append(' {0:^8s}')
-                fmtv.append([format_norm, ' {0:8n}'])
-            elif dt == 'float':
-                if eng:
-                    fmth.append(' {0:^12s}')
-                    fmtv.append([format_eng, ' {0:8.3f}E{1:+03n}'])
+    Function to scale Newton correction by energy line search, step s is searched until the energy of the residual
+    along the correction du^T r(u + s du) drops below tol of its initial value (secant iterations)
+    :param residual: Function of displacements returning residual forces and element tangent matrices
+    :param u:        Displacements (ndofs, )
+    :param du:       Correction of free DOFs (nfree, )
+    :param r:        Residual forces at u (ndofs, )
+    :param free:     Free DOFs of global vectors
+    :param tol:      Ratio of residual energy to initial residual energy to accept the step
+    :param maxiter:  Maximal number of line search iterations
+    :return:         s  - step length
+                     r  - residual forces at u + s du
+                     ke - element tangent matrices at u + s du
+    """
+    g0 = du @ r[free]
+    s, ga, sa = 1.0, g0, 0.0
+    step = np.zeros_like(u)
+    for i in range(maxiter + 1):
+        step[free] = s * du
+        r_s, ke = residual(u + step)
+        g = du @ r_s[free]
+        if abs(g) <= tol * abs(g0) or i == maxiter or g == ga:
+            break
+        # secant between the two last points, kept in reasonable bounds
+        s, sa, ga = min(max(s - g * (s - sa) / (g - ga), 0.1), 2.0), s, g
+    logging.debug('line search step %.3f after %d iterations', s, i)
+    return s, r_s, ke
+
+
+def corotational_static(x1: np.ndarray, x2: np.ndarray, A: np.ndarray, I: np.ndarray, E: np.ndarray,
+                        lme: np.ndarray, ndofs: int, ncdofs: int, f: np.ndarray, steps: int = 10,
+                        control: str = 'load', max_load: float = 1.0, tol: float = 1.0E-08, maxiter: int = 25,
+                        search: bool = True, cuts: int = 5):
+    """
+    Function for geometrically nonlinear static analysis of co-rotational beams with proportional loading
+    lambda * f, equilibrium is iterated by Newton-Raphson with optional line search. The load factor is
+    incremented uniformly (control = 'load') or follows cylindrical arc-length constraint (control = 'arc-length',
+    Crisfield), which passes limit points. Failed increments are halved up to cuts times. Tangent is refactored
+    numerically each iteration in the sparsity pattern and ordering of the first factorization.
+    :param x1:       Initial coordinates of start of elements (nelem, 2)
+    :param x2:       Initial coordinates of end of elements (nelem, 2)
+    :param A:        Section Areas (nelem, )
+    :param I:        Moments of Inertia (nelem, )
+    :param E:        Youngs Moduli (nelem, )
+    :param lme:      Elemental localisation matrix
+    :param ndofs:    Number of DOFs total
+    :param ncdofs:   Number of DOFs constrained
+    :param f:        Reference load vector (ndofs, )
+    :param steps:    Number of uniform load increments (load) or maximal number of increments (arc-length)
+    :param control:  'load' or 'arc-length'
+    :param max_load: Final load factor, arc-length stops when exceeded
+    :param tol:      Tolerance of residual norm relative to norm of external forces
+    :param maxiter:  Maximal number of equilibrium iterations per increment
+    :param search:   Energy line search of Newton corrections (load control only, the arc-length constraint
+                     sets the length of the combined correction itself)
+    :param cuts:     Maximal number of successive increment halvings
+    :return:         load_factor - load factors of converged increments (nconv + 1, )
+                     u           - displacements of converged increments (nconv + 1, ndofs)
+                     iterations  - number of equilibrium iterations of converged increments (nconv + 1, )
+    """
+    logging.info(f'call corotational_static({steps}, {control})')
+    if control not in ['load', 'arc-length']:
+        raise ValueError(f'Unknown load control {control}, use load or arc-length')
+    if control == 'arc-length' and search:
+        logging.info('Line search is not used with arc-length control')
+    free = slice(ncdofs, None)
+    tangent = PatternFactorization(lme, ndofs, ncdofs)
+
+    def factorize(ke):
+        # element matrices already factored (first increment, predictor repeated after cut) are not refactored
+        if factorize.ke is not ke:
+            tangent.update(ke)
+            factorize.ke = ke
+        return tangent
+
+    factorize.ke = None
+
+    def internal(u):
+        fe, ke, q = beam2d_corotational_batch(x1, x2, np.concatenate(([0.0], u))[lme], A, I, E)
+        fi = np.zeros(ndofs + 1)
+        np.add.at(fi, lme, fe)
+        # magnitude of element forces meeting in DOFs, scale of round-off of the residual
+        scale = np.zeros(ndofs + 1)
+        np.add.at(scale, lme, np.abs(fe))
+        internal.scale = np.linalg.norm(scale[1:][free])
+        return fi[1:], ke
+
+    def residual(u):
+        fi, ke = internal(u)
+        return load * f - fi, ke
+
+    u = np.zeros(ndofs)
+    load = 0.0
+    fi, ke = internal(u)
+    load_factor, history, iterations = [load], [u.copy()], [0]
+
+    # initial increment, arc length from linear response to the first load increment
+    increment = uniform = max_load / steps
+    if control == 'arc-length':
+        increment *= np.linalg.norm(factorize(ke).solve(f[free]))
+    direction = None
+    step, cut = 0, 0
+    while (control == 'load' or step < steps) and load < max_load * (1.0 - 1.0E-12):
+        u_n, load_n, fi_n, ke_n = u.copy(), load, fi, ke
+        if control == 'load':
+            load = min(load_n + increment, max_load)
+        else:
+            ut = factorize(ke).solve(f[free])
+            dl = increment / np.linalg.norm(ut)
+            # forward along the previous increment (passes limit points)
+            if direction is not None and ut @ direction < 0.0:
+                dl = -dl
+            load = load_n + dl
+            u[free] += dl * ut
+            fi, ke = internal(u)
+
+        converged = False
+        for i in range(maxiter + 1):
+            r = load * f - fi
+            norm = np.linalg.norm(r[free])
+            if norm <= tol * max(np.linalg.norm(load * f[free]), internal.scale, np.finfo(float).tiny):
+                converged = True
+                break
+            if i == maxiter:
+                break
+            du = factorize(ke).solve(r[free])
+            if control == 'load':
+                if search:
+                    s, r, ke = line_search(residual, u, du, r, free)
+                    u[free] += s * du
+                    fi = load * f - r
                 else:
-                    fmth.append(' {0:^10s}')
-                    fmtv.append([format_norm, ' {0:10.1f}'])
-            elif dt == 'eng':
-                fmth.append(' {0:^12s}')
-                fmtv.append([format_eng, ' {0:8.3f}E{1:+03n}'])
-            elif dt == 'str':
-                fmth.append(' {0:^16s}')
-                fmtv.append([format_norm, ' {0:16s}'])
+                    u[free] += du
+                    fi, ke = internal(u)
             else:
-                if 'E' in dt:
-                    length = len(format_eng(1.1, dt))
-                    fmtv.append([format_eng, dt])
-                else:
-                    length = len(dt.format(1.1))
-                    fmtv.append([format_norm, dt])
-                fmth.append(' {0:^' + str(length) + 's}')
-            fmth[0] = ' ' + fmth[0]
-            fmtv[0][1] = ' ' + fmtv[0][1]
-
-    if type(header_list[0]) == list:
-        header = ''
-        for hl in header_list:
-            header += '\n' + ''.join([fmth[i].format(hl[i]) for i in range(len(hl))])
-            delimit = '\n ' + (len(header) - 1) * '-'
-            header = header.rstrip(' ')
-    else:
-        header = '\n' + ''.join([fmth[i].format(header_list[i]) for i in range(len(header_list))])
-        delimit = '\n ' + (len(header) - 1) * '-'
-        header = header.rstrip(' ')
-
-    message = delimit
-    message += header
-    message += delimit
-    for i in range(arr.shape[0]):
-        message += '\n' + fmtv[0][0](i + 1, fmtv[0][1]) \
-                   + ''.join([fmtv[j + 1][0](arr[i][j], fmtv[j + 1][1]) for j in range(arr.shape[1])])
-    message += delimit
-    logging.info(f' >>> {title}:\n{message}\n')
-
-
-def logging_table(title: str, arr: list, fmt: str = '8n'):
-    """
-    Function to print 2D array of 2 columns to logger
-    :param title: Data Title to be printed
-    :param arr:   2-column array of data to be printed
-    :param fmt:   Python print format specifier (usually in curly brackets) for 2nd column, {0:8n} -> 8n
-    :return:      None
-    """
-    fmtv = '  {0:16s} = {1:' + fmt + '}'
-    message = ['']
-    for i in range(len(arr)):
-        message.append(fmtv.format(arr[i][0], arr[i][1]))
-    delimit = ' ' + len(message[1]) * '-'
-    message[0] = delimit
-    message.append(delimit)
-    message = '\n' + '\n'.join(message)
-    logging.info(f' >>> {title}:\n{message}\n')
-
-
-def load_dat(file: str, dtype: type = float):
-    """
-    Function to load dat file as numpy array
-    :param file:  Filename to read
-    :param dtype: Data type of returned numpy array
-    :return:      Numpy Array of read Data
-    """
-    logging.info(f'read {file}')
-    try:
-        m = np.loadtxt(file, ndmin=2, dtype=dtype, comments=('#'))
-        return m
-    except Exception as e:
-        logging.exception(f'Failed reading {file}')
+                ut = tangent.solve(f[free])
+                # constraint |du_total|^2 = increment^2 on displacement increment from the converged state
+                a = u[free] - u_n[free] + du
+                roots = np.roots([ut @ ut, 2.0 * ut @ a, a @ a - increment ** 2])
+                if np.iscomplexobj(roots) and np.any(np.abs(roots.imag) > 0.0):
+                    break
+                roots = roots.real
+                # root keeping the smallest angle to the previous iterate of the increment
+                dl = roots[np.argmax([(a + root * ut) @ (u[free] - u_n[free]) for root in roots])]
+                u[free] += du + dl * ut
+                load += dl
+                fi, ke = internal(u)
+
+        if not converged:
+            cut += 1
+            if cut > cuts:
+                logging.warning(f'Increment {step + 1:n} not converged after {cuts:n} cuts, '
+                                f'analysis stopped at load factor {load_n:.6f}')
+                u, load = u_n, load_n
+                break
+            logging.info(f' >>> Increment {step + 1:n} not converged, cut to {increment / 2.0:.6e}')
+            u, load, fi, ke = u_n, load_n, fi_n, ke_n
+            increment /= 2.0
+            continue
+
+        step += 1
+        cut = 0
+        direction = u[free] - u_n[free]
+        load_factor.append(load)
+        history.append(u.copy())
+        iterations.append(i)
+        logging.info(f' >>> Increment {step:n} load factor {load:.6f} converged in {i:n} iterations, '
+                     f'residual {norm:.3e}')
+        if control == 'arc-length':
+            # arc length adapted to the number of iterations
+            increment *= min(2.0, np.sqrt(6.0 / max(i, 1)))
+        else:
+            # cut increments are restored gradually
+            increment = min(2.0 * increment, uniform)
+
+    return np.array(load_factor), np.array(history), np.array(iterations)
 
 
 class Geometry(tk.Frame):
@@ -790,33 +1581,73 @@ def plot_deformed(nd: np.ndarray, el: np.ndarray, ue: np.ndarray):
 
 
 def beam2d(structure_directory: str = 'console'):
-    logging.debug(f'call beam2d({structure_directory})')
+    """
+    Function to run analysis of structure directory set up by g.ini, report file (g.ini option report) is set
+    for this run only, report.REPORT_FILE is restored afterwards
+    :param structure_directory: Directory with g.ini and .dat files
+    :return:                    Results of the solver
+    """
+    previous = report.REPORT_FILE
+    try:
+        return _beam2d(structure_directory)
+    finally:
+        report.REPORT_FILE = previous
+
+
+def _beam2d(structure_directory: str):
+    logging.debug('call beam2d(%s)', structure_directory)
     cfg = ConfigParser()
     cfg.read(os.path.join(structure_directory, 'g.ini'))
     solver = cfg['DEFAULT']['solver']
+    # global matrix storage, dense is kept for debugging only
+    assembly = config_option(cfg, solver, 'assembly', 'sparse')
+    # linear equation solver, sparse (SuperLU), skyline (active column LDLt), frontal (out-of-core) or pcg (iterative)
+    backend = config_option(cfg, solver, 'solver_backend', 'sparse')
+    # assembled global matrices or matrix-free element operator (iterative solvers only)
+    operator = config_option(cfg, solver, 'operator', 'assembled')
+    if operator == 'matrix-free':
+        if solver == 'linear static' and backend != 'pcg':
+            raise ValueError(f'Matrix-free operator needs solver_backend = pcg, not {backend}')
+        if solver == 'eigenvalues' and config_option(cfg, solver, 'modes') is None:
+            raise ValueError('Matrix-free eigenvalue solver needs number of modes, freqlim alone is not supported')
+    # eigenvalue solver, lanczos (shift-invert with spectrum slicing up to freqlim), subspace (iteration seeded by
+    # previous eigenvectors) or arpack (smallest magnitude)
+    eigensolver = config_option(cfg, solver, 'eigensolver', 'lanczos')
+    if solver == 'eigenvalues' and eigensolver == 'subspace' and config_option(cfg, solver, 'modes') is None:
+        raise ValueError(f'Subspace eigenvalue solver needs number of modes, option modes missing in [{solver}]')
+    # full tables written to report file, the log keeps head and tail of long tables only
+    report_file = config_option(cfg, solver, 'report')
+    report.REPORT_FILE = None if report_file is None else os.path.join(structure_directory, report_file)
+    if report.REPORT_FILE is not None:
+        open(report.REPORT_FILE, 'w').close()
+    # result sets stored as memory mappable column files listed in results/manifest.json
+    results = config_option(cfg, solver, 'results')
+    if results is not None:
+        results = os.path.join(structure_directory, results)
+        results_init(results, solver)
     logging.info(f'\n\n\tStarting {solver} analysis of {structure_directory}\n\n')
 
     # array of node coordinates
     nd = load_dat(os.path.join(structure_directory, 'nd.dat'), dtype=float)
     nnode = nd.shape[0]
-    logging.debug(f'nd:\n{nd}')
+    logging.debug('nd:\n%s', nd)
     logging_array('Node Coordinates', nd, ['nID', 'x', 'z'])
 
     # array of element connectivity
     el = load_dat(os.path.join(structure_directory, 'el.dat'), dtype=int)
     nelem = el.shape[0]
-    logging.debug(f'el:\n{el}')
+    logging.debug('el:\n%s', el)
     logging_array('Element Connectivity', el,
                   ['eID', 'mID', 'pID', 'nd1', 'nd2', 'Rx1', 'Rz1', 'Rfi1', 'Rx2', 'Rz2', 'Rfi2'])
 
     # array of materials
     mt = load_dat(os.path.join(structure_directory, 'mt.dat'), dtype=float)
-    logging.debug(f'mt:\n{mt}')
+    logging.debug('mt:\n%s', mt)
     logging_array('Materials', mt, ['mID', 'ro', 'E', 'nu', 'alpha'])
 
     # array of properties
     pt = load_dat(os.path.join(structure_directory, 'pt.dat'), dtype=float)
-    logging.debug(f'pt:\n{pt}')
+    logging.debug('pt:\n%s', pt)
     logging_array('Properties', mt, ['pID', 'A', 'I', 'W', 'Ash'])
 
     # array of suppressed nodes
@@ -834,136 +1665,269 @@ def beam2d(structure_directory: str = 'console'):
         logging_array('Elemental loads', fe, ['ldID', 'lpatID', 'eID', 'fx', 'fz', 'dt'],
                       dtype=['int', 'int', 'int', 'float', 'float', 'float'])
 
+    # superelement instances [instID, seID, bnd, nID], superelement directories in section superelements
+    se = load_dat(os.path.join(structure_directory, 'se.dat'), dtype=int) \
+        if os.path.exists(os.path.join(structure_directory, 'se.dat')) else None
+    if se is not None:
+        logging_array('Superelement instances', se, ['#', 'instID', 'seID', 'bnd', 'nID'])
+        if backend in ['skyline', 'frontal'] or operator == 'matrix-free' \
+                or solver in ['buckling', 'explicit', 'nonlinear static']:
+            raise ValueError(f'Superelements need assembled global matrices, not supported by {solver} '
+                             f'with {backend} backend and {operator} operator')
+
     # DOF localisation matrices
-    ndofs, ncdofs, lmn, lme, lmd = localisation_matrix(nd, el, cs)
-    logging.debug(f'lmn:\n{lmn}')
+    ndofs, ncdofs, lmn, lme, lmd = localisation_matrix(nd, el, cs, se=se)
+    bandwidth, profile, heights = bandwidth_profile(lme, ndofs, ncdofs)
+    info = [['bandwidth', bandwidth], ['profile', profile]]
+
+    # optional renumbering of free DOFs to reduce bandwidth/profile/fill-in
+    renumber = config_option(cfg, solver, 'renumber', 'none')
+    if renumber != 'none':
+        lmn, lme, lmd = renumber_dofs(lmn, lme, lmd, ncdofs, renumber)
+        bandwidth, profile, heights = bandwidth_profile(lme, ndofs, ncdofs)
+        info.extend([[f'bandwidth {renumber}', bandwidth], [f'profile {renumber}', profile]])
+    logging.debug('lmn:\n%s', lmn)
     logging_array('Node DOF numbers', lmn, ['nID', 'dofX', 'dofZ', 'dofFi'])
-    logging.debug(f'lmd:\n{lmd}')
+    logging.debug('lmd:\n%s', lmd)
     logging_array('DOF numbers to Node', lmd, ['dofID', 'nID', 'dir'])
-    logging.debug(f'lme:\n{lme}')
+    logging.debug('lme:\n%s', lme)
     logging_array('Element DOF numbers', lme, ['eID', 'dofX1', 'dofZ1', 'dofFi1', 'dofX2', 'dofZ2', 'dofFi2'])
 
+    # element end coordinates, section and material values
+    x1, x2 = nd[el[:, 2] - 1], nd[el[:, 3] - 1]
+    A, I = pt[el[:, 1] - 1, 0], pt[el[:, 1] - 1, 1]
+    ro, E, nu, alpha = mt[el[:, 0] - 1].T
+
+    # superelements condensed once per definition (cached on disk), instances assembled as element blocks
+    instances = []
+    if se is not None:
+        mi = float(config_option(cfg, solver, 'mi', '0.5'))
+        # guyan (static condensation) or craig-bampton (component mode synthesis, fixed interface modes)
+        reduction = config_option(cfg, solver, 'reduction', 'guyan')
+        modes = int(config_option(cfg, solver, 'component_modes', '10')) if reduction == 'craig-bampton' else 0
+        paths = {int(seID): os.path.join(structure_directory, path.strip())
+                 for seID, path in cfg['superelements'].items() if seID not in cfg.defaults()}
+        processes = min(int(config_option(cfg, solver, 'processes', f'{os.cpu_count()}')), len(paths))
+        if processes > 1:
+            # components are reduced independently
+            with multiprocessing.Pool(processes) as pool:
+                reduced = pool.starmap(superelement_condense, [(path, mi, True, modes) for path in paths.values()])
+        else:
+            reduced = [superelement_condense(path, mi, True, modes) for path in paths.values()]
+        definitions = dict(zip(paths.keys(), reduced))
+        instances, ndofs, lmd = superelement_instances(se, nd, lmn, lmd, definitions, ndofs)
+        info.extend([['superelements', np.unique(se[:, 0]).shape[0]], ['dofs reduced model', ndofs]])
+
     # model info
-    logging_table('Model info', [['nodes', nnode], ['elements', nelem], ['dofs', ndofs], ['dofs constrained', ncdofs]])
+    logging_table('Model info', [['nodes', nnode], ['elements', nelem], ['dofs', ndofs], ['dofs constrained', ncdofs]]
+                  + info)
 
     if solver == 'linear static':
-        # load vector
-        f = np.zeros((ndofs, 1))
-        if fn is not None:
-            assemble_load_nodal(f, lmn, fn)
-        if fe is not None:
-            for i in range(fe.shape[0]):
-                eID = int(fe[i][1])
-                assemble_load_elemental(lme, f, beam2d_load(nd[el[eID - 1][2] - 1],
-                                                            nd[el[eID - 1][3] - 1],
-                                                            fe[i][2], fe[i][3]), eID)
-                assemble_load_elemental(lme, f, beam2d_temp(nd[el[eID - 1][2] - 1], nd[el[eID - 1][3] - 1],
-                                                            pt[el[eID - 1][1] - 1][0], mt[el[eID - 1][0] - 1][1],
-                                                            mt[el[eID - 1][0] - 1][2], fe[i][4]), eID)
-        logging.debug(f'f:\n{f}')
-        logging_array('Right side vector', f, ['dofID', 'F'])
-
-        # preparation of load vector, stiffness matrix, displacement vector
-        K = np.zeros((ndofs, ndofs), dtype=float)
-        u = np.zeros((ndofs, 1), dtype=float)
-
-        # creation of local stiffness matrix and localisation
-        for i in range(nelem):
-            assemble(lme, K, beam2d_stiffness(nd[el[i][2] - 1], nd[el[i][3] - 1],
-                                              pt[el[i][1] - 1][0], pt[el[i][1] - 1][1],
-                                              mt[el[i][0] - 1][1]), i + 1)
-            # assemble(lme, K, beam2d_stiffness_timoshenko(nd[el[i][2] - 1], nd[el[i][3] - 1],
-            #                                              pt[el[i][1] - 1][0], pt[el[i][1] - 1][1],
-            #                                              mt[el[i][0] - 1][1], mt[el[i][0] - 1][2]), i + 1)
-        logging.debug(f'K:\n{K}')
-        tmp = ['DOF']
-        tmp.extend(['{0:n}'.format(i) for i in range(ndofs)])
-        logging_array('Stiffness Matrix', K, tmp, eng=True)
-        del tmp
-
-        # solving the displacements
-        u[ncdofs:] = linalg.solve(K[ncdofs:, ncdofs:], f[ncdofs:])
-        logging.debug(f'u:\n{u}')
-        logging_array('Resulting displacements', u, ['dofID', 'du'])
-
-        ndu = u[lmn - 1].reshape((-1, 3))
-        logging.debug(f'ndu:\n{ndu}')
-        logging_array('Nodal displacements', ndu, ['nID', 'dX', 'dZ', 'dFi'])
-
-        # reactions
-        f[:ncdofs] = K[:ncdofs, ncdofs:] @ u[ncdofs:]
-        logging.debug(f'f:\n{f}')
-        logging_array('Resulting reactions', f[:ncdofs], ['dofID', 'R'])
-        r = np.zeros((cs.shape[0], lmn.shape[1] + 1))
-        for i in range(cs.shape[0]):
-            r[i][0] = cs[i][0]
-            for j in range(cs[i][1:].shape[0]):
-                if cs[i][j + 1] == 1:
-                    r[i][j + 1] = f[lmn[cs[i][0] - 1][j] - 1]
-                else:
-                    r[i][j + 1] = np.NaN
-        logging.debug(f'r:\n{r}')
-        logging_array('Nodal reactions', r, ['cID', 'nID', 'Fx', 'Fz', 'My'], eng=True)
+        # load vectors, one column per load pattern
+        lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+        nlpat = lpat.shape[0]
+        logging.debug('f:\n%s', f)
+        logging_array('Right side vector', f, ['dofID'] + [f'F{l:n}' for l in lpat])
+
+        # creation of local stiffness matrix and localisation, frontal solver generates element matrices
+        # in front order by itself and no stack is kept
+        def stiffness(index):
+            return beam2d_stiffness_batch(x1[index], x2[index], A[index], I[index], E[index])
+            # return beam2d_stiffness_timoshenko_batch(x1[index], x2[index], A[index], I[index], E[index], nu[index])
+
+        ke = stiffness if backend == 'frontal' else stiffness(slice(None))
+        if backend == 'skyline':
+            # reduced stiffness matrix assembled directly into skyline storage
+            K = SkylineMatrix.from_elements(lme, ke, ndofs, ncdofs)
+        elif operator == 'matrix-free':
+            # reduced stiffness operator only, solved iteratively
+            K = ElementOperator(lme, ke, ndofs, ncdofs)
+        elif backend == 'frontal':
+            # no global matrix, elements are eliminated in frontal sequence, factor is kept on disk
+            K = FrontalSolver(lme, ke, ndofs, ncdofs,
+                              element_order(lme, ndofs, ncdofs, config_option(cfg, solver, 'element_order', 'rcm')),
+                              config_option(cfg, solver, 'frontal_file'))
+        else:
+            K = assemble_global(lme, ke, ndofs, assembly)
+            if instances:
+                K = K + assemble_superelements(instances, ndofs, 'K', assembly)
+        logging_matrix('Stiffness Matrix', K)
+
+        factor = None
+        if backend == 'pcg':
+            # iterative solution, warm started from displacements of previous run if available
+            warm_start = config_option(cfg, solver, 'warm_start')
+            x0 = None
+            if warm_start is not None:
+                warm_start = os.path.join(structure_directory, warm_start)
+                if os.path.exists(warm_start):
+                    x0 = np.load(warm_start)
+                    x0 = x0[ncdofs:] if x0.shape[0] == ndofs else None
+            maxiter = config_option(cfg, solver, 'max_iterations')
+            Kr = K if operator == 'matrix-free' else K[ncdofs:, ncdofs:]
+            factor = PCGSolver(Kr, preconditioner(Kr, config_option(cfg, solver, 'preconditioner', 'jacobi'),
+                                                  lmd[ncdofs:], nd),
+                               float(config_option(cfg, solver, 'tolerance', '1.0E-08')),
+                               None if maxiter is None else int(maxiter), x0)
+
+        # solving the displacements, stiffness is factored once for all load patterns
+        u, factor = linear_static(K, f, ncdofs, factor)
+        if backend == 'pcg':
+            for i in range(nlpat):
+                logging_array(f'Convergence history load pattern {lpat[i]:n}',
+                              np.array(factor.history[i]).reshape((-1, 1)), ['iter', 'residual'], eng=True)
+            if warm_start is not None:
+                np.save(warm_start, u)
+        logging.debug('u:\n%s', u)
+        logging_array('Resulting displacements', u, ['dofID'] + [f'du{l:n}' for l in lpat])
+
+        ndu = u[lmn - 1]
+        logging.debug('ndu:\n%s', ndu)
+
+        # reactions, only elements connected to constrained DOFs contribute
+        supported = np.flatnonzero(np.any((lme > 0) & (lme <= ncdofs), axis=1))
+        f[:ncdofs] = internal_forces(lme[supported], ke(supported) if callable(ke) else ke[supported], u,
+                                     ndofs)[:ncdofs]
+        for instance in instances:
+            f[:ncdofs] += internal_forces(instance['lm'], instance['K'], u, ndofs)[:ncdofs]
+        logging.debug('f:\n%s', f)
+        logging_array('Resulting reactions', f[:ncdofs], ['dofID'] + [f'R{l:n}' for l in lpat])
+        r = np.full((cs.shape[0], lmn.shape[1] + 1, nlpat), np.nan)
+        r[:, 0, :] = cs[:, [0]]
+        mask = cs[:, 1:] == 1
+        r[:, 1:][mask] = f[lmn[cs[:, 0] - 1][mask] - 1]
+        logging.debug('r:\n%s', r)
 
         # element displacements
-        ue = u[lme - 1].reshape((nelem, lme.shape[1]))
-        logging.debug(f'ue:\n{ue}')
-        logging_array('Elemental displacements', ue, ['eID', 'dX1', 'dZ1', 'dFi1', 'dX2', 'dZ2', 'dFi2'], eng=True)
+        ue = u[lme - 1]
+        logging.debug('ue:\n%s', ue)
 
         # element inner forces
-        se = np.zeros((nelem, 6))
-        for i in range(nelem):
-            se[i] = beam2d_postpro(nd[el[i][2] - 1], nd[el[i][3] - 1], ue[i],
-                                   pt[el[i][1] - 1][0], pt[el[i][1] - 1][1],
-                                   mt[el[i][0] - 1][1])
-        logging.debug(f'se:\n{se}')
-        logging_array('Element Inner Forces', se, ['eID', 'N1', 'Q1', 'M1', 'N2', 'Q2', 'M2'], eng=True)
+        se = beam2d_postpro_batch(x1, x2, ue, A, I, E)
+        logging.debug('se:\n%s', se)
+
+        if config_option(cfg, solver, 'sensitivity', 'no') == 'yes':
+            # adjoint sensitivities with respect to A and I of all elements, compliance or displacements of
+            # response_nodes, thermal loads N = E A alpha dt are the only loads depending on the section
+            dke = beam2d_stiffness_derivative_batch(x1, x2, E)
+            dfe = np.zeros((2, nelem, 6, nlpat))
+            if fe is not None:
+                eID = fe[:, 1].astype(int)
+                np.add.at(dfe[0], (eID - 1, slice(None), np.searchsorted(lpat, fe[:, 0].astype(int))),
+                          beam2d_temp_batch(x1[eID - 1], x2[eID - 1], 1.0, E[eID - 1], alpha[eID - 1], fe[:, 4]))
+            G = None
+            nodes = config_option(cfg, solver, 'response_nodes')
+            if nodes is not None:
+                dofs = lmn[np.array([int(n) for n in nodes.split(',')]) - 1].ravel()
+                G = np.zeros((ndofs, dofs.shape[0]))
+                G[dofs - 1, np.arange(dofs.shape[0])] = 1.0
+            ds = static_sensitivity(K, factor, u, ncdofs, lme, dke, dfe, G)
+            file = config_output(cfg, solver, 'sensitivity_file', 'sensitivity.npz', structure_directory)
+            if file is not None:
+                np.savez(file, A=ds[0], I=ds[1])
+            if G is None:
+                for i in range(nlpat):
+                    logging_array(f'Compliance sensitivities load pattern {lpat[i]:n}', ds[:, :, i].T,
+                                  ['eID', 'dC/dA', 'dC/dI'], eng=True)
+
+        for i in range(nlpat):
+            logging.info(f' >>> Load pattern {lpat[i]:n}')
+            logging_array('Nodal displacements', ndu[:, :, i], ['nID', 'dX', 'dZ', 'dFi'])
+            logging_array('Nodal reactions', r[:, :, i], ['cID', 'nID', 'Fx', 'Fz', 'My'], eng=True)
+            logging_array('Elemental displacements', ue[:, :, i], ['eID', 'dX1', 'dZ1', 'dFi1', 'dX2', 'dZ2', 'dFi2'],
+                          eng=True)
+            logging_array('Element Inner Forces', se[:, :, i], ['eID', 'N1', 'Q1', 'M1', 'N2', 'Q2', 'M2'], eng=True)
+
+        if results is not None:
+            nodes, elements = np.arange(1, nnode + 1), np.arange(1, nelem + 1)
+            results_write(results, 'nodal displacements', nodes,
+                          dict(zip(['dX', 'dZ', 'dFi'], ndu.transpose(1, 0, 2))), lpat, 'nID', 'lpatID')
+            results_write(results, 'nodal reactions', cs[:, 0],
+                          dict(zip(['Fx', 'Fz', 'My'], r[:, 1:].transpose(1, 0, 2))), lpat, 'nID', 'lpatID')
+            results_write(results, 'element displacements', elements,
+                          dict(zip(['dX1', 'dZ1', 'dFi1', 'dX2', 'dZ2', 'dFi2'], ue.transpose(1, 0, 2))), lpat,
+                          'eID', 'lpatID')
+            results_write(results, 'element forces', elements,
+                          dict(zip(['N1', 'Q1', 'M1', 'N2', 'Q2', 'M2'], se.transpose(1, 0, 2))), lpat, 'eID',
+                          'lpatID')
+
+        # results of a single load pattern are returned without the load pattern axis
+        if nlpat == 1:
+            ndu, r, ue, se = ndu[:, :, 0], r[:, :, 0], ue[:, :, 0], se[:, :, 0]
 
         return ndu, r, ue, se
 
     elif solver == 'eigenvalues':
-        # preparation of  stiffness matrix, mass matrix, displacement vector
-        K = np.zeros((ndofs, ndofs), dtype=float)
-        M = np.zeros((ndofs, ndofs), dtype=float)
-        u = np.zeros((ndofs, ndofs - ncdofs), dtype=float)
-
-        # creation of local stiffness matrix and localisation
-        for i in range(nelem):
-            assemble(lme, K, beam2d_stiffness(nd[el[i][2] - 1], nd[el[i][3] - 1],
-                                              pt[el[i][1] - 1][0], pt[el[i][1] - 1][1],
-                                              mt[el[i][0] - 1][1]), i + 1)
-            # assemble(lme, K, beam2d_stiffness_timoshenko(nd[el[i][2] - 1], nd[el[i][3] - 1],
-            #                                              pt[el[i][1] - 1][0], pt[el[i][1] - 1][1],
-            #                                              mt[el[i][0] - 1][1], mt[el[i][0] - 1][2]), i + 1)
-        logging.debug(f'K:\n{K}')
-        tmp = ['DOF']
-        tmp.extend(['{0:n}'.format(i) for i in range(ndofs)])
-        logging_array('Stiffness Matrix', K, tmp, eng=True)
-        del tmp
-
-        # creation of local mass matrix and localisation
-        for i in range(nelem):
-            assemble(lme, M, beam2d_mass(nd[el[i][2] - 1], nd[el[i][3] - 1],
-                                         pt[el[i][1] - 1][0], mt[el[i][0] - 1][0], mi=0.5), i + 1)
-        logging.debug(f'M:\n{M}')
-        tmp = ['DOF']
-        tmp.extend(['{0:n}'.format(i) for i in range(ndofs)])
-        logging_array('Mass Matrix', M, tmp, eng=True)
-        del tmp
+        # creation of local stiffness matrix and localisation, eigenvectors are allocated per eigensolver
+        ke = beam2d_stiffness_batch(x1, x2, A, I, E)
+        # ke = beam2d_stiffness_timoshenko_batch(x1, x2, A, I, E, nu)
+        me = beam2d_mass_batch(x1, x2, A, ro, mi=0.5)
+        if operator == 'matrix-free':
+            # reduced stiffness and mass operators only
+            K = ElementOperator(lme, ke, ndofs, ncdofs)
+            M = ElementOperator(lme, me, ndofs, ncdofs)
+        else:
+            K = assemble_global(lme, ke, ndofs, assembly)
+            # creation of local mass matrix and localisation
+            M = assemble_global(lme, me, ndofs, assembly)
+            if instances:
+                K = K + assemble_superelements(instances, ndofs, 'K', assembly)
+                M = M + assemble_superelements(instances, ndofs, 'M', assembly)
+        logging_matrix('Stiffness Matrix', K)
+        logging_matrix('Mass Matrix', M)
 
         if solver in cfg.sections():
             # solving the eigenvalues and eigenshapes - only first N, up to ndofs-1
-            if 'modes' in cfg[solver].keys():
+            if operator == 'matrix-free':
+                number_of_eigenvalues = int(config_option(cfg, solver, 'modes'))
+                u = np.zeros((ndofs, number_of_eigenvalues))
+                eigenvalue, u[ncdofs:, :] = eigen_matrix_free(K, M, number_of_eigenvalues,
+                                                              float(config_option(cfg, solver, 'tolerance', '1.0E-10')))
+            elif eigensolver == 'subspace':
+                # subspace iteration, seeded by eigenvectors of previous run if available
+                number_of_eigenvalues = int(config_option(cfg, solver, 'modes'))
+                seed = config_option(cfg, solver, 'seed')
+                x0 = None
+                if seed is not None:
+                    seed = os.path.join(structure_directory, seed)
+                    if os.path.exists(seed):
+                        x0 = np.load(seed)
+                        x0 = x0[ncdofs:] if x0.shape[0] == ndofs else None
+                    if x0 is None:
+                        logging.warning(f'Seed eigenvectors {seed} not found or not matching the model')
+                maxiter = config_option(cfg, solver, 'max_iterations', '100')
+                u = np.zeros((ndofs, number_of_eigenvalues))
+                eigenvalue, u[ncdofs:, :], iterations = eigen_subspace(K[ncdofs:, ncdofs:], M[ncdofs:, ncdofs:],
+                                                                       number_of_eigenvalues, x0,
+                                                                       float(config_option(cfg, solver, 'tolerance',
+                                                                                           '1.0E-10')),
+                                                                       int(maxiter))
+            elif eigensolver == 'lanczos' and ('modes' in cfg[solver].keys() or 'freqlim' in cfg[solver].keys()):
+                # shift-invert Lanczos, all modes below freqlim (up to modes if given)
+                modes = config_option(cfg, solver, 'modes')
+                freqlim = config_option(cfg, solver, 'freqlim')
+                eigenvalue, x = eigen_lanczos(K[ncdofs:, ncdofs:], M[ncdofs:, ncdofs:],
+                                              None if modes is None else int(modes),
+                                              None if freqlim is None else float(freqlim),
+                                              int(config_option(cfg, solver, 'shift_modes', '40')))
+                u = np.zeros((ndofs, eigenvalue.shape[0]))
+                u[ncdofs:, :] = x
+            elif 'modes' in cfg[solver].keys():
                 number_of_eigenvalues = int(cfg[solver]['modes'])
                 u = np.zeros((ndofs, number_of_eigenvalues))
                 eigenvalue, u[ncdofs:, :] = sclinalg.eigsh(K[ncdofs:, ncdofs:], number_of_eigenvalues,
                                                            M[ncdofs:, ncdofs:], which='SM')
             # # solving the eigenvalues and eigenshapes - all of them
             else:
-                eigenvalue, u[ncdofs:, :] = linalg.eigh(K[ncdofs:, ncdofs:], M[ncdofs:, ncdofs:])
+                u = np.zeros((ndofs, ndofs - ncdofs))
+                if sparse.issparse(K):
+                    eigenvalue, u[ncdofs:, :] = linalg.eigh(K[ncdofs:, ncdofs:].toarray(),
+                                                            M[ncdofs:, ncdofs:].toarray())
+                else:
+                    eigenvalue, u[ncdofs:, :] = linalg.eigh(K[ncdofs:, ncdofs:], M[ncdofs:, ncdofs:])
 
-        logging.debug(f'eigenvalues:\n{eigenvalue}')
-        logging.debug(f'eigenvectors:\n{u}')
+        logging.debug('eigenvalues:\n%s', eigenvalue)
+        logging.debug('eigenvectors:\n%s', u)
         logging.info(f' >>> Eigenvalues found: {eigenvalue.shape[0]}')
         # eigenvalue = np.real(eigenvalue)
         idx = np.flip(eigenvalue.argsort()[::-1])
@@ -975,6 +1939,9 @@ def beam2d(structure_directory: str = 'console'):
 
         # normalise shapes to 1
         u *= 1.0 / np.max(np.abs(u), axis=0)
+        if solver in cfg.sections() and 'save' in cfg[solver].keys():
+            # eigenvectors stored for seeding of the next run (eigensolver = subspace)
+            np.save(os.path.join(structure_directory, cfg[solver]['save']), u)
 
         tmp = np.hstack((eigenvalue, omega, eigenfrequency))
 
@@ -993,6 +1960,75 @@ def beam2d(structure_directory: str = 'console'):
 
         ue = u[lme - 1]
 
+        if results is not None:
+            modes = np.arange(1, eigenvalue.shape[0] + 1)
+            results_write(results, 'eigenvalues', modes,
+                          {'lambda': eigenvalue[:, 0], 'omega': omega[:, 0], 'frequency': eigenfrequency[:, 0]},
+                          id_name='mode')
+            results_write(results, 'mode shapes', np.arange(1, nnode + 1),
+                          dict(zip(['dX', 'dZ', 'dFi'], u[lmn - 1].transpose(1, 0, 2))), modes, 'nID', 'mode')
+
+        if config_option(cfg, solver, 'sensitivity', 'no') == 'yes':
+            # eigenfrequency [Hz] sensitivities with respect to A and I of all elements
+            Mr = M if operator == 'matrix-free' else M[ncdofs:, ncdofs:]
+            phi = u / np.sqrt(np.einsum('ij,ij->j', u[ncdofs:], Mr @ u[ncdofs:]))
+            dfreq = frequency_sensitivity(eigenvalue[:, 0], phi, lme, beam2d_stiffness_derivative_batch(x1, x2, E),
+                                          beam2d_mass_derivative_batch(x1, x2, ro, 0.5)) / (2.0 * math.pi)
+            file = config_output(cfg, solver, 'sensitivity_file', 'sensitivity.npz', structure_directory)
+            if file is not None:
+                np.savez(file, A=dfreq[0], I=dfreq[1])
+            header = ['eID'] + [f'{eigenfrequency[i][0]:.2f} Hz' for i in range(eigenfrequency.shape[0])]
+            logging_array('Eigenfrequency sensitivities dFreq/dA', dfreq[0], header, eng=True)
+            logging_array('Eigenfrequency sensitivities dFreq/dI', dfreq[1], header, eng=True)
+
+        if instances and config_option(cfg, solver, 'expand', 'no') == 'yes':
+            # mode shapes expanded to all superelement nodes, one array (nnode, 3, nmodes) per instance
+            expanded = {}
+            for instance in instances:
+                ui = superelement_expand(instance, definitions[instance['seID']], u)
+                expanded.update({f'{instID:n}': ui[k] for k, instID in enumerate(instance['instID'])})
+            np.savez(os.path.join(structure_directory, 'superelement_modes.npz'), **expanded)
+            logging.info(f' >>> Mode shapes expanded to {len(expanded)} superelement instances')
+
+        if solver in cfg.sections() and 'response' in cfg[solver].keys():
+            # modal superposition using the extracted modes, response = transient, harmonic
+            response = [s.strip() for s in cfg[solver]['response'].split(',')]
+            Mr = M if operator == 'matrix-free' else M[ncdofs:, ncdofs:]
+            phi = u / np.sqrt(np.einsum('ij,ij->j', u[ncdofs:], Mr @ u[ncdofs:]))
+            # output DOFs, all directions of requested nodes
+            nodes = np.array([int(n) for n in cfg[solver]['response_nodes'].split(',')]) \
+                if 'response_nodes' in cfg[solver].keys() else np.arange(1, nnode + 1)
+            dofs = lmn[nodes - 1].ravel()
+            lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+            p = phi.T @ f
+            zeta = float(config_option(cfg, solver, 'damping', '0.0'))
+            header = ['#', 'nID', 'dX', 'dZ', 'dFi']
+
+            if 'transient' in response:
+                ft = load_dat(os.path.join(structure_directory, 'ft.dat')) \
+                    if os.path.exists(os.path.join(structure_directory, 'ft.dat')) else None
+                dt = float(cfg[solver]['dt'])
+                t = np.arange(int(cfg[solver]['steps']) + 1) * dt
+                ut = modal_transient(eigenvalue[:, 0], phi[dofs - 1], p @ time_function(ft, lpat, t), dt, zeta)
+                np.save(os.path.join(structure_directory, 'modal_transient.npy'), ut)
+                logging_array('Modal transient displacement envelope',
+                              np.column_stack((nodes, np.max(np.abs(ut), axis=0).reshape((-1, 3)))), header,
+                              dtype=['int', 'int', 'eng', 'eng', 'eng'])
+
+            if 'harmonic' in response:
+                # excitation frequencies [Hz] start, stop, number, all load patterns in phase
+                start, stop, number = [s.strip() for s in cfg[solver]['frequencies'].split(',')]
+                frequency = np.linspace(float(start), float(stop), int(number))
+                uh = modal_harmonic(eigenvalue[:, 0], phi[dofs - 1], p.sum(axis=1), 2.0 * math.pi * frequency,
+                                    zeta)
+                np.save(os.path.join(structure_directory, 'modal_harmonic.npy'), uh)
+                logging_array('Modal harmonic peak amplitudes',
+                              np.column_stack((nodes, np.max(np.abs(uh), axis=0).reshape((-1, 3)))), header,
+                              dtype=['int', 'int', 'eng', 'eng', 'eng'])
+                logging_array('Modal harmonic peak frequencies',
+                              np.column_stack((nodes, frequency[np.argmax(np.abs(uh), axis=0)].reshape((-1, 3)))),
+                              header, dtype=['int', 'int', ' {0:10.3f}', ' {0:10.3f}', ' {0:10.3f}'])
+
         if solver in cfg.sections():
             if 'plot' in cfg[solver].keys():
                 if 'geometry' in [s.strip() for s in cfg[solver]['plot'].split(',')]:
@@ -1002,6 +2038,261 @@ def beam2d(structure_directory: str = 'console'):
 
         return eigenfrequency, u
 
+    elif solver == 'buckling':
+        # linear static step for one load pattern, stiffness is factored once and reused by the eigensolver
+        lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+        load_pattern = int(config_option(cfg, solver, 'load_pattern', f'{lpat[0]:n}'))
+        if load_pattern not in lpat:
+            raise ValueError(f'Load pattern {load_pattern:n} not defined, available: '
+                             f'{", ".join(f"{l:n}" for l in lpat)}')
+        f = f[:, lpat == load_pattern]
+        logging_array('Right side vector', f, ['dofID', f'F{load_pattern:n}'])
+
+        ke = beam2d_stiffness_batch(x1, x2, A, I, E)
+        K = assemble_global(lme, ke, ndofs, assembly)
+        logging_matrix('Stiffness Matrix', K)
+        u, factor = linear_static(K, f, ncdofs)
+        logging_array('Resulting displacements', u, ['dofID', f'du{load_pattern:n}'])
+
+        # axial forces (tension positive), mean of both ends
+        se = beam2d_postpro_batch(x1, x2, u[lme - 1], A, I, E)[:, :, 0]
+        N = (se[:, 3] - se[:, 0]) / 2.0
+        logging_array('Element Axial Forces', N.reshape((-1, 1)), ['eID', 'N'], eng=True)
+
+        # geometric stiffness assembled from all elements at once
+        kg = beam2d_initialstress_batch(x1, x2, N)
+        Kg = assemble_global(lme, kg, ndofs, assembly)
+        logging_matrix('Initial Stress Matrix', Kg)
+
+        modes = int(config_option(cfg, solver, 'modes', '1'))
+        shift = config_option(cfg, solver, 'shift')
+        u = np.zeros((ndofs, modes))
+        load_factor, x = eigen_buckling(K[ncdofs:, ncdofs:], Kg[ncdofs:, ncdofs:], modes, factor,
+                                        None if shift is None else float(shift))
+        u = u[:, :load_factor.shape[0]]
+        u[ncdofs:, :] = x
+        logging.info(f' >>> Critical load factors found: {load_factor.shape[0]}')
+        load_factor = load_factor.reshape((-1, 1))
+        logging_array('Critical Load Factors', load_factor, ['Mode ID', 'Lambda'], ['int', 'eng'])
+
+        # normalise shapes to 1
+        u *= 1.0 / np.max(np.abs(u), axis=0)
+        tmp = [['Mode']]
+        tmp[0].extend([' {0:^11s}'.format('{0:n}'.format(i + 1)) for i in range(load_factor.shape[0])])
+        tmp.append(['DOF'])
+        tmp[1].extend([' {0:^11s}'.format('{0:.3f}'.format(load_factor[i][0])) for i in range(load_factor.shape[0])])
+        logging_array('Buckling shapes', u, tmp, eng=True)
+        del tmp
+
+        ue = u[lme - 1]
+
+        if results is not None:
+            modes = np.arange(1, load_factor.shape[0] + 1)
+            results_write(results, 'critical load factors', modes, {'lambda': load_factor[:, 0]}, id_name='mode')
+            results_write(results, 'buckling shapes', np.arange(1, nnode + 1),
+                          dict(zip(['dX', 'dZ', 'dFi'], u[lmn - 1].transpose(1, 0, 2))), modes, 'nID', 'mode')
+
+        if solver in cfg.sections():
+            if 'plot' in cfg[solver].keys():
+                if 'geometry' in [s.strip() for s in cfg[solver]['plot'].split(',')]:
+                    plot_geometry(nd, el)
+                if 'deformed' in [s.strip() for s in cfg[solver]['plot'].split(',')]:
+                    plot_deformed(nd, el, ue)
+
+        return load_factor, u
+
+    elif solver == 'nonlinear static':
+        # co-rotational beams, proportional loading of one load pattern
+        lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+        load_pattern = int(config_option(cfg, solver, 'load_pattern', f'{lpat[0]:n}'))
+        if load_pattern not in lpat:
+            raise ValueError(f'Load pattern {load_pattern:n} not defined, available: '
+                             f'{", ".join(f"{l:n}" for l in lpat)}')
+        f = f[:, lpat == load_pattern][:, 0]
+        logging_array('Right side vector', f.reshape((-1, 1)), ['dofID', f'F{load_pattern:n}'])
+
+        # load = uniform load increments, arc-length = cylindrical arc-length continuation (limit points)
+        load_factor, u, iterations = corotational_static(
+            x1, x2, A, I, E, lme, ndofs, ncdofs, f, int(config_option(cfg, solver, 'steps', '10')),
+            config_option(cfg, solver, 'control', 'load'), float(config_option(cfg, solver, 'max_load', '1.0')),
+            float(config_option(cfg, solver, 'tolerance', '1.0E-08')),
+            int(config_option(cfg, solver, 'max_iterations', '25')),
+            config_option(cfg, solver, 'line_search', 'yes') == 'yes')
+        file = config_output(cfg, solver, 'nonlinear_file', 'nonlinear.npz', structure_directory)
+        if file is not None:
+            np.savez(file, load_factor=load_factor, u=u)
+        logging_array('Load increments', np.column_stack((load_factor, iterations)),
+                      ['Increment', 'Lambda', 'Iterations'], ['int', 'float', 'int'])
+
+        ndu = u[-1][lmn - 1]
+        logging_array(f'Nodal displacements at load factor {load_factor[-1]:.6f}', ndu, ['nID', 'dX', 'dZ', 'dFi'])
+        q = beam2d_corotational_batch(x1, x2, u[-1][lme - 1], A, I, E)[2]
+        logging_array(f'Element Inner Forces at load factor {load_factor[-1]:.6f}', q, ['eID', 'N', 'M1', 'M2'],
+                      eng=True)
+
+        ue = u.T[lme - 1]
+
+        if results is not None:
+            increments = np.arange(load_factor.shape[0])
+            results_write(results, 'load increments', increments,
+                          {'lambda': load_factor, 'iterations': iterations}, id_name='increment')
+            results_write(results, 'nodal displacements', np.arange(1, nnode + 1),
+                          dict(zip(['dX', 'dZ', 'dFi'], u.T[lmn - 1].transpose(1, 0, 2))), increments, 'nID',
+                          'increment')
+
+        if solver in cfg.sections():
+            if 'plot' in cfg[solver].keys():
+                if 'geometry' in [s.strip() for s in cfg[solver]['plot'].split(',')]:
+                    plot_geometry(nd, el)
+                if 'deformed' in [s.strip() for s in cfg[solver]['plot'].split(',')]:
+                    plot_deformed(nd, el, ue)
+
+        return load_factor, u
+
+    elif solver == 'transient':
+        # load vectors scaled in time by piecewise linear time functions [lpatID, t, factor] (ft.dat, optional)
+        lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+        ft = load_dat(os.path.join(structure_directory, 'ft.dat')) \
+            if os.path.exists(os.path.join(structure_directory, 'ft.dat')) else None
+        if ft is not None:
+            logging_array('Time functions', ft, ['ftID', 'lpatID', 't', 'factor'], dtype=['int', 'int', 'float', 'float'])
+
+        dt = float(cfg[solver]['dt'])
+        nsteps = int(cfg[solver]['steps'])
+        # HHT-alpha parameter, 0.0 = average acceleration Newmark
+        hht = float(config_option(cfg, solver, 'alpha', '0.0'))
+        mi = float(config_option(cfg, solver, 'mi', '0.5'))
+
+        ke = beam2d_stiffness_batch(x1, x2, A, I, E)
+        me = beam2d_mass_batch(x1, x2, A, ro, mi=mi)
+        K = assemble_global(lme, ke, ndofs, assembly)
+        M = assemble_global(lme, me, ndofs, assembly)
+        if instances:
+            K = K + assemble_superelements(instances, ndofs, 'K', assembly)
+            M = M + assemble_superelements(instances, ndofs, 'M', assembly)
+        K, M = K[ncdofs:, ncdofs:], M[ncdofs:, ncdofs:]
+        logging_matrix('Stiffness Matrix', K)
+        logging_matrix('Mass Matrix', M)
+        # Rayleigh damping C = a0 * M + a1 * K
+        C = None
+        if 'rayleigh' in cfg[solver].keys():
+            a0, a1 = [float(c) for c in cfg[solver]['rayleigh'].split(',')]
+            C = a0 * M + a1 * K
+
+        # displacement history streamed to disk, one row per time step
+        history = np.lib.format.open_memmap(os.path.join(structure_directory,
+                                                         config_option(cfg, solver, 'history', 'transient.npy')),
+                                            mode='w+', dtype=float, shape=(nsteps + 1, ndofs))
+        fr = f[ncdofs:]
+        newmark(K, M, lambda t: fr @ time_function(ft, lpat, t), dt, nsteps, C, hht, history[:, ncdofs:])
+        history.flush()
+        t = np.arange(nsteps + 1) * dt
+
+        # envelope of nodal displacements, history is read in blocks
+        envelope = np.zeros(ndofs)
+        for i in range(0, nsteps + 1, 1024):
+            envelope = np.maximum(envelope, np.max(np.abs(history[i:i + 1024]), axis=0))
+        logging_array('Nodal displacement envelope', envelope[lmn - 1], ['nID', 'dX', 'dZ', 'dFi'], eng=True)
+        logging_array('Nodal displacements at last step', history[-1][lmn - 1], ['nID', 'dX', 'dZ', 'dFi'],
+                      eng=True)
+
+        return t, history
+
+    elif solver == 'explicit':
+        # load vectors scaled in time by piecewise linear time functions [lpatID, t, factor] (ft.dat, optional)
+        lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+        ft = load_dat(os.path.join(structure_directory, 'ft.dat')) \
+            if os.path.exists(os.path.join(structure_directory, 'ft.dat')) else None
+        if ft is not None:
+            logging_array('Time functions', ft, ['ftID', 'lpatID', 't', 'factor'], dtype=['int', 'int', 'float', 'float'])
+
+        # no global matrices, diagonal mass and element stiffness operator only
+        ke = beam2d_stiffness_batch(x1, x2, A, I, E)
+        md = beam2d_mass_diagonal_batch(x1, x2, A, ro)
+        K = ElementOperator(lme, ke, ndofs, ncdofs)
+        m = np.bincount(K.lm.ravel(), weights=md.ravel(), minlength=ndofs - ncdofs + 1)[1:]
+        logging_matrix('Stiffness Operator', K)
+
+        # time step from element eigenfrequencies reduced by safety factor unless given
+        dt_cr, eID = critical_time_step(ke, md)
+        dt = float(config_option(cfg, solver, 'dt', f'{float(config_option(cfg, solver, "courant", "0.9")) * dt_cr}'))
+        if dt > dt_cr:
+            logging.warning(f'Time step {dt:.6E} exceeds critical time step {dt_cr:.6E} (element {eID:n})')
+        nsteps = config_option(cfg, solver, 'steps')
+        if nsteps is None:
+            duration = config_option(cfg, solver, 'time')
+            if duration is None:
+                raise ValueError('Explicit analysis needs number of steps or time')
+            nsteps = math.ceil(float(duration) / dt)
+        nsteps = int(nsteps)
+        output = int(config_option(cfg, solver, 'output', '1'))
+        logging_table('Explicit integration', [['dt critical', dt_cr], ['dt', dt], ['steps', nsteps],
+                                               ['output interval', output]], '12.6g')
+
+        # decimated displacement history streamed to disk
+        history = np.lib.format.open_memmap(os.path.join(structure_directory,
+                                                         config_option(cfg, solver, 'history', 'explicit.npy')),
+                                            mode='w+', dtype=float, shape=(nsteps // output + 1, ndofs))
+        fr = f[ncdofs:]
+        central_difference(K, m, lambda t: fr @ time_function(ft, lpat, t), dt, nsteps,
+                           float(config_option(cfg, solver, 'damping', '0.0')), output, history[:, ncdofs:])
+        history.flush()
+        t = np.arange(nsteps // output + 1) * dt * output
+
+        # envelope of nodal displacements, history is read in blocks
+        envelope = np.zeros(ndofs)
+        for i in range(0, history.shape[0], 1024):
+            envelope = np.maximum(envelope, np.max(np.abs(history[i:i + 1024]), axis=0))
+        logging_array('Nodal displacement envelope', envelope[lmn - 1], ['nID', 'dX', 'dZ', 'dFi'], eng=True)
+        logging_array('Nodal displacements at last output', history[-1][lmn - 1], ['nID', 'dX', 'dZ', 'dFi'],
+                      eng=True)
+
+        return t, history
+
+    elif solver == 'frequency response':
+        # load amplitudes, all load patterns in phase
+        lpat, f = assemble_loads(ndofs, lmn, lme, fn, fe, x1, x2, A, E, alpha)
+        f = f.sum(axis=1)
+        ke = beam2d_stiffness_batch(x1, x2, A, I, E)
+        me = beam2d_mass_batch(x1, x2, A, ro, mi=float(config_option(cfg, solver, 'mi', '0.5')))
+        K = assemble_global(lme, ke, ndofs, 'sparse')
+        M = assemble_global(lme, me, ndofs, 'sparse')
+        if instances:
+            K = K + assemble_superelements(instances, ndofs, 'K')
+            M = M + assemble_superelements(instances, ndofs, 'M')
+        K, M = K[ncdofs:, ncdofs:], M[ncdofs:, ncdofs:]
+        logging_matrix('Stiffness Matrix', K)
+        logging_matrix('Mass Matrix', M)
+        # Rayleigh damping C = a0 * M + a1 * K and structural damping K * (1 + i * g)
+        C = None
+        if 'rayleigh' in cfg[solver].keys():
+            a0, a1 = [float(c) for c in cfg[solver]['rayleigh'].split(',')]
+            C = a0 * M + a1 * K
+        structural = float(config_option(cfg, solver, 'structural', '0.0'))
+
+        # excitation frequencies [Hz] start, stop, number
+        start, stop, number = [s.strip() for s in cfg[solver]['frequencies'].split(',')]
+        frequency = np.linspace(float(start), float(stop), int(number))
+        # output DOFs, all directions of requested nodes, constrained DOFs stay zero
+        nodes = np.array([int(n) for n in cfg[solver]['response_nodes'].split(',')]) \
+            if 'response_nodes' in cfg[solver].keys() else np.arange(1, nnode + 1)
+        dofs = lmn[nodes - 1].ravel()
+        free = dofs > ncdofs
+        u = np.zeros((frequency.shape[0], dofs.shape[0]), dtype=complex)
+        u[:, free] = frequency_response(K, M, f[ncdofs:], 2.0 * math.pi * frequency, C, structural,
+                                        dofs[free] - ncdofs - 1,
+                                        int(config_option(cfg, solver, 'processes', f'{os.cpu_count()}')))
+        np.save(os.path.join(structure_directory, 'frequency_response.npy'), u)
+
+        header = ['#', 'nID', 'dX', 'dZ', 'dFi']
+        logging_array('Peak amplitudes', np.column_stack((nodes, np.max(np.abs(u), axis=0).reshape((-1, 3)))),
+                      header, dtype=['int', 'int', 'eng', 'eng', 'eng'])
+        logging_array('Peak frequencies',
+                      np.column_stack((nodes, frequency[np.argmax(np.abs(u), axis=0)].reshape((-1, 3)))),
+                      header, dtype=['int', 'int', ' {0:10.3f}', ' {0:10.3f}', ' {0:10.3f}'])
+
+        return frequency, u
+
 
 if __name__ == '__main__':
     logger = logging.getLogger()
@@ -1014,7 +2305,16 @@ if __name__ == '__main__':
     logging.info(f'{__file__} started')
     parser = argparse.ArgumentParser()
     parser.add_argument('structure', type=str, help='directory name of the structure')
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument('--rebuild-cache', action='store_true', help='parse .dat files and rewrite binary cache')
+    cache.add_argument('--no-cache', action='store_true', help='parse .dat files, binary cache is not used')
+    parser.add_argument('--cache-dir', type=str, default=fileio.DAT_CACHE_DIR, help='directory of binary cache')
 
     args = parser.parse_args()
+    fileio.DAT_CACHE_DIR = args.cache_dir
+    if args.rebuild_cache:
+        fileio.DAT_CACHE = 'rebuild'
+    elif args.no_cache:
+        fileio.DAT_CACHE = 'off'
 
     beam2d(args.structure)
@@ -0,0 +1,338 @@
+# python FEM for 2D beams - dynamic analyses
+"""
+Dynamic analyses of 2D beam structures, direct time integration (Newmark, central difference), modal
+superposition and direct frequency response
+"""
+
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.managers import SharedMemoryManager
+import logging
+
+import numpy as np
+from scipy import linalg
+from scipy import sparse
+from scipy.sparse import linalg as sclinalg
+
+from basic.solvers import Factorization
+
+
+def time_function(ft: np.ndarray, lpat: np.ndarray, t: float):
+    """
+    Function to evaluate piecewise linear time functions of load patterns
+    :param ft:   Time functions [lpatID, t, factor] or None (all loads suddenly applied, factor 1.0)
+    :param lpat: Load pattern IDs (nlpat, )
+    :param t:    Time, scalar or (ntime, )
+    :return:     factor - load pattern factors at time t (nlpat, ) or (nlpat, ntime), load patterns without time
+                 function are 1.0
+    """
+    factor = np.ones((lpat.shape[0], ) + np.shape(t))
+    if ft is not None:
+        for i in range(lpat.shape[0]):
+            mask = ft[:, 0] == lpat[i]
+            if np.any(mask):
+                factor[i] = np.interp(t, ft[mask, 1], ft[mask, 2])
+    return factor
+
+
+def newmark(K, M, load, dt: float, nsteps: int, C=None, alpha: float = 0.0, history: np.ndarray = None,
+            u0: np.ndarray = None, v0: np.ndarray = None):
+    """
+    Function to integrate M * a + C * v + K * u = f(t) by HHT-alpha method (Newmark for alpha = 0). Parameters
+    beta = (1 - alpha) ** 2 / 4, gamma = (1 - 2 * alpha) / 2 make the scheme unconditionally stable and second
+    order accurate with numerical damping of high frequencies growing with -alpha. Effective stiffness is
+    constant and factored once, each step is one forward/backward substitution and a few matrix-vector products.
+    :param K:       Reduced stiffness matrix (nfree, nfree)
+    :param M:       Reduced mass matrix (nfree, nfree)
+    :param load:    Load vector as function of time, load(t) -> (nfree, )
+    :param dt:      Time step
+    :param nsteps:  Number of time steps
+    :param C:       Reduced damping matrix (nfree, nfree), None = undamped
+    :param alpha:   HHT parameter <-1/3, 0>
+    :param history: Displacement history (nsteps + 1, nfree) written step by step (e.g. memory mapped), or None
+    :param u0:      Initial displacements (nfree, ), None = zero
+    :param v0:      Initial velocities (nfree, ), None = zero
+    :return:        u, v, a - displacements, velocities and accelerations at the last step (nfree, )
+    """
+    logging.info(f'call newmark({dt}, {nsteps}, {alpha})')
+    if not -1.0 / 3.0 <= alpha <= 0.0:
+        raise ValueError(f'HHT parameter alpha = {alpha} out of range <-1/3, 0>')
+    n = K.shape[0]
+    beta = (1.0 - alpha) ** 2.0 / 4.0
+    gamma = (1.0 - 2.0 * alpha) / 2.0
+    u = np.zeros(n) if u0 is None else np.array(u0, dtype=float)
+    v = np.zeros(n) if v0 is None else np.array(v0, dtype=float)
+
+    # initial accelerations from equilibrium at t = 0
+    f = load(0.0)
+    r = f - K @ u - (0.0 if C is None else C @ v)
+    a = np.zeros(n)
+    if np.any(r != 0.0):
+        try:
+            a = Factorization(M).solve(r)
+        except (RuntimeError, linalg.LinAlgError):
+            logging.warning('Singular mass matrix, initial accelerations set to zero')
+
+    # effective stiffness, factored once
+    c1 = 1.0 / (beta * dt * dt)
+    c2 = (1.0 + alpha) * gamma / (beta * dt)
+    Keff = c1 * M + (1.0 + alpha) * K
+    if C is not None:
+        Keff = Keff + c2 * C
+    factor = Factorization(Keff)
+
+    if history is not None:
+        history[0] = u
+    for step in range(1, nsteps + 1):
+        f1 = load(step * dt)
+        # predictors
+        up = u + dt * v + dt * dt * (0.5 - beta) * a
+        vp = v + dt * (1.0 - gamma) * a
+        rhs = (1.0 + alpha) * f1 - alpha * f + c1 * (M @ up) + alpha * (K @ u)
+        if C is not None:
+            rhs += (1.0 + alpha) * (C @ (gamma / (beta * dt) * up - vp)) + alpha * (C @ v)
+        u = factor.solve(rhs)
+        a = c1 * (u - up)
+        v = vp + gamma * dt * a
+        f = f1
+        if history is not None:
+            history[step] = u
+    return u, v, a
+
+
+def critical_time_step(ke: np.ndarray, md: np.ndarray):
+    """
+    Function to estimate critical time step of central difference method, dt_cr = 2 / omega_max. Highest
+    eigenfrequency of the structure is bounded by the highest element eigenfrequency (Irons), all element
+    eigenproblems are solved at once.
+    :param ke: Stack of element stiffness matrices (nelem, 6, 6)
+    :param md: Element mass matrix diagonals (nelem, 6)
+    :return:   dt_cr - critical time step, eID - element with the highest eigenfrequency (1 based)
+    """
+    logging.info(f'call critical_time_step()')
+    s = 1.0 / np.sqrt(md)
+    omega2 = np.linalg.eigvalsh(ke * s[:, :, None] * s[:, None, :])[:, -1]
+    eID = int(np.argmax(omega2))
+    return 2.0 / math.sqrt(omega2[eID]), eID + 1
+
+
+def central_difference(K, m: np.ndarray, load, dt: float, nsteps: int, damping: float = 0.0, output: int = 1,
+                       history: np.ndarray = None, u0: np.ndarray = None, v0: np.ndarray = None):
+    """
+    Function to integrate m * a + damping * m * v + K * u = f(t) by explicit central difference method.
+    Mass is diagonal, so no equations are solved, internal forces are evaluated element by element (K is
+    ElementOperator), velocities are kept at half steps. Stable for dt < dt_cr only, see critical_time_step().
+    :param K:       Reduced stiffness operator (nfree, nfree), e.g. ElementOperator
+    :param m:       Reduced diagonal mass (nfree, )
+    :param load:    Load vector as function of time, load(t) -> (nfree, )
+    :param dt:      Time step
+    :param nsteps:  Number of time steps
+    :param damping: Mass proportional damping coefficient
+    :param output:  Output interval in time steps
+    :param history: Displacement history (nsteps // output + 1, nfree) written at output steps, or None
+    :param u0:      Initial displacements (nfree, ), None = zero
+    :param v0:      Initial velocities (nfree, ), None = zero
+    :return:        u, v - displacements and velocities at the last step (nfree, )
+    """
+    logging.info(f'call central_difference({dt}, {nsteps}, {output})')
+    n = K.shape[0]
+    u = np.zeros(n) if u0 is None else np.array(u0, dtype=float)
+    v = np.zeros(n) if v0 is None else np.array(v0, dtype=float)
+    minv = 1.0 / m
+    c1 = (1.0 - damping * dt / 2.0) / (1.0 + damping * dt / 2.0)
+    c2 = dt / (1.0 + damping * dt / 2.0)
+
+    # velocity at half step
+    v = v + 0.5 * dt * (minv * (load(0.0) - K @ u) - damping * v)
+    if history is not None:
+        history[0] = u
+    for step in range(1, nsteps + 1):
+        u += dt * v
+        v = c1 * v + c2 * minv * (load(step * dt) - K @ u)
+        if history is not None and step % output == 0:
+            history[step // output] = u
+    # velocity at the last step
+    v = v - 0.5 * dt * (minv * (load(nsteps * dt) - K @ u) - damping * v)
+    return u, v
+
+
+def modal_transient(eigenvalue: np.ndarray, phi: np.ndarray, p: np.ndarray, dt: float, zeta=0.0):
+    """
+    Function to compute transient response by modal superposition. Decoupled equations of mass normalised modes
+    q'' + 2 * zeta * omega * q' + omega ** 2 * q = p(t) are integrated exactly for piecewise linear modal loads
+    (Nigam-Jennings recurrence), all modes at once, physical response is recovered at requested DOFs only.
+    :param eigenvalue: Eigenvalues omega ** 2 (nmodes, )
+    :param phi:        Mass normalised modes at output DOFs (nout, nmodes)
+    :param p:          Modal loads at time steps (nmodes, nsteps + 1), zero initial conditions
+    :param dt:         Time step
+    :param zeta:       Modal damping ratio < 1.0, scalar or (nmodes, )
+    :return:           u - displacement history at output DOFs (nsteps + 1, nout)
+    """
+    logging.info(f'call modal_transient({dt})')
+    omega = np.sqrt(eigenvalue)
+    zeta = np.broadcast_to(np.asarray(zeta, dtype=float), omega.shape)
+    sq = np.sqrt(1.0 - zeta ** 2.0)
+    omegad = omega * sq
+    e = np.exp(-zeta * omega * dt)
+    sn, cs = np.sin(omegad * dt), np.cos(omegad * dt)
+    k = eigenvalue
+    # recurrence coefficients, q[i+1] = a * q[i] + b * v[i] + c * p[i] + d * p[i+1]
+    a = e * (zeta / sq * sn + cs)
+    b = e * sn / omegad
+    c = (2.0 * zeta / (omega * dt) + e * (((1.0 - 2.0 * zeta ** 2.0) / (omegad * dt) - zeta / sq) * sn
+                                          - (1.0 + 2.0 * zeta / (omega * dt)) * cs)) / k
+    d = (1.0 - 2.0 * zeta / (omega * dt) + e * ((2.0 * zeta ** 2.0 - 1.0) / (omegad * dt) * sn
+                                                + 2.0 * zeta / (omega * dt) * cs)) / k
+    # v[i+1] = a_ * q[i] + b_ * v[i] + c_ * p[i] + d_ * p[i+1]
+    a_ = -e * omega / sq * sn
+    b_ = e * (cs - zeta / sq * sn)
+    c_ = (-1.0 / dt + e * ((omega / sq + zeta / (dt * sq)) * sn + cs / dt)) / k
+    d_ = (1.0 - e * (zeta / sq * sn + cs)) / (k * dt)
+
+    q = np.zeros((p.shape[1], omega.shape[0]))
+    v = np.zeros(omega.shape[0])
+    for i in range(p.shape[1] - 1):
+        q[i + 1] = a * q[i] + b * v + c * p[:, i] + d * p[:, i + 1]
+        v = a_ * q[i] + b_ * v + c_ * p[:, i] + d_ * p[:, i + 1]
+
+    return q @ phi.T
+
+
+def modal_harmonic(eigenvalue: np.ndarray, phi: np.ndarray, p: np.ndarray, omega: np.ndarray, zeta=0.0):
+    """
+    Function to compute steady state harmonic response by modal superposition, all frequencies at once,
+    u(omega) = phi * diag(1 / (omega_i ** 2 - omega ** 2 + 2j * zeta_i * omega_i * omega)) * p
+    :param eigenvalue: Eigenvalues omega_i ** 2 (nmodes, )
+    :param phi:        Mass normalised modes at output DOFs (nout, nmodes)
+    :param p:          Modal load amplitudes (nmodes, )
+    :param omega:      Circular excitation frequencies (nfreq, )
+    :param zeta:       Modal damping ratio, scalar or (nmodes, )
+    :return:           u - complex displacement amplitudes at output DOFs (nfreq, nout)
+    """
+    logging.info(f'call modal_harmonic({omega.shape[0]})')
+    omega_i = np.sqrt(eigenvalue)
+    h = 1.0 / (eigenvalue[None, :] - omega[:, None] ** 2.0 + 2.0j * zeta * omega_i[None, :] * omega[:, None])
+    return (h * p[None, :]) @ phi.T
+
+
+def share_array(a: np.ndarray, manager: SharedMemoryManager = None):
+    """
+    Function to copy array into new shared memory block
+    :param a:       Array
+    :param manager: Started shared memory manager owning the block (unlinked at its shutdown),
+                    None = owned by the caller
+    :return:        shm - shared memory block (to be closed, and unlinked by owner), descriptor - (name, shape, dtype)
+    """
+    if manager is None:
+        shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    else:
+        shm = manager.SharedMemory(max(a.nbytes, 1))
+    np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+    return shm, (shm.name, a.shape, a.dtype.str)
+
+
+def attach_array(descriptor: tuple):
+    """
+    Function to attach array in shared memory block without copy, the block is unlinked by its owner only
+    :param descriptor: (name, shape, dtype) from share_array()
+    :return:           shm - shared memory block (to be closed), a - array view of shared memory
+    """
+    name, shape, dtype = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+# matrices of frequency response attached in worker process
+_frequency_response_data = {}
+
+
+def _frequency_response_init(descriptors: dict):
+    """
+    Pool initializer, attaches shared CSR arrays of K, M, C and load vector in worker process
+    """
+    for key, descriptor in descriptors.items():
+        shm, a = attach_array(descriptor)
+        _frequency_response_data[key] = (shm, a)
+
+
+def _frequency_response_matrix(key: str, n: int):
+    if f'{key}.data' not in _frequency_response_data:
+        return None
+    return sparse.csr_matrix((_frequency_response_data[f'{key}.data'][1], _frequency_response_data[f'{key}.indices'][1],
+                              _frequency_response_data[f'{key}.indptr'][1]), shape=(n, n), copy=False)
+
+
+def _frequency_response_chunk(omega: np.ndarray, structural: float = 0.0):
+    """
+    Solves frequency response for a chunk of frequencies from matrices attached by _frequency_response_init()
+    """
+    f = _frequency_response_data['f'][1]
+    dofs = _frequency_response_data['dofs'][1]
+    n = f.shape[0]
+    K = _frequency_response_matrix('K', n)
+    M = _frequency_response_matrix('M', n)
+    C = _frequency_response_matrix('C', n)
+    return frequency_response_solve(K, M, C, f, dofs, omega, structural)
+
+
+def frequency_response_solve(K, M, C, f: np.ndarray, dofs: np.ndarray, omega: np.ndarray, structural: float = 0.0):
+    """
+    Solves frequency response for a chunk of frequencies in this process, see frequency_response()
+    """
+    Kc = K * (1.0 + 1.0j * structural)
+    u = np.zeros((omega.shape[0], dofs.shape[0]), dtype=complex)
+    for i, w in enumerate(omega):
+        A = Kc - w ** 2.0 * M
+        if C is not None:
+            A = A + 1.0j * w * C
+        lu = sclinalg.splu(sparse.csc_matrix(A), permc_spec='MMD_AT_PLUS_A')
+        u[i] = lu.solve(f.astype(complex))[dofs]
+    return u
+
+
+def frequency_response(K, M, f: np.ndarray, omega: np.ndarray, C=None, structural: float = 0.0,
+                       dofs: np.ndarray = None, processes: int = 1):
+    """
+    Function to solve steady state harmonic response (K * (1 + i * g) - omega ** 2 * M + i * omega * C) * u = f
+    directly, one complex sparse factorization per frequency. Frequencies are split into chunks solved by
+    a process pool, matrices are passed to the workers in shared memory (no copies are pickled) owned by
+    a shared memory manager, which releases the blocks even if a worker fails.
+    :param K:          Reduced stiffness matrix (nfree, nfree), sparse
+    :param M:          Reduced mass matrix (nfree, nfree), sparse
+    :param f:          Load amplitudes (nfree, )
+    :param omega:      Circular excitation frequencies (nfreq, )
+    :param C:          Reduced viscous damping matrix (nfree, nfree), sparse, None = undamped
+    :param structural: Structural damping coefficient g
+    :param dofs:       Output DOF indices into reduced vector (nout, ), None = all
+    :param processes:  Number of worker processes, 1 = solved in this process
+    :return:           u - complex displacement amplitudes at output DOFs (nfreq, nout)
+    """
+    logging.info(f'call frequency_response({omega.shape[0]}, {processes})')
+    dofs = np.arange(K.shape[0]) if dofs is None else np.asarray(dofs, dtype=int)
+    f = np.asarray(f, dtype=float)
+    if processes <= 1:
+        # no pool, no shared memory
+        return frequency_response_solve(K, M, C, f, dofs, omega, structural)
+    arrays = {'f': f, 'dofs': dofs}
+    for key, matrix in [('K', K), ('M', M), ('C', C)]:
+        if matrix is not None:
+            matrix = sparse.csr_matrix(matrix)
+            arrays.update({f'{key}.data': matrix.data, f'{key}.indices': matrix.indices,
+                           f'{key}.indptr': matrix.indptr})
+
+    chunks = np.array_split(omega, min(processes * 4, omega.shape[0]))
+    with SharedMemoryManager() as manager:
+        shms = []
+        descriptors = {}
+        try:
+            for key, a in arrays.items():
+                shm, descriptors[key] = share_array(a, manager)
+                shms.append(shm)
+            with multiprocessing.Pool(processes, initializer=_frequency_response_init,
+                                      initargs=(descriptors, )) as pool:
+                u = pool.starmap(_frequency_response_chunk, [(chunk, structural) for chunk in chunks])
+        finally:
+            for shm in shms:
+                shm.close()
+    return np.vstack(u)
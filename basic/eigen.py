@@ -0,0 +1,227 @@
+# python FEM for 2D beams - eigenvalue solvers
+"""
+Eigenvalue solvers of 2D beam structures, shift-invert Lanczos with spectrum slicing, subspace iteration,
+matrix-free eigensolver, linear buckling and eigenfrequency sensitivities
+"""
+
+import math
+import logging
+
+import numpy as np
+from scipy import linalg
+from scipy import sparse
+from scipy.sparse import linalg as sclinalg
+
+from basic.solvers import Factorization, JacobiPreconditioner, pcg
+
+
+def eigen_matrix_free(K, M, modes: int, tol: float = 1.0E-10, preconditioner=None):
+    """
+    Function to solve lowest eigenvalues of K * x = lambda * M * x without global matrices, Lanczos (ARPACK)
+    in shift-invert mode around zero, K^-1 is applied by preconditioned conjugate gradients
+    :param K:              Reduced stiffness operator (ElementOperator or any SPD operator)
+    :param M:              Reduced mass operator
+    :param modes:          Number of eigenvalues
+    :param tol:            Tolerance of inner PCG solves
+    :param preconditioner: Preconditioner of K, None = Jacobi from operator diagonal
+    :return:               eigenvalue - eigenvalues (modes, ), x - eigenvectors (nfree, modes)
+    """
+    logging.info(f'call eigen_matrix_free()')
+    P = JacobiPreconditioner(K) if preconditioner is None else preconditioner
+    OPinv = sclinalg.LinearOperator(K.shape, matvec=lambda x: pcg(K, np.asarray(x).reshape(-1), P, tol=tol)[0],
+                                    dtype=float)
+    return sclinalg.eigsh(K, modes, M, sigma=0.0, which='LM', OPinv=OPinv)
+
+
+def sturm_count(K, M, sigma: float):
+    """
+    Function to count eigenvalues of K * x = lambda * M * x below sigma (Sturm sequence check), equals the number
+    of negative pivots of LDLt factorization of K - sigma * M (Sylvester's law of inertia)
+    :param K:     Reduced stiffness matrix
+    :param M:     Reduced mass matrix
+    :param sigma: Shift
+    :return:      count - number of eigenvalues lower than sigma
+    """
+    logging.info(f'call sturm_count({sigma:.6E})')
+    if sparse.issparse(K):
+        lu = sclinalg.splu(sparse.csc_matrix(K - sigma * M), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                           options=dict(SymmetricMode=True))
+        return int(np.count_nonzero(lu.U.diagonal() < 0.0))
+    else:
+        lu, d, perm = linalg.ldl(K - sigma * M)
+        return int(np.count_nonzero(linalg.eigvalsh(d) < 0.0))
+
+
+def eigen_lanczos(K, M, modes: int = None, freqlim: float = None, shift_modes: int = 40, max_retries: int = 20):
+    """
+    Function to solve lowest eigenvalues of K * x = lambda * M * x by shift-invert Lanczos (ARPACK). Each shift
+    factors K - sigma * M once and extracts the modes nearest to it, wide bands are sliced over several shifts
+    marching upwards, the number of modes below the frequency limit is checked by Sturm sequence count.
+    :param K:           Reduced stiffness matrix (nfree, nfree)
+    :param M:           Reduced mass matrix (nfree, nfree)
+    :param modes:       Number of modes (maximal number if freqlim is given), None = all below freqlim
+    :param freqlim:     Frequency limit [Hz], all modes below it are extracted, None = first modes only
+    :param shift_modes: Number of modes extracted per shift
+    :param max_retries: Maximal number of moved shifts (singular or too far from the lower bound) per accepted shift
+    :return:            eigenvalue - eigenvalues (nmodes, ), x - eigenvectors (nfree, nmodes)
+    """
+    logging.info(f'call eigen_lanczos({modes}, {freqlim})')
+    n = K.shape[0]
+    lambda_max = np.inf if freqlim is None else (2.0 * math.pi * freqlim) ** 2.0
+    if freqlim is not None:
+        count = sturm_count(K, M, lambda_max)
+        logging.info(f'Sturm sequence check: {count:n} modes below {freqlim:.3f} Hz')
+        if modes is not None and modes < count:
+            logging.warning(f'Only {modes:n} of {count:n} modes below {freqlim:.3f} Hz are extracted')
+        modes = count if modes is None else min(modes, count)
+    elif modes is None:
+        raise ValueError('Number of modes or frequency limit must be given')
+    if modes == 0:
+        return np.zeros(0), np.zeros((n, 0))
+    if modes >= n - 1:
+        eigenvalue, x = linalg.eigh(K.toarray() if sparse.issparse(K) else K,
+                                    M.toarray() if sparse.issparse(M) else M)
+        return eigenvalue[:modes], x[:, :modes]
+
+    eigenvalues, vectors = [], []
+    found = 0
+    lower = -np.inf
+    sigma = 0.0
+    retries = 0
+    while found < modes:
+        if retries > max_retries:
+            raise linalg.LinAlgError(f'Lanczos shift not accepted after {max_retries:n} retries '
+                                     f'(last shift {sigma:.6E}, {found:n} of {modes:n} modes found)')
+        k = min(shift_modes, n - 1)
+        try:
+            value, x = sclinalg.eigsh(K, k, M, sigma=sigma, which='LM')
+        except RuntimeError:
+            # singular K - sigma * M (sigma hits eigenvalue or rigid body modes at zero), move the shift
+            sigma = sigma - 1.0E-06 * max(abs(sigma), 1.0)
+            retries += 1
+            continue
+        radius = np.max(np.abs(value - sigma))
+        if np.isfinite(lower) and sigma - radius > lower:
+            # modes between lower bound and this shift might be missed, move shift down
+            sigma = (lower + sigma) / 2.0
+            retries += 1
+            continue
+        retries = 0
+        # all modes in (sigma - radius, sigma + radius) found, the farthest is left for next shift
+        upper = sigma + radius
+        mask = (value >= lower) & (value < upper)
+        eigenvalues.append(value[mask])
+        vectors.append(x[:, mask])
+        found += np.count_nonzero(mask)
+        logging.info(f'shift {sigma:.6E}: {np.count_nonzero(mask):n} modes in [{lower:.6E}, {upper:.6E})')
+        # next bound in the middle of the gap above the last accepted mode, safe against round-off
+        lower = (np.max(value[mask]) + upper) / 2.0 if np.any(mask) else upper
+        if k == n - 1 or upper > lambda_max:
+            break
+        sigma = upper + radius / 2.0
+
+    eigenvalue = np.hstack(eigenvalues)
+    x = np.hstack(vectors)
+    # Sturm sequence check of the sliced spectrum, no mode between the shifts may be missed
+    count = sturm_count(K, M, lower)
+    if count != eigenvalue.shape[0]:
+        logging.warning(f'Sturm sequence check failed: {count:n} modes below {lower:.6E}, '
+                        f'{eigenvalue.shape[0]:n} found')
+    idx = np.argsort(eigenvalue)[:modes]
+    eigenvalue, x = eigenvalue[idx], x[:, idx]
+    if freqlim is not None and eigenvalue.shape[0] < modes:
+        logging.warning(f'Lanczos found {eigenvalue.shape[0]:n} of {modes:n} modes below {freqlim:.3f} Hz')
+    return eigenvalue, x
+
+
+def eigen_subspace(K, M, modes: int, x0: np.ndarray = None, tol: float = 1.0E-10, maxiter: int = 100,
+                   factor=None):
+    """
+    Function to solve lowest eigenvalues of K * x = lambda * M * x by subspace iteration (Bathe). K is factored
+    once, each iteration is one block solve and a Rayleigh-Ritz projection onto the iterated subspace.
+    Seeded by eigenvectors of a previous (slightly changed) model it converges in a few iterations.
+    :param K:       Reduced stiffness matrix (nfree, nfree)
+    :param M:       Reduced mass matrix (nfree, nfree)
+    :param modes:   Number of modes
+    :param x0:      Starting vectors (nfree, nseed), e.g. eigenvectors from a previous run, None = random
+    :param tol:     Relative change of eigenvalues for convergence
+    :param maxiter: Maximal number of iterations
+    :param factor:  Factorization of K (reused), None = factored here
+    :return:        eigenvalue - eigenvalues (modes, ), x - eigenvectors (nfree, modes), number of iterations
+    """
+    logging.info(f'call eigen_subspace({modes})')
+    n = K.shape[0]
+    # subspace dimension, a few vectors more than modes speeds up convergence of the highest requested modes
+    q = min(max(2 * modes, modes + 8), n)
+    factor = Factorization(K) if factor is None else factor
+    x = np.random.default_rng(0).random((n, q)) - 0.5
+    if x0 is not None:
+        nseed = min(x0.shape[1], q)
+        x[:, :nseed] = x0[:, :nseed]
+    eigenvalue = np.zeros(q)
+    for iteration in range(1, maxiter + 1):
+        y = M @ x
+        xb = factor.solve(y)
+        # projection onto subspace, K * xb = M * x
+        kr = xb.T @ y
+        mr = xb.T @ (M @ xb)
+        value, q_r = linalg.eigh((kr + kr.T) / 2.0, (mr + mr.T) / 2.0)
+        x = xb @ q_r
+        change = np.max(np.abs(value[:modes] - eigenvalue[:modes]) / np.abs(value[:modes]))
+        eigenvalue = value
+        logging.debug('subspace iteration %d: relative change %.3E', iteration, change)
+        if change < tol:
+            break
+    else:
+        logging.warning(f'Subspace iteration did not converge in {maxiter:n} iterations (change {change:.3E})')
+    logging.info(f'Subspace iteration converged in {iteration:n} iterations')
+    return eigenvalue[:modes], x[:, :modes], iteration
+
+
+def eigen_buckling(K, Kg, modes: int = 1, factor=None, sigma: float = None):
+    """
+    Function to solve lowest critical load factors of (K + lambda * Kg) * x = 0 by shift-invert Lanczos.
+    Without shift the problem is inverted about zero, -Kg * x = 1 / lambda * K * x, which needs only the
+    factorization of K (reused from linear static step), otherwise K - sigma * (-Kg) is factored (buckling mode).
+    :param K:      Reduced stiffness matrix (nfree, nfree), positive definite
+    :param Kg:     Reduced initial stress (geometric stiffness) matrix (nfree, nfree)
+    :param modes:  Number of critical load factors
+    :param factor: Factorization of K (reused), None = factored here
+    :param sigma:  Shift, load factors nearest to sigma are solved, None = lowest positive load factors
+    :return:       load_factor - critical load factors (modes, ), x - buckling shapes (nfree, modes)
+    """
+    logging.info(f'call eigen_buckling({modes}, {sigma})')
+    n = K.shape[0]
+    if sigma is not None:
+        load_factor, x = sclinalg.eigsh(K, modes, -Kg, sigma=sigma, which='LM', mode='buckling')
+    else:
+        factor = Factorization(K) if factor is None else factor
+        Kinv = sclinalg.LinearOperator((n, n), matvec=factor.solve, matmat=factor.solve, dtype=float)
+        # largest positive 1 / lambda are the lowest positive critical load factors
+        mu, x = sclinalg.eigsh(-Kg, modes, K, Minv=Kinv, which='LA')
+        if np.any(mu <= 0.0):
+            logging.warning(f'Only {np.count_nonzero(mu > 0.0):n} positive critical load factors found')
+        mask = mu > 0.0
+        load_factor, x = 1.0 / mu[mask], x[:, mask]
+    idx = np.argsort(load_factor)
+    return load_factor[idx], x[:, idx]
+
+
+def frequency_sensitivity(eigenvalue: np.ndarray, phi: np.ndarray, lme: np.ndarray, dke: np.ndarray,
+                          dme: np.ndarray):
+    """
+    Function to compute sensitivities of circular eigenfrequencies for all elements in one pass,
+    d(lambda)/dp_e = phi_e^T (dke/dp - lambda dme/dp) phi_e, d(omega) = d(lambda) / (2 omega),
+    valid for distinct eigenvalues only
+    :param eigenvalue: Eigenvalues lambda = omega^2 (nmodes, )
+    :param phi:        Mass normalised eigenvectors (ndofs, nmodes)
+    :param lme:        Elemental localisation matrix
+    :param dke:        Derivatives of element stiffness matrices (..., nelem, 6, 6)
+    :param dme:        Derivatives of element mass matrices (..., nelem, 6, 6)
+    :return:           domega - sensitivities of circular frequencies (..., nelem, nmodes)
+    """
+    logging.info(f'call frequency_sensitivity()')
+    pe = np.concatenate((np.zeros((1, phi.shape[1])), phi))[lme]
+    dk = np.einsum('eim,...eij,ejm->...em', pe, dke, pe, optimize=True)
+    dm = np.einsum('eim,...eij,ejm->...em', pe, dme, pe, optimize=True)
+    return (dk - eigenvalue * dm) / (2.0 * np.sqrt(eigenvalue))
@@ -0,0 +1,442 @@
+# python FEM for 2D beams - input and output
+"""
+Input and output of 2D beam analyses, .dat files with binary cache, columnar results store and g.ini options
+"""
+
+import os
+import io
+import tempfile
+import hashlib
+import json
+import re
+from configparser import ConfigParser
+import logging
+
+import numpy as np
+
+
+# binary cache of parsed .dat files, 'use' (map cache, parse and store if missing or stale),
+# 'rebuild' (parse and store always) or 'off' (parse only)
+DAT_CACHE = 'use'
+# cache directory, input directories are never written to (read-only input trees)
+DAT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+                             'pyfea', 'dat')
+# .dat files larger than this [bytes] are parsed by streaming reader block by block
+DAT_STREAM_SIZE = 64 * 1024 * 1024
+
+
+def file_hash(file: str):
+    """
+    Function to compute content hash of a file read in blocks
+    :param file: Filename
+    :return:     key - sha256 hex digest
+    """
+    h = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dat_cache_path(file: str):
+    """
+    Function to get base name of binary cache files of dat file in DAT_CACHE_DIR, files of different directories
+    are told apart by hash of the absolute path
+    :param file: Filename of dat file
+    :return:     Cache path without extension (.npy array, .json metadata)
+    """
+    path = os.path.abspath(file)
+    return os.path.join(DAT_CACHE_DIR, hashlib.sha256(path.encode()).hexdigest()[:16] + '_' + os.path.basename(path))
+
+
+def dat_cache_read(file: str, dtype: type = float):
+    """
+    Function to map binary cache of dat file (.npy with metadata .json in DAT_CACHE_DIR), the cache is valid
+    if size and mtime of the dat file match, if only mtime changed the content hash decides
+    :param file:  Filename of dat file
+    :param dtype: Data type of returned numpy array
+    :return:      Copy-on-write memory map of cached array or None if cache is missing or stale
+    """
+    cache = dat_cache_path(file)
+    npy, meta = cache + '.npy', cache + '.json'
+    if not (os.path.exists(npy) and os.path.exists(meta)):
+        return None
+    try:
+        with open(meta, 'r') as f:
+            info = json.load(f)
+        stat = os.stat(file)
+        if info['size'] != stat.st_size or info['dtype'] != np.dtype(dtype).str:
+            return None
+        if info['mtime'] != stat.st_mtime_ns:
+            # touched, content decides
+            sha256 = file_hash(file)
+            if info['sha256'] != sha256:
+                return None
+            m = np.load(npy, mmap_mode='c')
+            if m.dtype != np.dtype(dtype):
+                return None
+            try:
+                dat_cache_meta(file, m, stat, sha256)
+            except OSError as e:
+                logging.warning(f'Cache metadata of {file} not updated: {e}')
+            return m
+        m = np.load(npy, mmap_mode='c')
+        return m if m.dtype == np.dtype(dtype) else None
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f'Cache of {file} not used: {e}')
+        return None
+
+
+def dat_cache_meta(file: str, m: np.ndarray, stat: os.stat_result, sha256: str = None):
+    """
+    Function to write metadata of binary cache of dat file (.json) atomically, the cache is valid from now on,
+    metadata is not written if the dat file changed after stat was taken (the cache may not match its content)
+    :param file:   Filename of dat file
+    :param m:      Parsed array
+    :param stat:   Status of dat file before parsing
+    :param sha256: Content hash computed after stat, None = computed now
+    :return:       True if metadata was written
+    """
+    sha256 = file_hash(file) if sha256 is None else sha256
+    now = os.stat(file)
+    if (now.st_size, now.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+        logging.warning(f'{file} changed while reading, cache not written')
+        return False
+    info = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': sha256, 'dtype': m.dtype.str,
+            'shape': list(m.shape)}
+    with tempfile.NamedTemporaryFile('w', dir=DAT_CACHE_DIR, suffix='.json', delete=False) as f:
+        json.dump(info, f)
+    os.replace(f.name, dat_cache_path(file) + '.json')
+    return True
+
+
+def dat_cache_invalidate(file: str):
+    """
+    Function to remove metadata of binary cache of dat file before the cache is replaced, the cache is not
+    used until new metadata is written
+    :param file: Filename of dat file
+    """
+    meta = dat_cache_path(file) + '.json'
+    if os.path.exists(meta):
+        os.remove(meta)
+
+
+def dat_cache_write(file: str, m: np.ndarray, stat: os.stat_result):
+    """
+    Function to store parsed dat file as binary cache in DAT_CACHE_DIR, files are replaced atomically,
+    unwritable cache directory is skipped
+    :param file: Filename of dat file
+    :param m:    Parsed array
+    :param stat: Status of dat file before parsing
+    """
+    try:
+        os.makedirs(DAT_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=DAT_CACHE_DIR, suffix='.npy', delete=False) as f:
+            np.save(f, m)
+        dat_cache_invalidate(file)
+        os.replace(f.name, dat_cache_path(file) + '.npy')
+        dat_cache_meta(file, m, stat)
+    except OSError as e:
+        logging.warning(f'Cache of {file} not written: {e}')
+
+
+def load_dat_stream(file: str, dtype: type = float, out: str = None, block: int = 4 * 1024 * 1024):
+    """
+    Function to load dat file block by block (comments '#', whitespace separated columns), the number of rows
+    is counted first and the typed array is allocated once (in memory or memory mapped .npy file), each block
+    is parsed at once and its column count is validated, peak memory is the array plus one block of text
+    :param file:  Filename to read
+    :param dtype: Data type of returned numpy array
+    :param out:   Filename of .npy file the array is mapped to, None = array in memory
+    :param block: Approximate size of text block [bytes]
+    :return:      Numpy Array of read Data (nrows, ncols), memory map if out is given
+    """
+    logging.info(f'call load_dat_stream({file})')
+
+    comment = re.compile(rb'#[^\n]*')
+    blank = re.compile(rb'^[ \t\r\f\v]*\n', re.MULTILINE)
+    whitespace = np.zeros(256, dtype=bool)
+    whitespace[np.frombuffer(b' \t\n\r\f\v', dtype=np.uint8)] = True
+
+    def blocks(f):
+        # blocks of whole data lines, comments and empty lines dropped, number of lines
+        while True:
+            text = f.read(block)
+            if not text:
+                return
+            text += f.readline()
+            if not text.endswith(b'\n'):
+                text += b'\n'
+            if b'#' in text:
+                text = comment.sub(b'', text)
+            text = blank.sub(b'', text)
+            yield text, text.count(b'\n')
+
+    # first pass, number of rows and columns
+    rows, cols = 0, None
+    with open(file, 'rb') as f:
+        for text, n in blocks(f):
+            if cols is None and n > 0:
+                cols = len(text[:text.index(b'\n')].split())
+            rows += n
+    cols = 1 if cols is None else cols
+
+    if out is None:
+        m = np.empty((rows, cols), dtype=dtype)
+    else:
+        m = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=(rows, cols))
+
+    # second pass, blocks parsed into preallocated array
+    integer = np.issubdtype(np.dtype(dtype), np.integer)
+    size = max(os.path.getsize(file), 1)
+    row, reported = 0, 0
+    with open(file, 'rb') as f:
+        for text, n in blocks(f):
+            if n == 0:
+                continue
+            # fields of every line, token starts counted between newline offsets
+            chars = np.frombuffer(text, dtype=np.uint8)
+            space = whitespace[chars]
+            starts = np.cumsum(~space[1:] & space[:-1], dtype=np.int64)
+            fields = np.diff(starts[np.flatnonzero(chars[1:] == ord('\n'))], prepend=-int(not space[0]))
+            wrong = np.flatnonzero(fields != cols)
+            if wrong.shape[0] > 0:
+                raise ValueError(f'{file}: data row {row + wrong[0] + 1:n} has {fields[wrong[0]]:n} columns, '
+                                 f'expected {cols:n}')
+            try:
+                if integer and any(c in text for c in (b'.', b'e', b'E')):
+                    # loadtxt would truncate floats to integers (deprecated)
+                    raise ValueError('floating point value in integer data')
+                m[row:row + n] = np.loadtxt(io.BytesIO(text), dtype=dtype, comments=None, ndmin=2)
+            except ValueError as e:
+                raise ValueError(f'{file}: data rows {row + 1:n} to {row + n:n} are not '
+                                 f'{np.dtype(dtype).name} ({e})') from e
+            row += n
+            progress = int(100 * f.tell() / size)
+            if progress >= reported + 10:
+                reported = progress - progress % 10
+                logging.info(f'read {file} {reported:3n} % ({row:n} rows)')
+
+    if out is not None:
+        m.flush()
+    return m
+
+
+def dat_cache_stream(file: str, dtype: type, stat: os.stat_result):
+    """
+    Function to parse dat file by streaming reader directly into binary cache in DAT_CACHE_DIR (files larger
+    than memory), the cache is valid once renamed and its metadata written, unwritable cache directory is skipped
+    :param file:  Filename of dat file
+    :param dtype: Data type of returned numpy array
+    :param stat:  Status of dat file before parsing
+    :return:      Copy-on-write memory map of cached array or None if cache could not be written
+    """
+    temporary = None
+    npy = dat_cache_path(file) + '.npy'
+    try:
+        os.makedirs(DAT_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=DAT_CACHE_DIR, suffix='.npy', delete=False) as f:
+            temporary = f.name
+        del f
+        load_dat_stream(file, dtype, temporary)
+        dat_cache_invalidate(file)
+        os.replace(temporary, npy)
+        temporary = None
+        m = np.load(npy, mmap_mode='c')
+        dat_cache_meta(file, m, stat)
+        return m
+    except OSError as e:
+        logging.warning(f'Cache of {file} not written: {e}')
+        return None
+    finally:
+        if temporary is not None and os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_dat(file: str, dtype: type = float, cache: str = None):
+    """
+    Function to load dat file as numpy array, parsed arrays are cached in binary format in DAT_CACHE_DIR
+    (.npy + .json) and mapped on later runs, files larger than DAT_STREAM_SIZE are parsed by streaming
+    reader (directly into the memory mapped cache if enabled)
+    :param file:  Filename to read
+    :param dtype: Data type of returned numpy array
+    :param cache: 'use', 'rebuild' or 'off', None = DAT_CACHE
+    :return:      Numpy Array of read Data
+    """
+    cache = DAT_CACHE if cache is None else cache
+    if cache == 'use':
+        m = dat_cache_read(file, dtype)
+        if m is not None:
+            logging.info(f'read {file} (cache)')
+            return m
+    logging.info(f'read {file}')
+    try:
+        stat = os.stat(file)
+        if stat.st_size > DAT_STREAM_SIZE:
+            m = dat_cache_stream(file, dtype, stat) if cache != 'off' else None
+            return load_dat_stream(file, dtype) if m is None else m
+        m = np.loadtxt(file, ndmin=2, dtype=dtype, comments=('#'))
+        if cache != 'off':
+            dat_cache_write(file, m, stat)
+        return m
+    except Exception as e:
+        logging.exception(f'Failed reading {file}')
+
+
+def results_init(directory: str, solver: str):
+    """
+    Function to start columnar results store of an analysis, result sets of a previous analysis are removed,
+    every result set is written as one .npy file per column listed in directory/manifest.json
+    :param directory: Results directory, created if it does not exist
+    :param solver:    Solver name stored in manifest
+    """
+    logging.info(f'call results_init({directory}, {solver})')
+    os.makedirs(directory, exist_ok=True)
+    manifest = os.path.join(directory, 'manifest.json')
+    if os.path.exists(manifest):
+        with open(manifest, 'r') as f:
+            old = json.load(f)
+        for entry in old['sets'].values():
+            for file in [entry['ids']] + ([] if entry['cases'] is None else [entry['cases']]) \
+                    + [c['file'] for c in entry['columns'].values()]:
+                if os.path.exists(os.path.join(directory, file)):
+                    os.remove(os.path.join(directory, file))
+    results_manifest(directory, {'version': 1, 'solver': solver, 'sets': {}})
+
+
+def results_manifest(directory: str, manifest: dict):
+    """
+    Function to replace manifest of results store atomically
+    :param directory: Results directory
+    :param manifest:  Manifest {version, solver, sets}
+    """
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.json', delete=False) as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f.name, os.path.join(directory, 'manifest.json'))
+
+
+def results_write(directory: str, name: str, ids: np.ndarray, columns: dict, cases: np.ndarray = None,
+                  id_name: str = 'ID', case_name: str = 'case'):
+    """
+    Function to write result set to columnar results store, each column is stored as typed .npy file
+    (ncases, nrows) so that one load case or mode is a contiguous block, rows are indexed by ids
+    :param directory: Results directory (results_init called before)
+    :param name:      Result set name e.g. 'nodal displacements'
+    :param ids:       Row IDs (nrows, ) e.g. node or element IDs
+    :param columns:   {column name: values (nrows, ncases) or (nrows, ) if cases is None}
+    :param cases:     Case IDs (ncases, ) e.g. load patterns or modes, None = no case axis
+    :param id_name:   Name of row IDs e.g. 'nID'
+    :param case_name: Name of case IDs e.g. 'mode'
+    """
+    logging.info(f'call results_write({directory}, {name})')
+    prefix = re.sub(r'\W+', '_', name)
+
+    def save(column, values):
+        file = prefix + '.' + re.sub(r'[^\w.-]+', '_', column) + '.npy'
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.npy', delete=False) as f:
+            np.save(f, np.ascontiguousarray(values))
+        os.replace(f.name, os.path.join(directory, file))
+        return file
+
+    ids = np.asarray(ids)
+    entry = {'rows': ids.shape[0], 'id': id_name, 'ids': save(id_name, ids), 'case': None, 'cases': None,
+             'columns': {}}
+    if cases is not None:
+        cases = np.asarray(cases)
+        entry.update({'case': case_name, 'cases': save(case_name, cases), 'ncases': cases.shape[0]})
+    for column, values in columns.items():
+        values = np.asarray(values)
+        if values.shape[0] != ids.shape[0] or (cases is not None and values.shape[1:] != cases.shape):
+            raise ValueError(f'Column {column} of result set {name} has shape {values.shape}, '
+                             f'expected ({ids.shape[0]}{"" if cases is None else f", {cases.shape[0]}"})')
+        entry['columns'][column] = {'file': save(column, values.T), 'dtype': values.dtype.str}
+    with open(os.path.join(directory, 'manifest.json'), 'r') as f:
+        manifest = json.load(f)
+    manifest['sets'][name] = entry
+    results_manifest(directory, manifest)
+
+
+def results_read(directory: str, name: str, columns: list = None, ids: np.ndarray = None,
+                 cases: np.ndarray = None):
+    """
+    Function to read result set from columnar results store, column files are memory mapped and only
+    the requested slices are read
+    :param directory: Results directory
+    :param name:      Result set name e.g. 'mode shapes'
+    :param columns:   Column names, None = all
+    :param ids:       Row IDs to read, None = all
+    :param cases:     Case IDs to read, None = all
+    :return:          {id name: row IDs, case name: case IDs, column name: values (ncases, nrows) or (nrows, )},
+                      columns are read only memory maps if neither ids nor cases are given
+    """
+    logging.info(f'call results_read({directory}, {name})')
+    with open(os.path.join(directory, 'manifest.json'), 'r') as f:
+        manifest = json.load(f)
+    if name not in manifest['sets']:
+        raise ValueError(f'Result set {name} not in {directory}, available: {", ".join(manifest["sets"].keys())}')
+    entry = manifest['sets'][name]
+
+    def locate(stored, requested, label):
+        # positions of requested IDs in stored IDs
+        requested = np.atleast_1d(requested)
+        order = np.argsort(stored, kind='stable')
+        position = np.searchsorted(stored[order], requested)
+        position[position == stored.shape[0]] = 0
+        missing = requested[stored[order][position] != requested]
+        if missing.shape[0] > 0:
+            raise ValueError(f'{label} {missing.tolist()} not in result set {name}')
+        return order[position]
+
+    retval = {}
+    stored = np.load(os.path.join(directory, entry['ids']))
+    rows = slice(None) if ids is None else locate(stored, ids, entry['id'])
+    retval[entry['id']] = stored[rows]
+    index = rows
+    if entry['cases'] is not None:
+        stored = np.load(os.path.join(directory, entry['cases']))
+        select = slice(None) if cases is None else locate(stored, cases, entry['case'])
+        retval[entry['case']] = stored[select]
+        index = (select, rows) if ids is None or cases is None else np.ix_(select, rows)
+    elif cases is not None:
+        raise ValueError(f'Result set {name} has no cases')
+    for column in entry['columns'].keys() if columns is None else columns:
+        if column not in entry['columns']:
+            raise ValueError(f'Column {column} not in result set {name}, '
+                             f'available: {", ".join(entry["columns"].keys())}')
+        m = np.load(os.path.join(directory, entry['columns'][column]['file']), mmap_mode='r')
+        retval[column] = m if ids is None and cases is None else m[index]
+    return retval
+
+
+def config_option(cfg: ConfigParser, section: str, key: str, fallback: str = None):
+    """
+    Function to read option from g.ini, solver section first, then DEFAULT section
+    :param cfg:      Parsed g.ini
+    :param section:  Section name (usually solver name)
+    :param key:      Option name
+    :param fallback: Value returned if option is not defined
+    :return:         Option value as string (stripped) or fallback
+    """
+    if section in cfg.sections():
+        value = cfg.get(section, key, fallback=fallback)
+    else:
+        value = cfg['DEFAULT'].get(key, fallback)
+    if isinstance(value, str):
+        value = value.strip()
+    return value
+
+
+def config_output(cfg: ConfigParser, section: str, key: str, fallback: str, directory: str):
+    """
+    Function to read output file path from g.ini, relative paths are taken from the structure directory
+    :param cfg:       Parsed g.ini
+    :param section:   Section name (usually solver name)
+    :param key:       Option name
+    :param fallback:  File name used if option is not defined
+    :param directory: Structure directory
+    :return:          Output file path or None if option is 'none' (output disabled)
+    """
+    path = config_option(cfg, section, key, fallback)
+    if path == 'none':
+        return None
+    return os.path.join(directory, os.path.expanduser(path))
@@ -0,0 +1,239 @@
+# python FEM for 2D beams - reporting
+"""
+Reporting of 2D beam analyses, vectors, tables and matrices are logged in fixed width columns, long tables are
+capped in the log and written in full to REPORT_FILE
+"""
+
+import math
+import re
+import warnings
+import logging
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg as sclinalg
+
+from misc.helpfunc import fixed_chars, format_eng_array
+
+
+# tables longer than LOG_ROWS are logged as head and tail rows with column summary,
+# full tables are written to REPORT_FILE if set (g.ini option report)
+LOG_ROWS = 40
+REPORT_FILE = None
+
+
+def format_norm(value, format_spec):
+    return format_spec.format(value)
+
+
+def format_eng(value, format_spec: str = ' {0:9.3f}E{1:+03n}'):
+    try:
+        if value == 0.0:
+            return format_spec.format(0.0, 0)
+        exponent = int(math.log10(abs(value)))
+        exponent = exponent - exponent % 3
+        mantissa = value / (10 ** exponent)
+        return format_spec.format(mantissa, exponent)
+    except OverflowError as e:
+        logging.exception(e)
+        return str('{0:' + str(len(format_eng(1.1, format_spec))) + 'n}').format(np.infty)
+    except ValueError as e:
+        logging.exception(e)
+        return str('{0:' + str(len(format_eng(1.1, format_spec))) + 'n}').format(np.nan)
+
+
+FIXED_SPEC = re.compile(r'^(?P<prefix> *)\{0:(?P<width>\d+)(?:\.(?P<precision>\d+)f|n|d)\}$')
+
+
+def format_norm_array(a: np.ndarray, format_spec: str):
+    """
+    Function to format array of values by format_norm for all values at once, fixed point and integer formats
+    '{0:16.5f}', '{0:8n}' are written as fixed width columns, others value by value
+    :param a:           Values of any shape
+    :param format_spec: String with format e.g.: ' {0:16.5f}'
+    :return:            s - array of strings of the same shape as a
+    """
+    a = np.asarray(a)
+    match = FIXED_SPEC.match(format_spec)
+    if match is None or not np.issubdtype(a.dtype, np.number) \
+            or (match['precision'] is None and not np.issubdtype(a.dtype, np.integer)):
+        return np.array([format_norm(v, format_spec) for v in a.ravel()], dtype=str).reshape(a.shape)
+    values = a.ravel().astype(float)
+    chars, regular = fixed_chars(values, int(match['width']), int(match['precision'] or 0))
+    prefix = np.frombuffer(match['prefix'].encode(), dtype=np.uint8)[None, :].repeat(values.shape[0], axis=0)
+    chars = np.hstack((prefix, chars))
+    s = np.ascontiguousarray(chars).view(f'S{chars.shape[1]}').ravel().astype(str)
+    irregular = np.where(~regular)[0]
+    if irregular.shape[0] > 0:
+        s = s.astype(object)
+        flat = a.ravel()
+        for i in irregular:
+            s[i] = format_norm(flat[i], format_spec)
+        s = s.astype(str)
+    return s.reshape(a.shape)
+
+
+def logging_array(title: str, arr: np.ndarray, header_list: list, dtype: list = None, eng: bool = False,
+                  level: int = logging.INFO):
+    """
+    Function to print numpy ndarray to logger, int is printed as %8n, float as %16.5f, row number is printed
+    also, 1 based. Nothing is formatted unless the level is enabled or REPORT_FILE is set, tables longer than
+    LOG_ROWS are logged as head and tail rows with column minima and maxima, full table goes to REPORT_FILE.
+    :param title:       Data Title to be printed
+    :param arr:         2D Data Array
+    :param header_list: List of Column Names
+    :param dtype:       List of column types for print (str/int/float/eng) eng is  for engineering format 1.0E+03
+    :param eng:         True/False, if True, floats are printed in engineering format %8.3fE%+03d, False %16.5f
+    :param level:       Logging level of the table
+    :return: None
+    """
+    enabled = logging.getLogger().isEnabledFor(level)
+    if not enabled and REPORT_FILE is None:
+        return
+    fmth = []
+    fmtv = []
+    if dtype is None:
+        fmth.append('  {0:^8s}')
+        fmtv.append([format_norm, '  {0:8n}'])
+        for i, val in enumerate(arr[0]):
+            if 'int' in type(val).__name__:
+                fmth.append(' {0:^8s}')
+                fmtv.append([format_norm, ' {0:8n}'])
+            elif 'float' in type(val).__name__:
+                if eng:
+                    fmth.append(' {0:^12s}')
+                    fmtv.append([format_eng, ' {0:8.3f}E{1:+03n}'])
+                else:
+                    fmth.append(' {0:^16s}')
+                    fmtv.append([format_norm, ' {0:16.5f}'])
+            else:
+                fmth.append(' {0:^16s}')
+                fmtv.append([format_norm, ' {0:16s}'])
+    else:
+        for dt in dtype:
+            if dt == 'int':
+                fmth.append(' {0:^8s}')
+                fmtv.append([format_norm, ' {0:8n}'])
+            elif dt == 'float':
+                if eng:
+                    fmth.append(' {0:^12s}')
+                    fmtv.append([format_eng, ' {0:8.3f}E{1:+03n}'])
+                else:
+                    fmth.append(' {0:^10s}')
+                    fmtv.append([format_norm, ' {0:10.1f}'])
+            elif dt == 'eng':
+                fmth.append(' {0:^12s}')
+                fmtv.append([format_eng, ' {0:8.3f}E{1:+03n}'])
+            elif dt == 'str':
+                fmth.append(' {0:^16s}')
+                fmtv.append([format_norm, ' {0:16s}'])
+            else:
+                if 'E' in dt:
+                    length = len(format_eng(1.1, dt))
+                    fmtv.append([format_eng, dt])
+                else:
+                    length = len(dt.format(1.1))
+                    fmtv.append([format_norm, dt])
+                fmth.append(' {0:^' + str(length) + 's}')
+            fmth[0] = ' ' + fmth[0]
+            fmtv[0][1] = ' ' + fmtv[0][1]
+
+    if type(header_list[0]) == list:
+        header = ''
+        for hl in header_list:
+            header += '\n' + ''.join([fmth[i].format(hl[i]) for i in range(len(hl))])
+            delimit = '\n ' + (len(header) - 1) * '-'
+            header = header.rstrip(' ')
+    else:
+        header = '\n' + ''.join([fmth[i].format(header_list[i]) for i in range(len(header_list))])
+        delimit = '\n ' + (len(header) - 1) * '-'
+        header = header.rstrip(' ')
+
+    def column(values, formatter, format_spec):
+        # whole column at once, values which are not numbers one by one
+        if formatter is format_eng and np.issubdtype(values.dtype, np.number):
+            return format_eng_array(values, format_spec).tolist()
+        elif formatter is format_norm:
+            return format_norm_array(values, format_spec).tolist()
+        return [formatter(v, format_spec) for v in values]
+
+    def rows(index):
+        index = np.asarray(index, dtype=int)
+        columns = [column(index + 1, *fmtv[0])]
+        columns.extend([column(arr[index, j], *fmtv[j + 1]) for j in range(arr.shape[1])])
+        return ['\n' + ''.join(row) for row in zip(*columns)]
+
+    nrows = arr.shape[0]
+    if REPORT_FILE is not None:
+        # full table, written in blocks of rows
+        with open(REPORT_FILE, 'a') as f:
+            f.write(f' >>> {title}:\n{delimit}{header}{delimit}')
+            for start in range(0, nrows, 65536):
+                f.write(''.join(rows(range(start, min(start + 65536, nrows)))))
+            f.write(f'{delimit}\n\n')
+    if not enabled:
+        return
+
+    if nrows > LOG_ROWS:
+        message = rows(range(LOG_ROWS // 2))
+        message.append(f'\n  ... {nrows - 2 * (LOG_ROWS // 2):n} rows omitted'
+                       + ('' if REPORT_FILE is None else f', full table in {REPORT_FILE}'))
+        message.extend(rows(range(nrows - LOG_ROWS // 2, nrows)))
+        if np.issubdtype(arr.dtype, np.number):
+            # column summary of all rows, nan ignored
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                summary = [('min', np.nanmin(arr, axis=0)), ('max', np.nanmax(arr, axis=0))]
+            message.append(delimit)
+            for label, value in summary:
+                message.append('\n' + fmth[0].format(label)
+                               + ''.join([column(value[j:j + 1], *fmtv[j + 1])[0] for j in range(arr.shape[1])]))
+    else:
+        message = rows(range(nrows))
+    logging.log(level, ' >>> %s:\n%s\n', title, ''.join([delimit, header, delimit] + message + [delimit]))
+
+
+def logging_table(title: str, arr: list, fmt: str = '8n', level: int = logging.INFO):
+    """
+    Function to print 2D array of 2 columns to logger
+    :param title: Data Title to be printed
+    :param arr:   2-column array of data to be printed
+    :param fmt:   Python print format specifier (usually in curly brackets) for 2nd column, {0:8n} -> 8n
+    :param level: Logging level of the table
+    :return:      None
+    """
+    if not logging.getLogger().isEnabledFor(level):
+        return
+    fmtv = '  {0:16s} = {1:' + fmt + '}'
+    message = ['']
+    for i in range(len(arr)):
+        message.append(fmtv.format(arr[i][0], arr[i][1]))
+    delimit = ' ' + len(message[1]) * '-'
+    message[0] = delimit
+    message.append(delimit)
+    message = '\n' + '\n'.join(message)
+    logging.log(level, ' >>> %s:\n%s\n', title, message)
+
+
+def logging_matrix(title: str, K):
+    """
+    Function to print global matrix to logger as a summary, dense matrix (debugging) is printed in full
+    at debug level (capped by LOG_ROWS, full to REPORT_FILE)
+    :param title: Data Title to be printed
+    :param K:     Global matrix (numpy ndarray, scipy sparse matrix or object with summary() of its storage)
+    :return:      None
+    """
+    if not logging.getLogger().isEnabledFor(logging.INFO) and (REPORT_FILE is None or sparse.issparse(K)):
+        return
+    if sparse.issparse(K):
+        logging_table(title, [['rows', K.shape[0]], ['columns', K.shape[1]], ['nonzeros', K.nnz],
+                              ['norm', sclinalg.norm(K)]])
+    elif hasattr(K, 'summary'):
+        # skyline, frontal or matrix-free storage
+        logging_table(title, [['rows', K.shape[0]], ['columns', K.shape[1]]] + K.summary())
+    else:
+        logging_table(title, [['rows', K.shape[0]], ['columns', K.shape[1]], ['nonzeros', np.count_nonzero(K)],
+                              ['norm', np.linalg.norm(K)]])
+        tmp = ['DOF']
+        tmp.extend(['{0:n}'.format(i) for i in range(K.shape[0])])
+        logging_array(title, K, tmp, eng=True, level=logging.DEBUG)
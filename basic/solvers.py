@@ -0,0 +1,1186 @@
+# python FEM for 2D beams - assembly and solvers
+"""
+Global matrices of 2D beam structures, assembly, DOF ordering, direct (sparse, skyline, frontal) and iterative
+(preconditioned conjugate gradients) solvers, reanalysis and static sensitivities
+"""
+
+import os
+import math
+import tempfile
+import heapq
+import logging
+
+import numpy as np
+from scipy import linalg
+from scipy import sparse
+from scipy.sparse import linalg as sclinalg
+from scipy.sparse import csgraph
+
+
+def assemble(lm: np.ndarray, K: np.ndarray, ke: np.ndarray, eID: int):
+    """
+    Function for localisation of element matrix into global matrix
+    :param lm:  Array of code numbers
+    :param K:   Global matrix
+    :param ke:  Element matrix
+    :param eID: Element ID (1 based)
+    :return:    K - Global stiffness matrix
+    """
+    logging.info(f'call assemble() element {eID}')
+    logging.debug('call assemble(%s, %s, %s, %s)', lm, K, ke, eID)
+    ndof = ke.shape[0]
+    for i in range(ndof):
+        ia = lm[eID - 1][i]
+        if ia != 0:
+            for j in range(ndof):
+                ja = lm[eID - 1][j]
+                if ja != 0:
+                    K[ia - 1][ja - 1] += ke[i][j]
+
+
+def assemble_sparse(lm: np.ndarray, ke: np.ndarray, ndofs: int):
+    """
+    Function for localisation of all element matrices into global sparse matrix, one triplet buffer
+    (row, col, value) is built for all elements and converted to CSR in a single pass (duplicates are summed)
+    :param lm:    Array of code numbers (nelem, ndof)
+    :param ke:    Stack of element matrices (nelem, ndof, ndof)
+    :param ndofs: Number of DOFs total
+    :return:      K - Global matrix in CSR format (ndofs, ndofs)
+    """
+    logging.info(f'call assemble_sparse()')
+    logging.debug('call assemble_sparse(%s, %s, %s)', lm, ke, ndofs)
+    ndof = ke.shape[1]
+    rows = np.repeat(lm, ndof, axis=1).ravel()
+    cols = np.tile(lm, (1, ndof)).ravel()
+    vals = ke.ravel()
+    # code number 0 = DOF not assembled
+    mask = (rows != 0) & (cols != 0)
+    K = sparse.coo_matrix((vals[mask], (rows[mask] - 1, cols[mask] - 1)), shape=(ndofs, ndofs)).tocsr()
+
+    return K
+
+
+def assemble_global(lm: np.ndarray, ke: np.ndarray, ndofs: int, assembly: str = 'sparse'):
+    """
+    Function to assemble stack of element matrices into global matrix
+    :param lm:       Array of code numbers (nelem, ndof)
+    :param ke:       Stack of element matrices (nelem, ndof, ndof)
+    :param ndofs:    Number of DOFs total
+    :param assembly: Global matrix storage 'sparse' (CSR) or 'dense' (debugging only)
+    :return:         K - Global matrix (ndofs, ndofs)
+    """
+    if assembly == 'sparse':
+        K = assemble_sparse(lm, ke, ndofs)
+    elif assembly == 'dense':
+        K = np.zeros((ndofs, ndofs), dtype=float)
+        for i in range(ke.shape[0]):
+            assemble(lm, K, ke[i], i + 1)
+    else:
+        raise ValueError(f'Unknown assembly type {assembly}, use sparse or dense')
+
+    return K
+
+
+def dof_graph(lme: np.ndarray, ndofs: int, ncdofs: int = 0):
+    """
+    Function to create adjacency graph of free DOFs (sparsity pattern of reduced stiffness matrix)
+    :param lme:    Elemental localisation matrix
+    :param ndofs:  Number of DOFs total
+    :param ncdofs: Number of DOFs constrained (numbered first, excluded from graph)
+    :return:       G - adjacency matrix of free DOFs in CSR format (nfree, nfree)
+    """
+    logging.info(f'call dof_graph()')
+    lm = np.where(lme > ncdofs, lme - ncdofs, 0)
+    G = assemble_sparse(lm, np.ones((lm.shape[0], lm.shape[1], lm.shape[1])), ndofs - ncdofs)
+    G.data[:] = 1.0
+    return G
+
+
+def bandwidth_profile(lme: np.ndarray, ndofs: int, ncdofs: int = 0):
+    """
+    Function to compute semi-bandwidth and profile (sum of column heights above diagonal)
+    of reduced stiffness matrix
+    :param lme:    Elemental localisation matrix
+    :param ndofs:  Number of DOFs total
+    :param ncdofs: Number of DOFs constrained (numbered first, excluded)
+    :return:       bandwidth - maximal column height above diagonal
+                   profile   - sum of column heights above diagonal
+                   heights   - column heights above diagonal for free DOFs (nfree, )
+    """
+    logging.info(f'call bandwidth_profile()')
+    nfree = ndofs - ncdofs
+    lm = np.where(lme > ncdofs, lme - ncdofs, 0)
+    # first row in column = lowest free DOF of all elements the DOF is connected to
+    elmin = np.where(lm > 0, lm, nfree + 1).min(axis=1)
+    first = np.arange(nfree + 1)
+    mask = lm > 0
+    np.minimum.at(first, lm[mask], np.repeat(elmin[:, None], lm.shape[1], axis=1)[mask])
+    heights = (np.arange(nfree + 1) - first)[1:]
+    if nfree == 0:
+        return 0, 0, heights
+    return int(heights.max()), int(heights.sum()), heights
+
+
+def minimum_degree(G):
+    """
+    Function to compute minimum degree ordering of a symmetric graph, eliminated node
+    neighbours are connected (fill-in) and the node of lowest current degree is eliminated next
+    :param G: Symmetric adjacency matrix (scipy sparse)
+    :return:  perm - elimination order (new position -> old index)
+    """
+    logging.info(f'call minimum_degree()')
+    G = sparse.csr_matrix(G)
+    n = G.shape[0]
+    adj = [set(G.indices[G.indptr[i]:G.indptr[i + 1]]) - {i} for i in range(n)]
+    heap = [(len(adj[i]), i) for i in range(n)]
+    heapq.heapify(heap)
+    eliminated = np.zeros(n, dtype=bool)
+    perm = []
+    while heap:
+        degree, v = heapq.heappop(heap)
+        if eliminated[v] or degree != len(adj[v]):
+            continue
+        eliminated[v] = True
+        perm.append(v)
+        neighbours = adj[v]
+        for w in neighbours:
+            adj[w].discard(v)
+            adj[w] |= neighbours - {w}
+            heapq.heappush(heap, (len(adj[w]), w))
+        adj[v] = set()
+
+    return np.array(perm, dtype=int)
+
+
+def renumber_dofs(lmn: np.ndarray, lme: np.ndarray, lmd: np.ndarray, ncdofs: int, method: str = 'rcm'):
+    """
+    Function to renumber free DOFs to reduce bandwidth, profile or fill-in of reduced stiffness matrix,
+    constrained DOFs keep their numbers (numbered first)
+    :param lmn:    Node DOF localisation matrix
+    :param lme:    Elemental localisation matrix
+    :param lmd:    DOF to node localisation matrix
+    :param ncdofs: Number of DOFs constrained
+    :param method: 'rcm' - Reverse Cuthill-McKee (bandwidth, profile),
+                   'mindegree' - minimum degree (fill-in for sparse direct solvers)
+    :return:       lmn, lme, lmd - renumbered localisation matrices
+    """
+    logging.info(f'call renumber_dofs({method})')
+    ndofs = lmd.shape[0]
+    G = dof_graph(lme, ndofs, ncdofs)
+    if method == 'rcm':
+        perm = csgraph.reverse_cuthill_mckee(G, symmetric_mode=True)
+    elif method == 'mindegree':
+        perm = minimum_degree(G)
+    else:
+        raise ValueError(f'Unknown DOF renumbering method {method}, use rcm or mindegree')
+
+    # new DOF number of old DOF number (0 = not assigned stays 0)
+    new = np.arange(ndofs + 1)
+    new[ncdofs + 1 + perm] = np.arange(ncdofs + 1, ndofs + 1)
+    lmn = new[lmn]
+    lme = new[lme]
+    lmd_new = np.empty_like(lmd)
+    lmd_new[new[1:] - 1] = lmd
+
+    return lmn, lme, lmd_new
+
+
+class Factorization:
+    """
+    Factorization of reduced stiffness matrix, the matrix is factored once and the factor is kept
+    for solution of any number of right hand sides (load patterns) later on.
+    Sparse matrices are factored by SuperLU in symmetric mode (symmetric ordering, diagonal pivots,
+    i.e. LDLt), dense matrices (debugging) by Cholesky decomposition.
+    """
+    def __init__(self, K):
+        logging.info(f'call Factorization()')
+        self.shape = K.shape
+        if sparse.issparse(K):
+            self.storage = 'sparse'
+            self.factor = sclinalg.splu(sparse.csc_matrix(K), permc_spec='MMD_AT_PLUS_A',
+                                        diag_pivot_thresh=0.0, options=dict(SymmetricMode=True))
+        else:
+            self.storage = 'dense'
+            self.factor = linalg.cho_factor(K)
+
+    def solve(self, f: np.ndarray):
+        """
+        Solves the factored system for a block of right hand sides
+        :param f: Right hand sides (n, nrhs) or (n, )
+        :return:  u - solution of the same shape as f
+        """
+        logging.info(f'call Factorization.solve()')
+        if self.storage == 'sparse':
+            return self.factor.solve(np.asarray(f, dtype=float))
+        else:
+            return linalg.cho_solve(self.factor, f)
+
+
+class PatternFactorization:
+    """
+    Repeated factorization of reduced matrices with fixed sparsity pattern (tangent stiffness in nonlinear
+    iterations). The pattern, the scatter map of element entries into CSC storage and the fill reducing ordering
+    (chosen by SuperLU at the first factorization) are computed once, every update() only sums element matrices
+    into the data array and refactors numerically in natural order of the permuted matrix.
+    """
+    def __init__(self, lme: np.ndarray, ndofs: int, ncdofs: int):
+        """
+        :param lme:    Elemental localisation matrix
+        :param ndofs:  Number of DOFs total
+        :param ncdofs: Number of DOFs constrained (numbered first, excluded)
+        """
+        logging.info(f'call PatternFactorization()')
+        n = ndofs - ncdofs
+        self.shape = (n, n)
+        ndof = lme.shape[1]
+        rows = np.repeat(lme, ndof, axis=1).ravel() - ncdofs - 1
+        cols = np.tile(lme, (1, ndof)).ravel() - ncdofs - 1
+        # element entries assembled into the reduced matrix
+        self.mask = (rows >= 0) & (cols >= 0)
+        self.rows, self.cols = rows[self.mask], cols[self.mask]
+        self.perm = None
+        self.factor = None
+        self._pattern(np.arange(n))
+
+    def _pattern(self, perm: np.ndarray):
+        """
+        Creates CSC pattern of symmetrically permuted matrix K[perm][:, perm] and scatter map of element entries
+        :param perm: Ordering of DOFs (new position -> old index)
+        """
+        n = self.shape[0]
+        self.perm = perm
+        position = np.empty(n, dtype=int)
+        position[perm] = np.arange(n)
+        # CSC keys column * n + row are sorted by column, then by row
+        keys = position[self.cols] * n + position[self.rows]
+        unique, self.scatter = np.unique(keys, return_inverse=True)
+        self.indices = (unique % n).astype(np.int32)
+        self.indptr = np.searchsorted(unique // n, np.arange(n + 1)).astype(np.int32)
+
+    def matrix(self, ke: np.ndarray):
+        """
+        Assembles stack of element matrices into the fixed pattern
+        :param ke: Stack of element matrices (nelem, 6, 6)
+        :return:   K - reduced matrix permuted by perm in CSC format (nfree, nfree)
+        """
+        data = np.bincount(self.scatter, weights=ke.reshape(-1)[self.mask], minlength=self.indices.shape[0])
+        return sparse.csc_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+    def update(self, ke: np.ndarray):
+        """
+        Numerical refactorization for new element matrices
+        :param ke: Stack of element matrices (nelem, 6, 6)
+        :return:   self
+        """
+        logging.info(f'call PatternFactorization.update()')
+        options = dict(SymmetricMode=True)
+        if self.factor is None:
+            # symbolic step, fill reducing ordering is kept for all further factorizations
+            factor = sclinalg.splu(self.matrix(ke), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                                   options=options)
+            self._pattern(np.argsort(factor.perm_c))
+        self.factor = sclinalg.splu(self.matrix(ke), permc_spec='NATURAL', diag_pivot_thresh=0.0, options=options)
+        return self
+
+    def solve(self, f: np.ndarray):
+        """
+        Solves the factored system for a block of right hand sides
+        :param f: Right hand sides (n, nrhs) or (n, )
+        :return:  u - solution of the same shape as f
+        """
+        logging.info(f'call PatternFactorization.solve()')
+        u = np.empty(f.shape, dtype=float)
+        u[self.perm] = self.factor.solve(np.asarray(f, dtype=float)[self.perm])
+        return u
+
+
+class SkylineMatrix:
+    """
+    Symmetric matrix in skyline (variable band, profile) storage. Upper triangle is stored column by column
+    from the first nonzero row of the column down to the diagonal in one array, column heights come from
+    the elemental localisation matrix. The matrix is factored in place by active column LDLt
+    (U = D * L^T, L stored in place of U, D on the diagonal) and then solves any number of right hand sides.
+    """
+    def __init__(self, heights: np.ndarray):
+        logging.info(f'call SkylineMatrix()')
+        self.heights = np.asarray(heights, dtype=int)
+        self.shape = (self.heights.shape[0], self.heights.shape[0])
+        # first row of each column
+        self.first = np.arange(self.shape[0]) - self.heights
+        # start of each column in data array, pointer[j + 1] - 1 is the diagonal
+        self.pointer = np.zeros(self.shape[0] + 1, dtype=int)
+        self.pointer[1:] = np.cumsum(self.heights + 1)
+        self.data = np.zeros(self.pointer[-1], dtype=float)
+        self.factored = False
+
+    @classmethod
+    def from_elements(cls, lme: np.ndarray, ke: np.ndarray, ndofs: int, ncdofs: int = 0):
+        """
+        Creates skyline matrix of free DOFs (reduced matrix) directly from element matrices
+        :param lme:    Elemental localisation matrix
+        :param ke:     Stack of element matrices (nelem, ndof, ndof)
+        :param ndofs:  Number of DOFs total
+        :param ncdofs: Number of DOFs constrained (numbered first, not stored)
+        :return:       K - reduced matrix in skyline storage (ndofs - ncdofs, ndofs - ncdofs)
+        """
+        bandwidth, profile, heights = bandwidth_profile(lme, ndofs, ncdofs)
+        K = cls(heights)
+        K.add(np.where(lme > ncdofs, lme - ncdofs, 0), ke)
+        return K
+
+    @property
+    def diagonal(self):
+        return self.data[self.pointer[1:] - 1]
+
+    def summary(self):
+        """
+        :return: Storage rows of matrix summary, see logging_matrix()
+        """
+        return [['skyline storage', self.data.shape[0]]]
+
+    def add(self, lm: np.ndarray, ke: np.ndarray):
+        """
+        Adds element matrices into skyline storage
+        :param lm: Code numbers of elements (nelem, ndof) or (ndof, ), 1 based, 0 = not assembled
+        :param ke: Element matrices (nelem, ndof, ndof) or (ndof, ndof)
+        :return:   None
+        """
+        lm = np.atleast_2d(lm)
+        if lm.max() > self.shape[0]:
+            raise ValueError(f'Code number {lm.max():n} exceeds skyline matrix size {self.shape[0]:n}, '
+                             f'code numbers of free DOFs expected')
+        ke = ke.reshape((lm.shape[0], lm.shape[1], lm.shape[1]))
+        ndof = lm.shape[1]
+        rows = np.repeat(lm, ndof, axis=1).ravel()
+        cols = np.tile(lm, (1, ndof)).ravel()
+        # upper triangle only
+        mask = (rows != 0) & (cols != 0) & (rows <= cols)
+        rows, cols = rows[mask] - 1, cols[mask] - 1
+        if np.any(rows < self.first[cols]):
+            raise ValueError('Element matrix entries outside of the skyline profile')
+        np.add.at(self.data, self.pointer[cols] + rows - self.first[cols], ke.ravel()[mask])
+
+    def toarray(self):
+        """
+        :return: Full dense symmetric matrix (debugging only, not valid after factorization)
+        """
+        A = np.zeros(self.shape, dtype=float)
+        for j in range(self.shape[0]):
+            A[self.first[j]:j + 1, j] = self.data[self.pointer[j]:self.pointer[j + 1]]
+            A[j, self.first[j]:j + 1] = self.data[self.pointer[j]:self.pointer[j + 1]]
+        return A
+
+    def entries(self, j0: int, j1: int, r0: int, diagonal: bool = True):
+        """
+        Positions of stored entries of columns j0 <= j < j1 in rows r0 and below (down to the diagonal)
+        :param j0:       First column
+        :param j1:       Column after the last one
+        :param r0:       First row
+        :param diagonal: Include diagonal entries
+        :return:         rows, cols - matrix indices, index - positions in data array
+        """
+        start = np.maximum(self.first[j0:j1], r0)
+        lengths = np.arange(j0, j1) + (1 if diagonal else 0) - start
+        total = np.cumsum(lengths)
+        cols = np.repeat(np.arange(j0, j1), lengths)
+        rows = np.repeat(start, lengths) + np.arange(total[-1] if total.shape[0] else 0) \
+            - np.repeat(total - lengths, lengths)
+        return rows, cols, self.pointer[cols] + rows - self.first[cols]
+
+    def factorize(self, block: int = 64, dense: int = 2048):
+        """
+        In place active column LDLt factorization (column reduction inside the skyline only). Columns are
+        reduced in blocks, the part above the block by one triangular solve with the factored columns
+        (dense in the envelope of the block) and the block itself by dense LDLt, columns taller than
+        dense are reduced one by one
+        :param block: Maximum number of columns reduced together
+        :param dense: Maximum height of the dense envelope of a block
+        :return:      self (factored)
+        """
+        logging.info(f'call SkylineMatrix.factorize()')
+        if self.factored:
+            return self
+        n, first = self.shape[0], self.first
+        j0 = 0
+        while j0 < n:
+            if j0 - first[j0] > dense:
+                self.reduce_column(j0)
+                j0 += 1
+                continue
+            j1, r0 = j0 + 1, first[j0]
+            while j1 < n and j1 - j0 < block and j0 - min(r0, first[j1]) <= dense:
+                r0 = min(r0, first[j1])
+                j1 += 1
+            self.reduce_block(j0, j1, r0)
+            j0 = j1
+        self.factored = True
+        return self
+
+    def reduce_block(self, j0: int, j1: int, r0: int):
+        """
+        Reduces columns j0 <= j < j1 stored from row r0 or below, columns before j0 are factored
+        """
+        a = self.data
+        m, nb = j0 - r0, j1 - j0
+        rows, cols, index = self.entries(j0, j1, r0)
+        G = np.zeros((j1 - r0, nb))
+        G[rows - r0, cols - j0] = a[index]
+        C = G[m:]
+        if m > 0:
+            # g = (L^T)^-1 a above the block, l = g / d, block update C = A - g^T * D^-1 * g
+            r, c, i = self.entries(r0, j0, r0, diagonal=False)
+            S = np.zeros((m, m))
+            S[r - r0, c - r0] = a[i]
+            g = linalg.solve_triangular(S, G[:m], trans='T', lower=False, unit_diagonal=True, check_finite=False)
+            G[:m] = g / a[self.pointer[r0 + 1:j0 + 1] - 1][:, None]
+            C -= G[:m].T @ g
+        # dense LDLt of the block, upper triangle holds L^T and D
+        C = np.triu(C) + np.triu(C, 1).T
+        for k in range(nb):
+            if C[k, k] == 0.0:
+                raise linalg.LinAlgError(f'Skyline matrix is singular, zero pivot at DOF {j0 + k + 1:n}')
+            g = C[k, k + 1:].copy()
+            C[k + 1:, k + 1:] -= np.outer(g, g) / C[k, k]
+            C[k, k + 1:] = g / C[k, k]
+        G[m:] = C
+        a[index] = G[rows - r0, cols - j0]
+
+    def reduce_column(self, j: int):
+        """
+        Reduces column j one row at a time, columns before j are factored
+        """
+        a, p, first = self.data, self.pointer, self.first
+        fj = first[j]
+        cj = a[p[j]:p[j + 1]]
+        # reduce column j: g_ij = a_ij - sum(l_ki * g_kj)
+        for i in range(fj + 1, j):
+            k0 = max(first[i], fj)
+            if k0 < i:
+                ci = a[p[i]:p[i + 1]]
+                cj[i - fj] -= ci[k0 - first[i]:i - first[i]] @ cj[k0 - fj:i - fj]
+        # l_ij = g_ij / d_i, d_j = a_jj - sum(g_ij * l_ij)
+        g = cj[:j - fj].copy()
+        cj[:j - fj] = g / a[p[fj + 1:j + 1] - 1]
+        cj[j - fj] -= g @ cj[:j - fj]
+        if cj[j - fj] == 0.0:
+            raise linalg.LinAlgError(f'Skyline matrix is singular, zero pivot at DOF {j + 1:n}')
+
+    def solve(self, f: np.ndarray):
+        """
+        Solves the factored system for a block of right hand sides (forward reduction, back substitution)
+        :param f: Right hand sides (n, nrhs) or (n, )
+        :return:  u - solution of the same shape as f
+        """
+        logging.info(f'call SkylineMatrix.solve()')
+        if not self.factored:
+            self.factorize()
+        a, p, first = self.data, self.pointer, self.first
+        u = np.array(f, dtype=float)
+        # forward reduction L * y = f
+        for j in range(1, self.shape[0]):
+            u[j] -= a[p[j]:p[j + 1] - 1] @ u[first[j]:j]
+        # D * z = y
+        u = (u.T / self.diagonal).T
+        # back substitution L^T * u = z
+        for j in range(self.shape[0] - 1, 0, -1):
+            u[first[j]:j] -= np.multiply.outer(a[p[j]:p[j + 1] - 1], u[j])
+        return u
+
+
+def element_order(lme: np.ndarray, ndofs: int, ncdofs: int = 0, method: str = 'rcm'):
+    """
+    Function to reorder elements for frontal solution, elements sharing free DOFs are ordered
+    by Reverse Cuthill-McKee on the element adjacency graph to keep the front small
+    :param lme:    Elemental localisation matrix
+    :param ndofs:  Number of DOFs total
+    :param ncdofs: Number of DOFs constrained (numbered first, not part of the front)
+    :param method: 'rcm' or 'none' (element input order)
+    :return:       order - element processing sequence (0 based element indices)
+    """
+    logging.info(f'call element_order({method})')
+    if method == 'none':
+        return np.arange(lme.shape[0])
+    elif method != 'rcm':
+        raise ValueError(f'Unknown element ordering method {method}, use rcm or none')
+    lm = np.where(lme > ncdofs, lme - ncdofs, 0)
+    rows = np.repeat(np.arange(lm.shape[0]), lm.shape[1])
+    mask = lm.ravel() > 0
+    B = sparse.csr_matrix((np.ones(np.count_nonzero(mask)), (rows[mask], lm.ravel()[mask] - 1)),
+                          shape=(lm.shape[0], ndofs - ncdofs))
+    return csgraph.reverse_cuthill_mckee(sparse.csr_matrix(B @ B.T), symmetric_mode=True)
+
+
+class FrontalSolver:
+    """
+    Frontal solver for reduced stiffness matrix, elements are consumed in given sequence and each DOF
+    is eliminated (symmetric Gauss elimination, no pivoting) as soon as it is fully summed, i.e. after
+    its last element has been assembled into the front. Only the front is held in memory, eliminated
+    equations are written sequentially to memory mapped files on disk and streamed back for forward
+    reduction and back substitution of any number of right hand sides.
+    """
+    def __init__(self, lme: np.ndarray, ke, ndofs: int, ncdofs: int = 0, order: np.ndarray = None,
+                 file: str = None, chunk: int = 256):
+        """
+        :param lme:    Elemental localisation matrix
+        :param ke:     Stack of element matrices (nelem, ndof, ndof), may be memory mapped, or callable returning
+                       the matrices of given elements (0 based indices), called in front order chunk by chunk
+        :param ndofs:  Number of DOFs total
+        :param ncdofs: Number of DOFs constrained (numbered first, not part of the front)
+        :param order:  Element processing sequence (0 based), see element_order(), None = input order
+        :param file:   Base name of files for eliminated equations, None = temporary files
+        :param chunk:  Number of element matrices generated or read at once
+        """
+        logging.info(f'call FrontalSolver()')
+        self.shape = (ndofs - ncdofs, ndofs - ncdofs)
+        self.ke = ke
+        self.chunk = chunk
+        self.order = np.arange(lme.shape[0]) if order is None else np.asarray(order, dtype=int)
+        # free DOF numbers 0 based in element sequence, -1 = not part of the front
+        self.lm = np.where(lme > ncdofs, lme - ncdofs - 1, -1)[self.order]
+        self.temporary = file is None
+        if self.temporary:
+            fd, file = tempfile.mkstemp(prefix='pyfea_front_')
+            os.close(fd)
+            os.remove(file)
+        self.file = file
+        self.factored = False
+        self.symbolic()
+
+    def symbolic(self):
+        """
+        Symbolic pass, finds elimination sequence, front size at each elimination and storage needed
+        :return: None
+        """
+        n = self.shape[0]
+        nelem = self.lm.shape[0]
+        mask = self.lm >= 0
+        step = np.repeat(np.arange(nelem)[:, None], self.lm.shape[1], axis=1)
+        first = np.full(n, nelem, dtype=int)
+        last = np.full(n, -1, dtype=int)
+        np.minimum.at(first, self.lm[mask], step[mask])
+        np.maximum.at(last, self.lm[mask], step[mask])
+        if np.any(last < 0):
+            raise ValueError('Free DOFs not connected to any element cannot be solved by frontal solver')
+        # DOFs are eliminated in order of their last appearance
+        self.elimination = np.lexsort((np.arange(n), last))
+        self.step = last[self.elimination]
+        # front size before eliminations of each element step
+        added = np.bincount(first, minlength=nelem)
+        eliminated = np.bincount(last, minlength=nelem)
+        front = np.cumsum(added) - np.cumsum(eliminated) + eliminated
+        # index of each elimination within its step -> front size at elimination (pivot excluded)
+        start = np.cumsum(eliminated) - eliminated
+        within = np.arange(n) - start[self.step]
+        self.sizes = front[self.step] - within - 1
+        self.offsets = np.zeros(n + 1, dtype=int)
+        self.offsets[1:] = np.cumsum(self.sizes)
+        self.maxfront = int(front.max()) if nelem > 0 else 0
+
+    def element_matrices(self, index: np.ndarray):
+        return self.ke(index) if callable(self.ke) else self.ke[index]
+
+    def factorize(self):
+        """
+        Numeric pass, assembles elements into front and eliminates fully summed DOFs to disk
+        :return: self (factored)
+        """
+        logging.info(f'call FrontalSolver.factorize()')
+        if self.factored:
+            return self
+        n = self.shape[0]
+        total = max(int(self.offsets[-1]), 1)
+        values = np.memmap(self.file + '.val', dtype=float, mode='w+', shape=(total, ))
+        index = np.memmap(self.file + '.idx', dtype=np.int64, mode='w+', shape=(total, ))
+        self.pivots = np.zeros(n, dtype=float)
+
+        front = np.zeros((self.maxfront, self.maxfront), dtype=float)
+        slot = np.full(n, -1, dtype=int)
+        dof = np.full(self.maxfront, -1, dtype=int)
+        free = list(range(self.maxfront - 1, -1, -1))
+        e = 0
+        for k in range(self.lm.shape[0]):
+            if k % self.chunk == 0:
+                # element matrices of next chunk in front order
+                ke = self.element_matrices(self.order[k:k + self.chunk])
+            mask = self.lm[k] >= 0
+            dofs = self.lm[k][mask]
+            # new DOFs enter the front
+            for d in dofs[slot[dofs] < 0]:
+                s = free.pop()
+                slot[d] = s
+                dof[s] = d
+                front[s, :] = 0.0
+                front[:, s] = 0.0
+            s = slot[dofs]
+            front[np.ix_(s, s)] += ke[k % self.chunk][np.ix_(mask, mask)]
+            # eliminate fully summed DOFs
+            while e < n and self.step[e] == k:
+                d = self.elimination[e]
+                p = slot[d]
+                active = np.flatnonzero(dof >= 0)
+                active = active[active != p]
+                pivot = front[p, p]
+                if pivot == 0.0:
+                    raise linalg.LinAlgError(f'Frontal solver zero pivot at free DOF {d + 1:n}')
+                row = front[p, active]
+                front[np.ix_(active, active)] -= np.multiply.outer(row, row) / pivot
+                values[self.offsets[e]:self.offsets[e + 1]] = row
+                index[self.offsets[e]:self.offsets[e + 1]] = dof[active]
+                self.pivots[e] = pivot
+                dof[p] = -1
+                slot[d] = -1
+                free.append(p)
+                e += 1
+        values.flush()
+        index.flush()
+        del values, index
+        self.factored = True
+        return self
+
+    def solve(self, f: np.ndarray):
+        """
+        Solves the factored system for a block of right hand sides, eliminated equations are streamed
+        from disk forward (reduction) and backward (back substitution)
+        :param f: Right hand sides (n, nrhs) or (n, )
+        :return:  u - solution of the same shape as f
+        """
+        logging.info(f'call FrontalSolver.solve()')
+        if not self.factored:
+            self.factorize()
+        total = max(int(self.offsets[-1]), 1)
+        values = np.memmap(self.file + '.val', dtype=float, mode='r', shape=(total, ))
+        index = np.memmap(self.file + '.idx', dtype=np.int64, mode='r', shape=(total, ))
+        u = np.array(f, dtype=float)
+        n = self.shape[0]
+        # forward reduction
+        for e in range(n):
+            d = self.elimination[e]
+            i, j = self.offsets[e], self.offsets[e + 1]
+            u[index[i:j]] -= np.multiply.outer(values[i:j] / self.pivots[e], u[d])
+        # back substitution
+        for e in range(n - 1, -1, -1):
+            d = self.elimination[e]
+            i, j = self.offsets[e], self.offsets[e + 1]
+            u[d] = (u[d] - values[i:j] @ u[index[i:j]]) / self.pivots[e]
+        del values, index
+        return u
+
+    def summary(self):
+        """
+        :return: Storage rows of matrix summary, see logging_matrix()
+        """
+        return [['maximal front', self.maxfront], ['factor storage', self.offsets[-1]]]
+
+    def close(self):
+        """
+        Removes files of eliminated equations (temporary files only)
+        :return: None
+        """
+        if self.temporary:
+            for ext in ('.val', '.idx'):
+                if os.path.exists(self.file + ext):
+                    os.remove(self.file + ext)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # __init__ might have failed before the file name was set
+        if getattr(self, 'file', None) is not None:
+            self.close()
+
+
+def pcg(A, b: np.ndarray, M=None, x0: np.ndarray = None, tol: float = 1.0E-08, maxiter: int = None):
+    """
+    Preconditioned conjugate gradient method for symmetric positive definite systems A * x = b
+    :param A:       System matrix, any object supporting A @ x (sparse matrix, LinearOperator, ...)
+    :param b:       Right hand side (n, )
+    :param M:       Preconditioner, object with M.solve(r) ~ A^-1 * r, None = no preconditioning
+    :param x0:      Starting vector (warm start), None = zero vector
+    :param tol:     Tolerance of relative residual norm |b - A * x| / |b|
+    :param maxiter: Maximal number of iterations, None = 10 * n
+    :return:        x       - solution (n, )
+                    history - relative residual norm of each iteration (convergence history)
+    """
+    logging.info(f'call pcg()')
+    n = b.shape[0]
+    maxiter = 10 * n if maxiter is None else maxiter
+    x = np.zeros(n, dtype=float) if x0 is None else np.array(x0, dtype=float).reshape(n)
+    bnorm = np.linalg.norm(b)
+    if bnorm == 0.0:
+        return np.zeros(n, dtype=float), [0.0]
+    r = b - A @ x
+    z = r if M is None else M.solve(r)
+    p = z.copy()
+    rz = r @ z
+    history = [np.linalg.norm(r) / bnorm]
+    logging.debug('pcg iteration %6d residual %.3E', 0, history[-1])
+    for i in range(maxiter):
+        if history[-1] <= tol:
+            break
+        Ap = A @ p
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        history.append(np.linalg.norm(r) / bnorm)
+        logging.debug('pcg iteration %6d residual %.3E', i + 1, history[-1])
+        if history[-1] <= tol:
+            break
+        z = r if M is None else M.solve(r)
+        rz_new = r @ z
+        p = z + (rz_new / rz) * p
+        rz = rz_new
+    if history[-1] > tol:
+        logging.warning(f'pcg not converged after {len(history) - 1:n} iterations, residual {history[-1]:.3E}')
+    else:
+        logging.info(f'pcg converged after {len(history) - 1:n} iterations, residual {history[-1]:.3E}')
+    return x, history
+
+
+class JacobiPreconditioner:
+    """
+    Diagonal (Jacobi) preconditioner M = diag(A)
+    """
+    def __init__(self, A):
+        logging.info(f'call JacobiPreconditioner()')
+        diagonal = A.diagonal() if hasattr(A, 'diagonal') else np.diag(A)
+        self.inverse = 1.0 / np.asarray(diagonal, dtype=float)
+
+    def solve(self, r: np.ndarray):
+        return (np.asarray(r).T * self.inverse).T
+
+
+class IncompleteCholesky:
+    """
+    Incomplete Cholesky preconditioner without fill-in IC(0), M = L * L^T with L restricted to the sparsity
+    pattern of lower triangle of A, on breakdown (non positive pivot) the diagonal is shifted and the
+    factorization is restarted
+    """
+    def __init__(self, A, shift: float = 1.0E-03):
+        logging.info(f'call IncompleteCholesky()')
+        A = sparse.csr_matrix(A)
+        alpha = 0.0
+        while True:
+            try:
+                self.L = self.factorize(A, alpha)
+                break
+            except linalg.LinAlgError:
+                alpha = shift if alpha == 0.0 else 2.0 * alpha
+                logging.warning(f'IC(0) breakdown, diagonal shift {alpha:.3E}')
+        # triangular solves through SuperLU of L (natural ordering, no pivoting -> no fill-in)
+        self.triangular = sclinalg.splu(sparse.csc_matrix(self.L), permc_spec='NATURAL', diag_pivot_thresh=0.0,
+                                        options=dict(SymmetricMode=True))
+
+    @staticmethod
+    def factorize(A, alpha: float = 0.0):
+        L = sparse.tril(A, format='csr')
+        L.sort_indices()
+        indptr, indices, data = L.indptr, L.indices, L.data.copy()
+        # diagonal shift
+        diagonal = indptr[1:] - 1
+        data[diagonal] *= (1.0 + alpha)
+        for i in range(L.shape[0]):
+            ri = slice(indptr[i], indptr[i + 1])
+            ci = indices[ri]
+            for p in range(indptr[i], indptr[i + 1] - 1):
+                k = indices[p]
+                rk = slice(indptr[k], indptr[k + 1] - 1)
+                # common columns j < k of rows i and k
+                common, ii, kk = np.intersect1d(ci[:p - indptr[i]], indices[rk], assume_unique=True,
+                                                return_indices=True)
+                data[p] = (data[p] - data[indptr[i] + ii] @ data[indptr[k] + kk]) / data[diagonal[k]]
+            d = data[diagonal[i]] - data[indptr[i]:diagonal[i]] @ data[indptr[i]:diagonal[i]]
+            if d <= 0.0:
+                raise linalg.LinAlgError(f'IC(0) non positive pivot in row {i + 1:n}')
+            data[diagonal[i]] = math.sqrt(d)
+        return sparse.csr_matrix((data, indices, indptr), shape=L.shape)
+
+    def solve(self, r: np.ndarray):
+        return self.triangular.solve(self.triangular.solve(np.asarray(r, dtype=float)), trans='T')
+
+
+class SmoothedAggregation:
+    """
+    Two level smoothed aggregation algebraic multigrid preconditioner (symmetric V-cycle). Aggregates are
+    built from nodal blocks of DOFs (node graph of the matrix), tentative prolongator contains the rigid body
+    modes of each aggregate (translations x, z and rotation), it is smoothed by damped Jacobi and the coarse
+    problem is solved directly. Damped Jacobi is used as pre- and post-smoother.
+    """
+    def __init__(self, A, lmd: np.ndarray, nd: np.ndarray, smoothing: int = 2):
+        """
+        :param A:         Reduced stiffness matrix (nfree, nfree)
+        :param lmd:       DOF to node localisation matrix of the free DOFs (nfree, 2) [nID, direction]
+        :param nd:        Array of node coordinates
+        :param smoothing: Number of pre- and post-smoothing sweeps
+        """
+        logging.info(f'call SmoothedAggregation()')
+        self.A = sparse.csr_matrix(A)
+        self.smoothing = smoothing
+        n = self.A.shape[0]
+        self.dinv = 1.0 / self.A.diagonal()
+        # node graph of the matrix
+        nodes, node = np.unique(lmd[:, 0], return_inverse=True)
+        B = sparse.csr_matrix((np.ones(n), (np.arange(n), node)), shape=(n, nodes.shape[0]))
+        G = sparse.csr_matrix(B.T @ abs(self.A) @ B)
+        aggregate = self.aggregate(G)
+        # tentative prolongator with rigid body modes, orthonormalised per aggregate
+        x = nd[lmd[:, 0] - 1]
+        direction = lmd[:, 1]
+        naggregates = aggregate.max() + 1
+        # DOFs grouped by aggregate once, ascending within each aggregate
+        order = np.argsort(aggregate[node], kind='stable')
+        groups = np.split(order, np.cumsum(np.bincount(aggregate[node], minlength=naggregates))[:-1])
+        rows, cols, vals = [], [], []
+        start = 0
+        for dofs in groups:
+            xc = x[dofs].mean(axis=0)
+            modes = np.zeros((dofs.shape[0], 3))
+            modes[:, 0] = direction[dofs] == 1
+            modes[:, 1] = direction[dofs] == 2
+            modes[:, 2] = np.where(direction[dofs] == 1, x[dofs, 1] - xc[1],
+                                   np.where(direction[dofs] == 2, -(x[dofs, 0] - xc[0]), 1.0))
+            q, r = np.linalg.qr(modes)
+            keep = np.abs(np.diag(r)) > 1.0E-10 * np.abs(r).max()
+            q = q[:, keep]
+            rows.append(np.repeat(dofs, q.shape[1]))
+            cols.append(np.tile(np.arange(start, start + q.shape[1]), dofs.shape[0]))
+            vals.append(q.ravel())
+            start += q.shape[1]
+        rows, cols, vals = np.hstack(rows), np.hstack(cols), np.hstack(vals)
+        T = sparse.csr_matrix((vals, (rows, cols)), shape=(n, start))
+        # Jacobi smoothed prolongator P = (I - omega * D^-1 * A) * T, omega = 4 / (3 * rho(D^-1 * A))
+        DA = sparse.diags(self.dinv) @ self.A
+        self.omega = 4.0 / (3.0 * self.spectral_radius(DA))
+        self.P = sparse.csr_matrix(T - self.omega * (DA @ T))
+        self.coarse = sclinalg.splu(sparse.csc_matrix(self.P.T @ self.A @ self.P))
+        logging.info(f'SA-AMG levels: fine {n:n} DOFs, coarse {self.P.shape[1]:n} DOFs, {naggregates:n} aggregates')
+
+    @staticmethod
+    def aggregate(G):
+        """
+        Greedy aggregation of graph nodes, root nodes with all neighbours free form aggregates first,
+        remaining nodes join a neighbouring aggregate
+        :param G: Node adjacency graph (CSR)
+        :return:  aggregate - aggregate index of each node
+        """
+        n = G.shape[0]
+        aggregate = np.full(n, -1, dtype=int)
+        count = 0
+        for i in range(n):
+            neighbours = G.indices[G.indptr[i]:G.indptr[i + 1]]
+            if np.all(aggregate[neighbours] < 0):
+                aggregate[neighbours] = count
+                aggregate[i] = count
+                count += 1
+        for i in np.flatnonzero(aggregate < 0):
+            neighbours = G.indices[G.indptr[i]:G.indptr[i + 1]]
+            assigned = aggregate[neighbours][aggregate[neighbours] >= 0]
+            if assigned.shape[0] > 0:
+                aggregate[i] = assigned[0]
+            else:
+                aggregate[i] = count
+                count += 1
+        return aggregate
+
+    @staticmethod
+    def spectral_radius(A, iterations: int = 20):
+        x = np.random.default_rng(0).random(A.shape[0])
+        rho = 1.0
+        for i in range(iterations):
+            y = A @ x
+            rho = np.linalg.norm(y) / np.linalg.norm(x)
+            x = y / np.linalg.norm(y)
+        return rho
+
+    def smooth(self, x: np.ndarray, b: np.ndarray):
+        for i in range(self.smoothing):
+            x = x + (2.0 / 3.0) * self.dinv * (b - self.A @ x)
+        return x
+
+    def solve(self, r: np.ndarray):
+        x = self.smooth(np.zeros_like(r), r)
+        x = x + self.P @ self.coarse.solve(self.P.T @ (r - self.A @ x))
+        return self.smooth(x, r)
+
+
+class PCGSolver:
+    """
+    Iterative solver of reduced stiffness matrix by preconditioned conjugate gradients with the same
+    interface as Factorization, memory stays O(nnz), each right hand side may be warm started
+    """
+    def __init__(self, K, preconditioner=None, tol: float = 1.0E-08, maxiter: int = None, x0: np.ndarray = None):
+        """
+        :param K:              Reduced stiffness matrix or operator (nfree, nfree)
+        :param preconditioner: Object with solve() method (JacobiPreconditioner, IncompleteCholesky,
+                               SmoothedAggregation), None = no preconditioning
+        :param tol:            Tolerance of relative residual norm
+        :param maxiter:        Maximal number of iterations per right hand side
+        :param x0:             Starting vectors (nfree, ) or (nfree, nrhs), None = zero
+        """
+        logging.info(f'call PCGSolver()')
+        self.K = K
+        self.shape = K.shape
+        self.preconditioner = preconditioner
+        self.tol = tol
+        self.maxiter = maxiter
+        self.x0 = x0
+        self.history = []
+
+    def solve(self, f: np.ndarray):
+        logging.info(f'call PCGSolver.solve()')
+        f = np.asarray(f, dtype=float)
+        b = f.reshape((f.shape[0], -1))
+        x0 = None if self.x0 is None else np.asarray(self.x0, dtype=float).reshape((f.shape[0], -1))
+        u = np.zeros(b.shape, dtype=float)
+        self.history = []
+        for i in range(b.shape[1]):
+            start = None if x0 is None else x0[:, min(i, x0.shape[1] - 1)]
+            u[:, i], history = pcg(self.K, b[:, i], self.preconditioner, start, self.tol, self.maxiter)
+            self.history.append(history)
+        return u.reshape(f.shape)
+
+
+class ElementOperator(sclinalg.LinearOperator):
+    """
+    Matrix-free operator of reduced global matrix, K @ u is computed element by element by gathering
+    element displacements u[lme - 1], applying batched element matrices and scatter-adding the element forces,
+    the global matrix is never formed. Element matrices are either cached as a stack or recomputed
+    by a callable on each product (memory then scales with number of elements only).
+    """
+    def __init__(self, lme: np.ndarray, ke, ndofs: int, ncdofs: int = 0):
+        """
+        :param lme:    Elemental localisation matrix
+        :param ke:     Stack of element matrices (nelem, ndof, ndof) or callable returning the stack
+        :param ndofs:  Number of DOFs total
+        :param ncdofs: Number of DOFs constrained (numbered first, excluded from operator)
+        """
+        logging.info(f'call ElementOperator()')
+        self.lm = np.where(lme > ncdofs, lme - ncdofs, 0)
+        self.ke = ke
+        n = ndofs - ncdofs
+        super().__init__(dtype=np.dtype(float), shape=(n, n))
+
+    def element_matrices(self):
+        return self.ke() if callable(self.ke) else self.ke
+
+    def _matvec(self, u: np.ndarray):
+        return self._matmat(np.asarray(u).reshape((-1, 1))).reshape(-1)
+
+    def _matmat(self, u: np.ndarray):
+        n = self.shape[0]
+        # code number 0 = DOF not part of the operator, maps to zero row
+        u0 = np.concatenate((np.zeros((1, u.shape[1])), u))
+        fe = np.einsum('nij,njk->nik', self.element_matrices(), u0[self.lm])
+        lm = self.lm.ravel()
+        f = np.column_stack([np.bincount(lm, weights=fe[:, :, k].ravel(), minlength=n + 1)
+                             for k in range(u.shape[1])])
+        return f[1:]
+
+    def _adjoint(self):
+        return self
+
+    def summary(self):
+        """
+        :return: Storage rows of matrix summary, see logging_matrix()
+        """
+        return [['elements', self.lm.shape[0]]]
+
+    def diagonal(self):
+        """
+        :return: Diagonal of the operator assembled from element matrix diagonals (nfree, )
+        """
+        ke = self.element_matrices()
+        return np.bincount(self.lm.ravel(), weights=np.einsum('nii->ni', ke).ravel(),
+                           minlength=self.shape[0] + 1)[1:]
+
+
+def preconditioner(K, method: str = 'jacobi', lmd: np.ndarray = None, nd: np.ndarray = None):
+    """
+    Function to create preconditioner of reduced stiffness matrix
+    :param K:      Reduced stiffness matrix (nfree, nfree)
+    :param method: 'none', 'jacobi', 'ic0' or 'amg' (smoothed aggregation)
+    :param lmd:    DOF to node localisation matrix of the free DOFs (amg only)
+    :param nd:     Array of node coordinates (amg only)
+    :return:       preconditioner object with solve() method or None
+    """
+    if method == 'none':
+        return None
+    elif method == 'jacobi':
+        return JacobiPreconditioner(K)
+    elif isinstance(K, sclinalg.LinearOperator):
+        raise ValueError(f'Preconditioner {method} needs assembled matrix, use jacobi for matrix-free operator')
+    elif method == 'ic0':
+        return IncompleteCholesky(K)
+    elif method == 'amg':
+        if np.any(lmd[:, 0] <= 0):
+            raise ValueError('Preconditioner amg needs nodal DOFs, modal DOFs of superelements are not supported')
+        return SmoothedAggregation(K, lmd, nd)
+    else:
+        raise ValueError(f'Unknown preconditioner {method}, use none, jacobi, ic0 or amg')
+
+
+def linear_static(K, f: np.ndarray, ncdofs: int, factor: Factorization = None):
+    """
+    Function to solve displacements for all load patterns at once, the reduced stiffness matrix
+    is factored only if no factorization is supplied
+    :param K:      Global stiffness matrix (ndofs, ndofs), reduced stiffness matrix in skyline storage
+                   or frontal solver of reduced stiffness matrix
+    :param f:      Global load vectors, one column per load pattern (ndofs, nlpat)
+    :param ncdofs: Number of constrained DOFs
+    :param factor: Factorization of K[ncdofs:, ncdofs:] from previous solution
+    :return:       u      - displacements, one column per load pattern (ndofs, nlpat)
+                   factor - factorization of reduced stiffness matrix (for further load cases)
+    """
+    logging.info(f'call linear_static()')
+    if factor is None:
+        if isinstance(K, (SkylineMatrix, FrontalSolver)):
+            factor = K.factorize()
+        else:
+            factor = Factorization(K[ncdofs:, ncdofs:])
+    u = np.zeros(f.shape, dtype=float)
+    u[ncdofs:] = factor.solve(f[ncdofs:]).reshape(u[ncdofs:].shape)
+
+    return u, factor
+
+
+class WoodburyFactor:
+    """
+    Factorization of low rank update K + U * diag(d) * U^T of a factored matrix (Sherman-Morrison-Woodbury),
+    (K + U * D * U^T)^-1 = K^-1 - K^-1 * U * (D^-1 + U^T * K^-1 * U)^-1 * U^T * K^-1.
+    The original factorization is reused, setup costs one solve per column of U and a small dense factorization,
+    updates may be nested (factor may be WoodburyFactor itself), rank is the cumulative rank of all updates.
+    """
+    def __init__(self, factor, U, d: np.ndarray):
+        """
+        :param factor: Factorization of K, any object with solve() method
+        :param U:      Update vectors (n, rank), sparse or dense
+        :param d:      Update weights (rank, )
+        """
+        logging.info(f'call WoodburyFactor({d.shape[0]})')
+        self.factor = factor
+        self.U = sparse.csc_matrix(U)
+        self.shape = (self.U.shape[0], self.U.shape[0])
+        self.rank = d.shape[0] + getattr(factor, 'rank', 0)
+        self.Z = factor.solve(self.U.toarray()).reshape(self.U.shape)
+        self.capacitance = linalg.lu_factor(np.diag(1.0 / d) + self.U.T @ self.Z)
+
+    def solve(self, f: np.ndarray):
+        """
+        Solves the updated system for a block of right hand sides
+        :param f: Right hand sides (n, nrhs) or (n, )
+        :return:  u - solution of the same shape as f
+        """
+        logging.info(f'call WoodburyFactor.solve()')
+        y = self.factor.solve(f)
+        return y - self.Z @ linalg.lu_solve(self.capacitance, self.U.T @ y)
+
+
+def stiffness_update(lme: np.ndarray, dke: np.ndarray, eID: np.ndarray, ndofs: int, ncdofs: int,
+                     tol: float = 1.0E-12):
+    """
+    Function to decompose changes of element stiffness matrices into low rank update of reduced stiffness matrix
+    dK = U * diag(d) * U^T, each element change is split by its eigenvalues (changed section of a beam is rank 3
+    at most), constrained DOFs are dropped
+    :param lme:   Elemental localisation matrix
+    :param dke:   Changes of element stiffness matrices in GCS (nmod, 6, 6)
+    :param eID:   Modified element IDs (nmod, ), 1 based
+    :param ndofs: Number of DOFs total
+    :param ncdofs: Number of DOFs constrained
+    :param tol:   Relative tolerance of eigenvalues kept
+    :return:      U - update vectors (nfree, rank) CSC, d - update weights (rank, )
+    """
+    logging.info(f'call stiffness_update({len(eID)})')
+    rows, cols, vals, d = [], [], [], []
+    for k, e in enumerate(eID):
+        free = lme[e - 1] > ncdofs
+        value, vector = linalg.eigh(dke[k][np.ix_(free, free)])
+        keep = np.abs(value) > tol * max(np.max(np.abs(value)), np.finfo(float).tiny)
+        for j in np.where(keep)[0]:
+            rows.append(lme[e - 1][free] - ncdofs - 1)
+            cols.append(np.full(np.count_nonzero(free), len(d)))
+            vals.append(vector[:, j])
+            d.append(value[j])
+    n = ndofs - ncdofs
+    if len(d) == 0:
+        return sparse.csc_matrix((n, 0)), np.zeros(0)
+    U = sparse.csc_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n, len(d)))
+    return U, np.array(d)
+
+
+def reanalysis(K, factor, u: np.ndarray, f: np.ndarray, ncdofs: int, lme: np.ndarray, eID: np.ndarray,
+               dke: np.ndarray, method: str = 'woodbury', max_rank: int = 60, tol: float = 1.0E-10):
+    """
+    Function to update linear static solution after change of a few elements without refactoring. The stiffness
+    change is applied as low rank update of the previous factorization (Sherman-Morrison-Woodbury) or the new
+    system is solved by conjugate gradients preconditioned by the previous factorization and warm started from
+    the previous solution. Full factorization is done if cumulative rank of updates exceeds max_rank.
+    :param K:        Global stiffness matrix before change (ndofs, ndofs)
+    :param factor:   Factorization of K[ncdofs:, ncdofs:] (Factorization, WoodburyFactor, ...)
+    :param u:        Displacements before change (ndofs, ) or (ndofs, nlpat)
+    :param f:        Global load vectors after change (ndofs, ) or (ndofs, nlpat)
+    :param ncdofs:   Number of constrained DOFs
+    :param lme:      Elemental localisation matrix
+    :param eID:      Modified element IDs (nmod, ), 1 based
+    :param dke:      Changes of element stiffness matrices in GCS, ke_new - ke_old (nmod, 6, 6)
+    :param method:   'woodbury' (low rank update) or 'pcg' (iterative, warm started)
+    :param max_rank: Maximal cumulative rank of low rank updates before refactoring
+    :param tol:      Tolerance of relative residual norm (pcg only)
+    :return:         u      - displacements after change of the same shape as f
+                     K      - global stiffness matrix after change
+                     factor - factorization of changed reduced stiffness matrix for further reanalysis
+    """
+    logging.info(f'call reanalysis({len(eID)}, {method})')
+    eID = np.asarray(eID, dtype=int)
+    ndofs = K.shape[0]
+    K = K + assemble_global(lme[eID - 1], dke, ndofs, 'sparse' if sparse.issparse(K) else 'dense')
+    if method == 'pcg':
+        factor = PCGSolver(K[ncdofs:, ncdofs:], factor, tol, None, u[ncdofs:])
+    elif method == 'woodbury':
+        U, d = stiffness_update(lme, dke, eID, ndofs, ncdofs)
+        if d.shape[0] + getattr(factor, 'rank', 0) > max_rank:
+            logging.info(f'rank of update {d.shape[0] + getattr(factor, "rank", 0):n} exceeds {max_rank:n}, '
+                         f'refactoring')
+            factor = Factorization(K[ncdofs:, ncdofs:])
+        elif d.shape[0] > 0:
+            factor = WoodburyFactor(factor, U, d)
+    else:
+        raise ValueError(f'Unknown reanalysis method {method}, use woodbury or pcg')
+    u, factor = linear_static(K, f, ncdofs, factor)
+    return u, K, factor
+
+
+def static_sensitivity(K, factor, u: np.ndarray, ncdofs: int, lme: np.ndarray, dke: np.ndarray,
+                       dfe: np.ndarray = None, G: np.ndarray = None):
+    """
+    Function to compute design sensitivities of linear static responses for all elements in one pass (adjoint
+    method), du/dp = K^-1 * (df/dp - dK/dp * u) is never formed, only one adjoint solve K * lambda = G per response
+    reusing the factorization, element parts are contracted at once d(G^T u)/dp_e = lambda_e^T (dfe/dp - dke/dp u_e)
+    :param K:      Global stiffness matrix (or operator accepted by linear_static)
+    :param factor: Factorization of K[ncdofs:, ncdofs:] from linear_static
+    :param u:      Displacements (ndofs, nlpat)
+    :param ncdofs: Number of constrained DOFs
+    :param lme:    Elemental localisation matrix
+    :param dke:    Derivatives of element stiffness matrices (..., nelem, 6, 6), e.g. (2, nelem, 6, 6) for A and I
+    :param dfe:    Derivatives of element load vectors (..., nelem, 6, nlpat), None = design independent loads
+    :param G:      Responses as linear functionals of displacements (ndofs, nresp), e.g. unit vectors of DOFs,
+                   None = compliance f^T u of each load pattern
+    :return:       ds - sensitivities (..., nelem, nresp, nlpat), compliance (..., nelem, nlpat)
+    """
+    logging.info(f'call static_sensitivity()')
+    ue = np.concatenate((np.zeros((1, ) + u.shape[1:]), u))[lme]
+    # element residual derivatives dfe/dp - dke/dp * u_e
+    dr = -np.einsum('...eij,ejl->...eil', dke, ue, optimize=True)
+    if dfe is not None:
+        dr = dr + dfe
+    if G is None:
+        # compliance, self-adjoint, loads enter twice d(f^T u) = df^T u + u^T (df - dK u)
+        ds = np.einsum('eil,...eil->...el', ue, dr, optimize=True)
+        if dfe is not None:
+            ds = ds + np.einsum('eil,...eil->...el', ue, dfe, optimize=True)
+        return ds
+    lam = linear_static(K, G, ncdofs, factor)[0]
+    le = np.concatenate((np.zeros((1, lam.shape[1])), lam))[lme]
+    return np.einsum('eir,...eil->...erl', le, dr, optimize=True)
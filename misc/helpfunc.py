@@ -1,4 +1,5 @@
 import math
+import re
 import logging
 import numpy as np
 from functools import wraps
@@ -22,8 +23,12 @@ def eng(value, format_spec: str = ' {0:10.4f}E{1:+03n}', oneline: bool = True):
     """
     if isinstance(value, float) or isinstance(value, int):
         return format_eng(value, format_spec)
-    elif isinstance(value, np.float) or isinstance(value, np.int):
+    elif isinstance(value, np.floating) or isinstance(value, np.integer):
         return format_eng(value, format_spec)
+    elif isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.number) \
+            and value.ndim > 0 and (oneline or value.ndim <= 2):
+        # all values formatted at once, then nested the same way as lists
+        return nest_eng(format_eng_array(value, format_spec), oneline)
     elif isinstance(value, list) or isinstance(value, np.ndarray):
         # check if max dimension is 2 for oneline = False
         if not oneline:
@@ -62,6 +67,26 @@ def eng(value, format_spec: str = ' {0:10.4f}E{1:+03n}', oneline: bool = True):
         raise ValueError(message)
 
 
+def nest_eng(strings: np.ndarray, oneline: bool = True):
+    """
+    Joins array of formatted values the same way as eng() joins lists
+    :param strings:  numpy array of formatted values
+    :param oneline:  whether feed newline between rows or not, max 2D for False
+    :return:         joined values as string
+    """
+    if not oneline:
+        if strings.ndim == 1:
+            return '\n'.join(strings.tolist())
+        return '\n'.join([''.join(r) for r in strings.tolist()])
+
+    def nest(s):
+        if s.ndim == 1:
+            return '[' + ', '.join(s.tolist()) + ']'
+        return '[' + ', '.join([nest(r) for r in s]) + ']'
+
+    return re.sub(' {2,}', ' ', nest(strings))
+
+
 def format_eng(value: float, format_spec: str = ' {0:10.4f}E{1:+03n}'):
     """
     Formats float value into engineering format with exponent a multiple of 3
@@ -87,6 +112,102 @@ def format_eng(value: float, format_spec: str = ' {0:10.4f}E{1:+03n}'):
         return str('{0:' + str(len(format_eng(1.1, format_spec))) + 'n}').format(np.nan)
 
 
+ENG_SPEC = re.compile(r'^(?P<prefix> *)\{0:(?P<width>\d+)\.(?P<precision>\d+)f\}(?P<separator>[^{}]*)'
+                      r'\{1:\+0(?P<digits>\d+)n\}$')
+
+
+def fixed_chars(a: np.ndarray, width: int, precision: int):
+    """
+    Function to format 1D array of floats in fixed point notation '{0:width.precisionf}' as characters of
+    fixed width columns, digits are computed for all values at once
+    :param a:         Values (n, )
+    :param width:     Field width
+    :param precision: Number of decimal places, 0 = integer without decimal point
+    :return:          chars   - ASCII codes (n, width)
+                      regular - values fitting the field (n, ), others (too wide, non-finite) are not valid
+    """
+    n = a.shape[0]
+    chars = np.full((n, width), ord(' '), dtype=np.uint8)
+    negative = np.signbit(a)
+    with np.errstate(invalid='ignore', over='ignore'):
+        exact = np.abs(a) * 10.0 ** precision
+        scaled = np.rint(exact)
+        # values close to a rounding tie are left to str.format (exact decimal expansion)
+        regular = np.isfinite(scaled) & (scaled < 2.0 ** 53) & (np.abs(np.abs(exact - scaled) - 0.5) > exact * 4.5E-16)
+        k = np.where(regular, scaled, 0.0).astype(np.int64)
+    # decimal places from the right
+    column = width - 1
+    for i in range(precision):
+        chars[:, column] = ord('0') + k % 10
+        k //= 10
+        column -= 1
+    if precision > 0:
+        chars[:, column] = ord('.')
+        column -= 1
+    # integer part, at least one digit, sign in front of the first digit
+    length = precision + (1 if precision > 0 else 0)
+    digits = np.ones(n, dtype=int)
+    for j in range(column + 1):
+        c = column - j
+        active = (k > 0) | (j == 0)
+        chars[active, c] = ord('0') + k[active] % 10
+        digits[active] = j + 1
+        k //= 10
+    regular &= k == 0
+    used = length + digits + negative
+    regular &= used <= width
+    signed = np.where(regular & negative)[0]
+    chars[signed, width - used[signed]] = ord('-')
+    return chars, regular
+
+
+def format_eng_array(a: np.ndarray, format_spec: str = ' {0:10.4f}E{1:+03n}'):
+    """
+    Function to format array of floats in engineering format (exponent a multiple of 3) for all values at once,
+    exponents and mantissas are computed in one pass and written as fixed width columns, result is identical
+    to format_eng of each value (values not fitting the field are formatted by format_eng)
+    :param a:           Values of any shape
+    :param format_spec: String with format for mantissa and exponent e.g.: ' {0:9.3f}E{1:+03n}'
+    :return:            s - array of strings of the same shape as a
+    """
+    a = np.asarray(a, dtype=float)
+    match = ENG_SPEC.match(format_spec)
+    if match is None:
+        return np.array([format_eng(v, format_spec) for v in a.ravel()], dtype=str).reshape(a.shape)
+    prefix, separator = match['prefix'].encode(), match['separator'].encode()
+    width, precision, digits = int(match['width']), int(match['precision']), int(match['digits'])
+    values = a.ravel()
+    # zero is printed as positive 0 with exponent 0
+    values = np.where(values == 0.0, 0.0, values)
+    finite = np.isfinite(values) & (values != 0.0)
+    exponent = np.zeros(values.shape[0], dtype=np.int64)
+    exponent[finite] = np.trunc(np.log10(np.abs(values[finite])))
+    exponent -= exponent % 3
+    mantissa = values / 10.0 ** exponent
+    chars, regular = fixed_chars(mantissa, width, precision)
+    # exponent sign and zero padded digits
+    e = np.abs(exponent)
+    regular &= e < 10 ** (digits - 1)
+    echars = np.empty((values.shape[0], digits), dtype=np.uint8)
+    echars[:, 0] = np.where(exponent < 0, ord('-'), ord('+'))
+    for i in range(digits - 1, 0, -1):
+        echars[:, i] = ord('0') + e % 10
+        e //= 10
+    chars = np.hstack((np.frombuffer(prefix, dtype=np.uint8)[None, :].repeat(values.shape[0], axis=0), chars,
+                       np.frombuffer(separator, dtype=np.uint8)[None, :].repeat(values.shape[0], axis=0), echars))
+    s = np.ascontiguousarray(chars).view(f'S{chars.shape[1]}').ravel().astype(str)
+    irregular = np.where(~regular)[0]
+    if irregular.shape[0] > 0:
+        s = s.astype(object)
+        size = len(format_eng(1.1, format_spec))
+        for i in irregular:
+            v = values[i]
+            s[i] = format_eng(v, format_spec) if np.isfinite(v) else ('{0:' + str(size) + 'n}').format(
+                np.nan if np.isnan(v) else np.inf)
+        s = s.astype(str)
+    return s.reshape(a.shape)
+
+
 def timer(f):
     @wraps
     def wrap(*args, **kwargs):
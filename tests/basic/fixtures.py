@@ -0,0 +1,43 @@
+import os
+import unittest
+
+from basic.fileio import load_dat
+from basic.solvers import assemble_global
+from basic.beam2d import localisation_matrix, beam2d_stiffness_batch, beam2d_mass_batch
+
+BASIC = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'basic')
+FRAME = os.path.join(BASIC, 'structures/frame')
+
+
+def load_structure(path: str):
+    """
+    Loads structure directory and computes element matrices of all elements
+    :param path: Directory with .dat files
+    :return:     nd, el, mt, pt, cs - input arrays, ndofs, ncdofs, lmn, lme, lmd - localisation,
+                 ke, me - element stiffness and mass matrices
+    """
+    nd = load_dat(os.path.join(path, 'nd.dat'), dtype=float)
+    el = load_dat(os.path.join(path, 'el.dat'), dtype=int)
+    mt = load_dat(os.path.join(path, 'mt.dat'), dtype=float)
+    pt = load_dat(os.path.join(path, 'pt.dat'), dtype=float)
+    cs = load_dat(os.path.join(path, 'cs.dat'), dtype=int)
+    ndofs, ncdofs, lmn, lme, lmd = localisation_matrix(nd, el, cs)
+    x1, x2 = nd[el[:, 2] - 1], nd[el[:, 3] - 1]
+    ke = beam2d_stiffness_batch(x1, x2, pt[el[:, 1] - 1, 0], pt[el[:, 1] - 1, 1], mt[el[:, 0] - 1, 1])
+    me = beam2d_mass_batch(x1, x2, pt[el[:, 1] - 1, 0], mt[el[:, 0] - 1, 0])
+    return nd, el, mt, pt, cs, ndofs, ncdofs, lmn, lme, lmd, ke, me
+
+
+class FrameTestCase(unittest.TestCase):
+    """
+    Test case with structures/frame loaded once per class, K and M are assembled sparse global matrices,
+    Kr and Mr their parts at free DOFs
+    """
+    @classmethod
+    def setUpClass(cls):
+        (cls.nd, cls.el, cls.mt, cls.pt, cls.cs, cls.ndofs, cls.ncdofs, cls.lmn, cls.lme, cls.lmd,
+         cls.ke, cls.me) = load_structure(FRAME)
+        cls.K = assemble_global(cls.lme, cls.ke, cls.ndofs, 'sparse')
+        cls.M = assemble_global(cls.lme, cls.me, cls.ndofs, 'sparse')
+        cls.Kr = cls.K[cls.ncdofs:, cls.ncdofs:]
+        cls.Mr = cls.M[cls.ncdofs:, cls.ncdofs:]
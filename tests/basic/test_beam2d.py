@@ -0,0 +1,330 @@
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+from configparser import ConfigParser
+import numpy as np
+import scipy.linalg
+
+from basic import beam2d, report, fileio, solvers
+from tests.basic.fixtures import BASIC, FRAME, FrameTestCase
+
+
+class Verification01(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(Verification01, self).__init__(*args, **kwargs)
+        self.path = os.path.join(BASIC, 'verification/01-linear_statics-simple_cantilever')
+        self.cfg = ConfigParser()
+        self.cfg.read(os.path.join(self.path, 'g.ini'))
+        self.ndu, self.r, self.ue, self.se = beam2d.beam2d(self.path)
+
+    def template(self):
+        sections = [s.strip() for s in self.cfg['DEFAULT']['verification'].split(',')]
+        for section in sections:
+            t = self.cfg[section]['type']
+            n = int(self.cfg[section]['node'])
+            d = int(self.cfg[section]['direction'])
+            verification = float(self.cfg[section]['value'])
+            if t == 'displacement':
+                value = self.ndu[n - 1][d - 1]
+            elif t == 'reaction':
+                idx = np.where(self.r[:, 0] == n)[0][0]
+                tmp = self.r[idx]
+                value = self.r[idx][d]
+            else:
+                raise NotImplemented(f'Result type test {t} is not yet implmented')
+            self.assertAlmostEqual(verification, value, delta=abs(verification * 0.05))
+
+    def test_displacement(self):
+        section = 'DISPLACEMENT'
+        t = self.cfg[section]['type']
+        n = int(self.cfg[section]['node'])
+        d = int(self.cfg[section]['direction'])
+        verification = float(self.cfg[section]['value'])
+        if t == 'displacement':
+            value = self.ndu[n - 1][d - 1]
+        elif t == 'reaction':
+            idx = np.where(self.r[:, 0] == n)[0][0]
+            tmp = self.r[idx]
+            value = self.r[idx][d]
+        else:
+            raise NotImplemented(f'Result type test {t} is not yet implmented')
+        self.assertAlmostEqual(verification, value, msg=f'precison = {abs(1 - verification / value)}',
+                               delta=abs(verification * 0.05))
+
+    def test_reaction(self):
+        section = 'REACTION'
+        t = self.cfg[section]['type']
+        n = int(self.cfg[section]['node'])
+        d = int(self.cfg[section]['direction'])
+        verification = float(self.cfg[section]['value'])
+        if t == 'displacement':
+            value = self.ndu[n - 1][d - 1]
+        elif t == 'reaction':
+            idx = np.where(self.r[:, 0] == n)[0][0]
+            tmp = self.r[idx]
+            value = self.r[idx][d]
+        else:
+            raise NotImplemented(f'Result type test {t} is not yet implmented')
+        self.assertAlmostEqual(verification, value, delta=abs(verification * 0.05))
+
+    def test_moment(self):
+        section = 'MOMENT'
+        t = self.cfg[section]['type']
+        n = int(self.cfg[section]['node'])
+        d = int(self.cfg[section]['direction'])
+        verification = float(self.cfg[section]['value'])
+        if t == 'displacement':
+            value = self.ndu[n - 1][d - 1]
+        elif t == 'reaction':
+            idx = np.where(self.r[:, 0] == n)[0][0]
+            tmp = self.r[idx]
+            value = self.r[idx][d]
+        else:
+            raise NotImplemented(f'Result type test {t} is not yet implmented')
+        self.assertAlmostEqual(verification, value, delta=abs(verification * 0.05))
+
+
+class Verification02(unittest.TestCase):
+    def test_euler(self):
+        path = os.path.join(BASIC, 'verification/02-buckling-cantilever_column')
+        cfg = ConfigParser()
+        cfg.read(os.path.join(path, 'g.ini'))
+        load_factor, u = beam2d.beam2d(path)
+        verification = float(cfg['EULER']['value'])
+        self.assertAlmostEqual(verification, load_factor[int(cfg['EULER']['mode']) - 1][0],
+                               delta=abs(verification * 0.001))
+
+
+class Verification03(unittest.TestCase):
+    def test_end_moment(self):
+        path = os.path.join(BASIC, 'verification/03-nonlinear_statics-cantilever_end_moment')
+        cfg = ConfigParser()
+        cfg.read(os.path.join(path, 'g.ini'))
+        load_factor, u = beam2d.beam2d(path)
+        self.assertAlmostEqual(load_factor[-1], 1.0)
+        ndofs, ncdofs, lmn, lme, lmd = beam2d.localisation_matrix(
+            fileio.load_dat(os.path.join(path, 'nd.dat'), dtype=float),
+            fileio.load_dat(os.path.join(path, 'el.dat'), dtype=int),
+            fileio.load_dat(os.path.join(path, 'cs.dat'), dtype=int))
+        for section in [s.strip() for s in cfg['DEFAULT']['verification'].split(',')]:
+            n = int(cfg[section]['node'])
+            d = int(cfg[section]['direction'])
+            verification = float(cfg[section]['value'])
+            # 20 straight elements approximate the circle within 0.2 %
+            self.assertAlmostEqual(verification, u[-1][lmn[n - 1][d - 1] - 1], delta=abs(verification * 0.002),
+                                   msg=section)
+
+
+class Configuration(unittest.TestCase):
+    def run_frame(self, ini):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ['nd', 'el', 'mt', 'pt', 'cs', 'fn', 'fe']:
+                shutil.copy(os.path.join(FRAME, f'{name}.dat'), directory)
+            with open(os.path.join(directory, 'g.ini'), 'w') as f:
+                f.write(ini)
+            return beam2d.beam2d(directory)
+
+    def test_matrix_free(self):
+        with self.assertRaisesRegex(ValueError, 'solver_backend = pcg'):
+            self.run_frame('[DEFAULT]\nsolver = linear static\noperator = matrix-free\n')
+        with self.assertRaisesRegex(ValueError, 'number of modes'):
+            self.run_frame('[DEFAULT]\nsolver = eigenvalues\noperator = matrix-free\n'
+                           '[eigenvalues]\nfreqlim = 200.0\n')
+        ndu = self.run_frame('[DEFAULT]\nsolver = linear static\noperator = matrix-free\nsolver_backend = pcg\n')[0]
+        self.assertTrue(np.all(np.isfinite(ndu)))
+
+    def test_explicit_steps(self):
+        t, history = self.run_frame('[DEFAULT]\nsolver = explicit\n[explicit]\nsteps = 10\n')
+        self.assertEqual(t.shape[0], 11)
+        with self.assertRaisesRegex(ValueError, 'steps or time'):
+            self.run_frame('[DEFAULT]\nsolver = explicit\n')
+
+    def test_sensitivity_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'frame_sensitivity.npz')
+            self.run_frame(f'[DEFAULT]\nsolver = linear static\nsensitivity = yes\nsensitivity_file = {file}\n')
+            with np.load(file) as ds:
+                self.assertTrue(np.all(np.isfinite(ds['A'])))
+        # output disabled
+        ndu = self.run_frame('[DEFAULT]\nsolver = linear static\nsensitivity = yes\nsensitivity_file = none\n')[0]
+        self.assertTrue(np.all(np.isfinite(ndu)))
+
+    def test_nonlinear_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'frame_nonlinear.npz')
+            load_factor, u = self.run_frame(f'[DEFAULT]\nsolver = nonlinear static\ncontrol = arc-length\n'
+                                            f'max_load = 0.5\nnonlinear_file = {file}\n')
+            with np.load(file) as nonlinear:
+                self.assertTrue(np.array_equal(nonlinear['load_factor'], load_factor))
+        self.assertGreaterEqual(load_factor[-1], 0.5)
+
+    def test_report_file(self):
+        # report file is set for the run only
+        self.run_frame('[DEFAULT]\nsolver = linear static\nreport = report.txt\n')
+        self.assertIsNone(report.REPORT_FILE)
+
+    def test_subspace_modes(self):
+        with self.assertRaisesRegex(ValueError, 'option modes missing'):
+            self.run_frame('[DEFAULT]\nsolver = eigenvalues\neigensolver = subspace\n[eigenvalues]\nfreqlim = 200.0\n')
+
+    def test_load_pattern(self):
+        for solver in ['buckling', 'nonlinear static']:
+            with self.assertRaisesRegex(ValueError, 'Load pattern 99 not defined, available: 1'):
+                self.run_frame(f'[DEFAULT]\nsolver = {solver}\nload_pattern = 99\n')
+
+
+class ElementKernels(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.n = 5
+        self.x1 = rng.random((self.n, 2)) * 1000.0
+        self.x2 = rng.random((self.n, 2)) * 1000.0
+        self.A = rng.random(self.n) * 1000.0
+        self.I = rng.random(self.n) * 1.0E+06
+        self.E = np.full(self.n, 210.0E+03)
+        self.ro = np.full(self.n, 7.85E-09)
+
+    def test_stiffness(self):
+        ke = beam2d.beam2d_stiffness_batch(self.x1, self.x2, self.A, self.I, self.E)
+        for i in range(self.n):
+            self.assertTrue(np.allclose(ke[i], beam2d.beam2d_stiffness(self.x1[i], self.x2[i], self.A[i],
+                                                                       self.I[i], self.E[i])))
+
+    def test_mass(self):
+        me = beam2d.beam2d_mass_batch(self.x1, self.x2, self.A, self.ro, mi=0.5)
+        for i in range(self.n):
+            self.assertTrue(np.allclose(me[i], beam2d.beam2d_mass(self.x1[i], self.x2[i], self.A[i],
+                                                                  self.ro[i], mi=0.5)))
+
+    def test_load(self):
+        fx, fz = np.linspace(-2.0, 3.0, self.n), np.linspace(5.0, -1.0, self.n)
+        fe = beam2d.beam2d_load_batch(self.x1, self.x2, fx, fz)
+        for i in range(self.n):
+            self.assertTrue(np.allclose(fe[i], beam2d.beam2d_load(self.x1[i], self.x2[i], fx[i], fz[i])))
+
+    def test_temperature(self):
+        a, t = np.full(self.n, 1.2E-05), np.linspace(-30.0, 50.0, self.n)
+        fe = beam2d.beam2d_temp_batch(self.x1, self.x2, self.A, self.E, a, t, 20.0)
+        for i in range(self.n):
+            self.assertTrue(np.allclose(fe[i], beam2d.beam2d_temp(self.x1[i], self.x2[i], self.A[i], self.E[i], a[i],
+                                                                  t[i], 20.0)))
+
+    def test_initial_stress(self):
+        N = np.linspace(-1.0E+05, 2.0E+05, self.n)
+        ks = beam2d.beam2d_initialstress_batch(self.x1, self.x2, N)
+        for i in range(self.n):
+            self.assertTrue(np.allclose(ks[i], beam2d.beam2d_initialstress(self.x1[i], self.x2[i], N[i])))
+
+    def test_postprocessing(self):
+        u = np.random.default_rng(2).random((self.n, 6, 2))
+        s = beam2d.beam2d_postpro_batch(self.x1, self.x2, u, self.A, self.I, self.E)
+        for i in range(self.n):
+            for k in range(2):
+                self.assertTrue(np.allclose(s[i, :, k], beam2d.beam2d_postpro(self.x1[i], self.x2[i], u[i, :, k],
+                                                                              self.A[i], self.I[i], self.E[i])))
+
+
+class Superelement(unittest.TestCase):
+    def test_condensation(self):
+        path = os.path.join(BASIC, 'structures/superelement/storey')
+        se = beam2d.superelement_condense(path, cache=False)
+        # storey fixed at bottom boundary nodes 1, 2 and loaded at top boundary node 3
+        nd = fileio.load_dat(os.path.join(path, 'nd.dat'), dtype=float)
+        el = fileio.load_dat(os.path.join(path, 'el.dat'), dtype=int)
+        mt = fileio.load_dat(os.path.join(path, 'mt.dat'), dtype=float)
+        pt = fileio.load_dat(os.path.join(path, 'pt.dat'), dtype=float)
+        ndofs, ncdofs, lmn, lme, lmd = beam2d.localisation_matrix(nd, el, np.array([[1, 1, 1, 1], [2, 1, 1, 1]]))
+        ke = beam2d.beam2d_stiffness_batch(nd[el[:, 2] - 1], nd[el[:, 3] - 1], pt[el[:, 1] - 1, 0],
+                                           pt[el[:, 1] - 1, 1], mt[el[:, 0] - 1, 1])
+        f = np.zeros(ndofs)
+        f[lmn[2] - 1] = [1000.0, -500.0, 1.0E+05]
+        u, factor = solvers.linear_static(solvers.assemble_global(lme, ke, ndofs), f, ncdofs)
+        ub = np.linalg.solve(se['K'][6:, 6:], np.concatenate((f[lmn[2] - 1], np.zeros(3))))
+        self.assertTrue(np.allclose(ub, u[lmn[2:4] - 1].ravel()))
+
+    def test_craig_bampton(self):
+        path = os.path.join(BASIC, 'structures/superelement/storey')
+        nd = fileio.load_dat(os.path.join(path, 'nd.dat'), dtype=float)
+        el = fileio.load_dat(os.path.join(path, 'el.dat'), dtype=int)
+        mt = fileio.load_dat(os.path.join(path, 'mt.dat'), dtype=float)
+        pt = fileio.load_dat(os.path.join(path, 'pt.dat'), dtype=float)
+        # storey fixed at bottom boundary nodes 1, 2
+        ndofs, ncdofs, lmn, lme, lmd = beam2d.localisation_matrix(nd, el, np.array([[1, 1, 1, 1], [2, 1, 1, 1]]))
+        x1, x2 = nd[el[:, 2] - 1], nd[el[:, 3] - 1]
+        K = solvers.assemble_global(lme, beam2d.beam2d_stiffness_batch(x1, x2, pt[el[:, 1] - 1, 0], pt[el[:, 1] - 1, 1],
+                                                                      mt[el[:, 0] - 1, 1]), ndofs)
+        M = solvers.assemble_global(lme, beam2d.beam2d_mass_batch(x1, x2, pt[el[:, 1] - 1, 0], mt[el[:, 0] - 1, 0]),
+                                   ndofs)
+        eigenvalue = scipy.linalg.eigh(K[ncdofs:, ncdofs:].toarray(), M[ncdofs:, ncdofs:].toarray(),
+                                       eigvals_only=True)
+        guyan = beam2d.superelement_condense(path, cache=False)
+        cb = beam2d.superelement_condense(path, cache=False, modes=3)
+        full = beam2d.superelement_condense(path, cache=False, modes=ndofs - 12)
+        reduced = [scipy.linalg.eigh(se['K'][6:, 6:], se['M'][6:, 6:], eigvals_only=True)[:4]
+                   for se in [guyan, cb, full]]
+        # all interior modes kept = exact, fixed interface modes improve Guyan upper bounds
+        self.assertTrue(np.allclose(reduced[2], eigenvalue[:4]))
+        self.assertTrue(np.all(reduced[1] <= reduced[0] * (1.0 + 1.0E-10)))
+        self.assertTrue(np.all(reduced[1] >= eigenvalue[:4] * (1.0 - 1.0E-10)))
+
+    def test_modal_dofs(self):
+        path = os.path.join(BASIC, 'structures/superelement')
+        nd = fileio.load_dat(os.path.join(path, 'nd.dat'), dtype=float)
+        el = fileio.load_dat(os.path.join(path, 'el.dat'), dtype=int)
+        cs = fileio.load_dat(os.path.join(path, 'cs.dat'), dtype=int)
+        se = fileio.load_dat(os.path.join(path, 'se.dat'), dtype=int)
+        ndofs, ncdofs, lmn, lme, lmd = beam2d.localisation_matrix(nd, el, cs, se=se)
+        with tempfile.TemporaryDirectory() as directory:
+            storey = shutil.copytree(os.path.join(path, 'storey'), os.path.join(directory, 'storey'),
+                                     ignore=shutil.ignore_patterns('*.npz'))
+            cb = beam2d.superelement_condense(storey, modes=3)
+            self.assertTrue(np.array_equal(beam2d.superelement_condense(storey, modes=3)['K'], cb['K']))
+            self.assertEqual([f for f in os.listdir(storey) if f.endswith('.npz')], ['superelement_cb3.npz'])
+        instances, total, lmd = beam2d.superelement_instances(se, nd, lmn, lmd, {1: cb}, ndofs)
+        # modal DOFs map to instances [-instID, mode]
+        self.assertEqual(lmd.shape[0], total)
+        self.assertTrue(np.array_equal(lmd[ndofs:ndofs + 3], [[-se[0, 0], 1], [-se[0, 0], 2], [-se[0, 0], 3]]))
+
+
+class Nonlinear(FrameTestCase):
+    def test_tangent(self):
+        rng = np.random.default_rng(9)
+        x1 = rng.random((4, 2)) * 100.0
+        x2 = x1 + rng.random((4, 2)) * 1000.0 - 500.0
+        A, I, E = rng.random(4) * 1000.0 + 100.0, rng.random(4) * 1.0E+06 + 1.0E+05, np.full(4, 2.1E+05)
+        # undeformed tangent is the linear stiffness
+        fe, ke, q = beam2d.beam2d_corotational_batch(x1, x2, np.zeros((4, 6)), A, I, E)
+        self.assertTrue(np.allclose(ke, beam2d.beam2d_stiffness_batch(x1, x2, A, I, E)))
+        # tangent is the derivative of internal forces
+        ue = rng.random((4, 6)) * 50.0
+        fe, ke, q = beam2d.beam2d_corotational_batch(x1, x2, ue, A, I, E)
+        for j in range(6):
+            h = np.zeros((4, 6))
+            h[:, j] = 1.0E-06 if j in [2, 5] else 1.0E-04
+            fd = (beam2d.beam2d_corotational_batch(x1, x2, ue + h, A, I, E)[0]
+                  - beam2d.beam2d_corotational_batch(x1, x2, ue - h, A, I, E)[0]) / (2.0 * h[0, j])
+            self.assertTrue(np.allclose(ke[:, :, j], fd, rtol=1.0E-05, atol=1.0E-06 * np.abs(ke).max()))
+        # rigid rotation is free of forces, rotations are positive from z to x
+        a = 0.8
+        ur = np.zeros((4, 6))
+        ur[:, 3:5] = (x2 - x1) @ np.array([[np.cos(a), np.sin(a)], [-np.sin(a), np.cos(a)]]) - (x2 - x1)
+        ur[:, [2, 5]] = -a
+        self.assertTrue(np.allclose(beam2d.beam2d_corotational_batch(x1, x2, ur, A, I, E)[0], 0.0,
+                                    atol=1.0E-06 * np.abs(ke).max()))
+
+    def test_pattern_factorization(self):
+        ndofs, ncdofs, ke, K = self.ndofs, self.ncdofs, self.ke, self.Kr
+        factor = solvers.PatternFactorization(self.lme, ndofs, ncdofs)
+        f = np.random.default_rng(10).random((ndofs - ncdofs, 2))
+        for scale in [1.0, 2.0]:
+            self.assertTrue(np.allclose(scale * K @ factor.update(scale * ke).solve(f), f))
+
+
+if __name__ == '__main__':
+    logger = logging.getLogger()
+    logger.disabled = True
+    # logger_handler = logger.handlers[0]
+    # logger_handler.setLevel(logging.FATAL)
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+from unittest import mock
+import numpy as np
+import scipy.linalg
+
+from basic import beam2d, solvers, dynamics
+from tests.basic.fixtures import FrameTestCase
+
+
+class Transient(FrameTestCase):
+    def test_newmark(self):
+        K, M = self.Kr, self.Mr
+        eigenvalue, x = scipy.linalg.eigh(K.toarray(), M.toarray())
+        # load in the 1st mode shape suddenly applied, u(t) = u_static * (1 - cos(omega * t))
+        f = M @ x[:, 0]
+        omega = np.sqrt(eigenvalue[0])
+        dt = 2.0 * np.pi / omega / 200.0
+        history = np.zeros((401, K.shape[0]))
+        dynamics.newmark(K, M, lambda t: f, dt, 400, history=history)
+        exact = np.outer(1.0 - np.cos(omega * dt * np.arange(401)), x[:, 0] / eigenvalue[0])
+        self.assertLess(np.abs(history - exact).max(), 0.01 * np.abs(x[:, 0] / eigenvalue[0]).max())
+
+    def test_central_difference(self):
+        nd, el, mt, pt = self.nd, self.el, self.mt, self.pt
+        md = beam2d.beam2d_mass_diagonal_batch(nd[el[:, 2] - 1], nd[el[:, 3] - 1], pt[el[:, 1] - 1, 0],
+                                               mt[el[:, 0] - 1, 0])
+        K = solvers.ElementOperator(self.lme, self.ke, self.ndofs, self.ncdofs)
+        m = np.bincount(K.lm.ravel(), weights=md.ravel(), minlength=self.ndofs - self.ncdofs + 1)[1:]
+        dt, eID = dynamics.critical_time_step(self.ke, md)
+        # element bound is conservative
+        Ks = self.Kr
+        omega2 = scipy.linalg.eigvalsh(Ks.toarray(), np.diag(m))
+        self.assertLessEqual(dt, 2.0 / np.sqrt(omega2[-1]))
+        # same response as implicit Newmark with the same diagonal mass
+        f = np.random.default_rng(7).random(K.shape[0])
+        explicit = np.zeros((101, K.shape[0]))
+        dynamics.central_difference(K, m, lambda t: f, 0.9 * dt, 1000, output=10, history=explicit)
+        implicit = np.zeros((1001, K.shape[0]))
+        dynamics.newmark(Ks, np.diag(m), lambda t: f, 0.9 * dt, 1000, history=implicit)
+        self.assertLess(np.abs(explicit - implicit[::10]).max(), 0.01 * np.abs(implicit).max())
+
+    def test_modal(self):
+        K, M = self.Kr.toarray(), self.Mr.toarray()
+        eigenvalue, x = scipy.linalg.eigh(K, M)
+        f = np.random.default_rng(8).random(K.shape[0])
+        zeta = 0.05
+        # harmonic response with all modes equals direct solution with modal damping
+        C = M @ x @ np.diag(2.0 * zeta * np.sqrt(eigenvalue)) @ x.T @ M
+        omega = np.linspace(1.0, 500.0, 7)
+        direct = np.array([np.linalg.solve(K - w ** 2.0 * M + 1.0j * w * C, f) for w in omega])
+        self.assertTrue(np.allclose(dynamics.modal_harmonic(eigenvalue, x, x.T @ f, omega, zeta), direct))
+        # step load in the 1st mode, damped SDOF solution
+        omega, omegad = np.sqrt(eigenvalue[0]), np.sqrt(eigenvalue[0] * (1.0 - zeta ** 2.0))
+        t = np.linspace(0.0, 2.0, 201)
+        exact = (1.0 - np.exp(-zeta * omega * t) * (np.cos(omegad * t) + zeta * omega / omegad * np.sin(omegad * t)))
+        u = dynamics.modal_transient(eigenvalue[:1], x[:, :1], np.ones((1, 201)), t[1], zeta)
+        self.assertTrue(np.allclose(u, np.outer(exact / eigenvalue[0], x[:, 0])))
+
+    def test_frequency_response(self):
+        K, M = self.Kr, self.Mr
+        C = 0.5 * M + 1.0E-04 * K
+        f = np.random.default_rng(9).random(K.shape[0])
+        omega = np.linspace(1.0, 500.0, 9)
+        direct = np.array([np.linalg.solve((K * (1.0 + 0.02j) - w ** 2.0 * M + 1.0j * w * C).toarray(), f)
+                           for w in omega])
+        u = dynamics.frequency_response(K, M, f, omega, C, 0.02, [0, 3, 7], processes=2)
+        self.assertTrue(np.allclose(u, direct[:, [0, 3, 7]]))
+        # single process solves in place without shared memory
+        with mock.patch.object(dynamics, 'share_array', side_effect=AssertionError):
+            u = dynamics.frequency_response(K, M, f, omega, C, 0.02, [0, 3, 7], processes=1)
+        self.assertTrue(np.allclose(u, direct[:, [0, 3, 7]]))
@@ -0,0 +1,33 @@
+from unittest import mock
+import numpy as np
+import scipy.linalg
+
+from basic import eigen
+from tests.basic.fixtures import FrameTestCase
+
+
+class Eigenvalues(FrameTestCase):
+    def test_lanczos(self):
+        K, M = self.Kr, self.Mr
+        eigenvalue = scipy.linalg.eigh(K.toarray(), M.toarray(), eigvals_only=True)
+        freqlim = np.sqrt((eigenvalue[29] + eigenvalue[30]) / 2.0) / (2.0 * np.pi)
+        # several shifts needed to slice all modes below freqlim
+        lanczos, x = eigen.eigen_lanczos(K, M, freqlim=freqlim, shift_modes=8)
+        self.assertEqual(lanczos.shape[0], 30)
+        self.assertEqual(eigen.sturm_count(K, M, (eigenvalue[29] + eigenvalue[30]) / 2.0), 30)
+        self.assertTrue(np.allclose(lanczos, eigenvalue[:30]))
+        self.assertTrue(np.allclose(K @ x, M @ x * lanczos))
+        # shift never accepted, retries are limited
+        with mock.patch.object(eigen.sclinalg, 'eigsh', side_effect=RuntimeError):
+            with self.assertRaises(scipy.linalg.LinAlgError):
+                eigen.eigen_lanczos(K, M, modes=5, max_retries=3)
+
+    def test_subspace(self):
+        K, M = self.Kr, self.Mr
+        eigenvalue = scipy.linalg.eigh(K.toarray(), M.toarray(), eigvals_only=True)
+        subspace, x, iterations = eigen.eigen_subspace(K, M, 5)
+        self.assertTrue(np.allclose(subspace, eigenvalue[:5]))
+        # restart from converged modes of slightly stiffer structure
+        seeded, x, restart = eigen.eigen_subspace(1.01 * K, M, 5, x)
+        self.assertTrue(np.allclose(seeded, 1.01 * eigenvalue[:5]))
+        self.assertLess(restart, iterations)
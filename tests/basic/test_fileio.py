@@ -0,0 +1,90 @@
+import unittest
+import os
+import json
+import tempfile
+from unittest import mock
+import numpy as np
+
+from basic import fileio
+
+
+class Input(unittest.TestCase):
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as cache, \
+                mock.patch.object(fileio, 'DAT_CACHE_DIR', os.path.join(cache, 'dat')):
+            file = os.path.join(directory, 'nd.dat')
+            meta = fileio.dat_cache_path(file) + '.json'
+            np.savetxt(file, np.arange(12.0).reshape((6, 2)), header='X Z')
+            m = fileio.load_dat(file, cache='use')
+            cached = fileio.load_dat(file, cache='use')
+            self.assertIsInstance(cached, np.memmap)
+            self.assertTrue(np.array_equal(m, cached))
+            self.assertFalse(isinstance(fileio.load_dat(file, cache='off'), np.memmap))
+            # nothing is written next to the input
+            self.assertEqual(os.listdir(directory), ['nd.dat'])
+            # changed content invalidates the cache even with the same size
+            np.savetxt(file, np.arange(12.0).reshape((6, 2))[::-1], header='X Z')
+            self.assertTrue(np.array_equal(fileio.load_dat(file, cache='use'), m[::-1]))
+            # touched file keeps the cache, metadata follows the new mtime
+            stat = os.stat(file)
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.assertIsInstance(fileio.load_dat(file, cache='use'), np.memmap)
+            with open(meta, 'r') as f:
+                self.assertEqual(json.load(f)['mtime'], stat.st_mtime_ns + 10 ** 9)
+            # file changed after parsing, no metadata pairs the old stat with the new content
+            os.remove(meta)
+            with open(file, 'a') as f:
+                f.write('12.0 13.0\n')
+            self.assertFalse(fileio.dat_cache_meta(file, m, stat))
+            self.assertFalse(os.path.exists(meta))
+
+    def test_stream(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'el.dat')
+            el = np.arange(50).reshape((10, 5))
+            with open(file, 'w') as f:
+                f.write('# mID pID nd1 nd2 R\n')
+                np.savetxt(f, el[:4], fmt='%d')
+                f.write('\n# comment\n')
+                np.savetxt(f, el[4:], fmt='%d')
+            # small blocks, rows are split across blocks
+            m = fileio.load_dat_stream(file, int, os.path.join(directory, 'el.npy'), block=16)
+            self.assertTrue(np.array_equal(m, el))
+            self.assertTrue(np.array_equal(np.load(os.path.join(directory, 'el.npy')), el))
+            with open(file, 'a') as f:
+                f.write('1 2 3\n')
+            with self.assertRaises(ValueError):
+                fileio.load_dat_stream(file, int)
+            # ragged rows with the right total count of values
+            with open(file, 'w') as f:
+                f.write('1 2 3\n4 5\n6 7 8 9\n')
+            with self.assertRaisesRegex(ValueError, 'row 2 has 2 columns'):
+                fileio.load_dat_stream(file, int)
+            # values not of the requested type
+            with open(file, 'w') as f:
+                f.write('1 2 3\n4 5.5 6\n')
+            with self.assertRaisesRegex(ValueError, 'data rows 1 to 2 are not int'):
+                fileio.load_dat_stream(file, int)
+            self.assertTrue(np.array_equal(fileio.load_dat_stream(file, float), [[1.0, 2.0, 3.0], [4.0, 5.5, 6.0]]))
+
+
+class Results(unittest.TestCase):
+    def test_store(self):
+        ids, cases = np.array([5, 2, 9]), np.array([1, 2])
+        dz = np.arange(6.0).reshape((3, 2))
+        with tempfile.TemporaryDirectory() as directory:
+            fileio.results_init(directory, 'linear static')
+            fileio.results_write(directory, 'nodal displacements', ids, {'dZ': dz, 'dFi': -dz}, cases, 'nID', 'mode')
+            fileio.results_write(directory, 'eigenvalues', cases, {'lambda': np.array([4.0, 9.0])}, id_name='mode')
+            everything = fileio.results_read(directory, 'nodal displacements')
+            self.assertIsInstance(everything['dZ'], np.memmap)
+            self.assertTrue(np.array_equal(everything['dFi'], -dz.T))
+            part = fileio.results_read(directory, 'nodal displacements', ['dZ'], ids=[9, 5], cases=[2])
+            self.assertTrue(np.array_equal(part['dZ'], [[5.0, 1.0]]))
+            self.assertNotIn('dFi', part)
+            self.assertTrue(np.array_equal(fileio.results_read(directory, 'eigenvalues', ids=[2])['lambda'], [9.0]))
+            with self.assertRaises(ValueError):
+                fileio.results_read(directory, 'nodal displacements', ids=[3])
+            # a new analysis removes previous result sets
+            fileio.results_init(directory, 'eigenvalues')
+            self.assertEqual(os.listdir(directory), ['manifest.json'])
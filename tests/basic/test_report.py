@@ -0,0 +1,41 @@
+import unittest
+import os
+import tempfile
+import logging
+import numpy as np
+
+from basic import report
+
+
+class Report(unittest.TestCase):
+    def test_logging_array(self):
+        arr = np.arange(200.0).reshape((100, 2))
+        with tempfile.TemporaryDirectory() as directory:
+            report.REPORT_FILE = os.path.join(directory, 'report.txt')
+            try:
+                with self.assertLogs(level=logging.INFO) as log:
+                    report.logging_array('Table', arr, ['#', 'a', 'b'])
+                with open(report.REPORT_FILE, 'r') as f:
+                    text = f.read()
+            finally:
+                report.REPORT_FILE = None
+        # log is capped to head and tail with summary, report is complete
+        self.assertIn(f'{100 - report.LOG_ROWS:n} rows omitted', log.output[0])
+        self.assertIn('max', log.output[0])
+        self.assertIn('       199.00000', text)
+        self.assertNotIn('omitted', text)
+        # disabled level is not formatted at all
+        with self.assertNoLogs(level=logging.INFO):
+            report.logging_array('Table', arr, ['#', 'a', 'b'], level=logging.DEBUG)
+
+    def test_format_array(self):
+        values = np.random.default_rng(0).standard_normal(1000) * 10.0 ** np.linspace(-15.0, 15.0, 1000)
+        values[:6] = [0.0, -0.0, 0.5, -999.9996, np.nan, np.inf]
+        with self.assertLogs(level=logging.ERROR):
+            for spec in [' {0:9.3f}E{1:+03n}', ' {0:8.3f}E{1:+03n}']:
+                expected = [report.format_eng(v, spec) for v in values]
+                self.assertEqual(report.format_eng_array(values, spec).tolist(), expected)
+        expected = [report.format_norm(v, ' {0:16.5f}') for v in values]
+        self.assertEqual(report.format_norm_array(values, ' {0:16.5f}').tolist(), expected)
+        self.assertEqual(report.format_norm_array(np.array([-12, 5]), '  {0:8n}').tolist(),
+                         ['       -12', '         5'])
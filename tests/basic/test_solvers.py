@@ -0,0 +1,182 @@
+import os
+import time
+import numpy as np
+import scipy.linalg
+
+from basic import beam2d, solvers, eigen
+from tests.basic.fixtures import FrameTestCase
+
+
+class Assembly(FrameTestCase):
+    def test_sparse_dense(self):
+        Kd = solvers.assemble_global(self.lme, self.ke, self.ndofs, 'dense')
+        self.assertTrue(np.allclose(Kd, self.K.toarray()))
+
+
+class LinearStatic(FrameTestCase):
+    def test_factorization(self):
+        ndofs, ncdofs = self.ndofs, self.ncdofs
+        K = self.K
+        f = np.random.default_rng(2).random((ndofs, 3))
+        u, factor = solvers.linear_static(K, f, ncdofs)
+        ud, factor_dense = solvers.linear_static(K.toarray(), f, ncdofs)
+        self.assertTrue(np.allclose(u, ud))
+        self.assertTrue(np.allclose(K[ncdofs:, ncdofs:] @ factor.solve(f[ncdofs:, 0]), f[ncdofs:, 0]))
+
+    def test_skyline(self):
+        ndofs, ncdofs, lme, ke = self.ndofs, self.ncdofs, self.lme, self.ke
+        K = self.K
+        Ks = solvers.SkylineMatrix.from_elements(lme, ke, ndofs, ncdofs)
+        self.assertTrue(np.allclose(Ks.toarray(), K[ncdofs:, ncdofs:].toarray()))
+        f = np.random.default_rng(3).random((ndofs, 2))
+        u, factor = solvers.linear_static(K, f, ncdofs)
+        us, factor = solvers.linear_static(Ks, f, ncdofs)
+        self.assertTrue(np.allclose(u, us))
+        # global code numbers are rejected
+        with self.assertRaises(ValueError):
+            solvers.SkylineMatrix.from_elements(lme, ke, ndofs, ncdofs).add(lme, ke)
+
+    def test_skyline_timing(self):
+        # 60 x 60 grid frame clamped at the bottom, 10620 free DOFs
+        k = 60
+        xs, zs = np.meshgrid(np.arange(k, dtype=float), np.arange(k, dtype=float))
+        nd = np.column_stack((xs.ravel(), zs.ravel()))
+        nID = np.arange(k * k).reshape(k, k) + 1
+        pairs = np.vstack((np.column_stack((nID[:, :-1].ravel(), nID[:, 1:].ravel())),
+                           np.column_stack((nID[:-1, :].ravel(), nID[1:, :].ravel()))))
+        el = np.zeros((pairs.shape[0], 10), dtype=int)
+        el[:, 0] = np.arange(pairs.shape[0]) + 1
+        el[:, 1] = 1
+        el[:, 2:4] = pairs
+        cs = np.column_stack((nID[0], np.ones((k, 3), dtype=int)))
+        ndofs, ncdofs, lmn, lme, lmd = beam2d.localisation_matrix(nd, el, cs, 'rcm')
+        ne = el.shape[0]
+        ke = beam2d.beam2d_stiffness_batch(nd[el[:, 2] - 1], nd[el[:, 3] - 1], np.full(ne, 1.0E-2),
+                                           np.full(ne, 1.0E-5), np.full(ne, 2.1E11))
+        K = solvers.assemble_global(lme, ke, ndofs, 'sparse')[ncdofs:, ncdofs:]
+        f = np.random.default_rng(8).random((ndofs - ncdofs, 2))
+        Ks = solvers.SkylineMatrix.from_elements(lme, ke, ndofs, ncdofs)
+        start = time.perf_counter()
+        u = Ks.factorize().solve(f)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        self.assertTrue(np.allclose(u, solvers.Factorization(K).solve(f)))
+
+    def test_frontal(self):
+        ndofs, ncdofs, lme, ke = self.ndofs, self.ncdofs, self.lme, self.ke
+        K = self.K
+        Kf = solvers.FrontalSolver(lme, ke, ndofs, ncdofs, solvers.element_order(lme, ndofs, ncdofs))
+        f = np.random.default_rng(4).random((ndofs, 2))
+        u, factor = solvers.linear_static(K, f, ncdofs)
+        uf, factor = solvers.linear_static(Kf, f, ncdofs)
+        self.assertTrue(np.allclose(u, uf))
+        Kf.close()
+        # element matrices generated chunk by chunk in front order
+        order = solvers.element_order(lme, ndofs, ncdofs)
+        with solvers.FrontalSolver(lme, lambda index: ke[index], ndofs, ncdofs, order, chunk=3) as Kf:
+            uf, factor = solvers.linear_static(Kf, f, ncdofs)
+            self.assertTrue(np.allclose(u, uf))
+            file = Kf.file
+        self.assertFalse(os.path.exists(file + '.val'))
+        # failed construction does not fail again on garbage collection
+        with self.assertRaises(IndexError):
+            solvers.FrontalSolver(lme, ke, ndofs, ncdofs, [lme.shape[0]])
+
+    def test_pcg(self):
+        K = self.Kr
+        f = np.random.default_rng(5).random(self.ndofs - self.ncdofs)
+        u = solvers.Factorization(K).solve(f)
+        lmd = self.lmd[self.ncdofs:]
+        for method in ['jacobi', 'ic0', 'amg']:
+            x, history = solvers.pcg(K, f, solvers.preconditioner(K, method, lmd, self.nd), tol=1.0E-10)
+            self.assertLess(history[-1], 1.0E-10)
+            self.assertTrue(np.allclose(u, x), msg=method)
+
+    def test_matrix_free(self):
+        ndofs, ncdofs, lme, ke = self.ndofs, self.ncdofs, self.lme, self.ke
+        K = self.Kr
+        Kop = solvers.ElementOperator(lme, lambda: ke, ndofs, ncdofs)
+        x = np.random.default_rng(6).random((ndofs - ncdofs, 2))
+        self.assertTrue(np.allclose(K @ x, Kop @ x))
+        self.assertTrue(np.allclose(K @ x[:, 0], Kop @ x[:, 0]))
+        self.assertTrue(np.allclose(K.diagonal(), Kop.diagonal()))
+
+    def test_renumber(self):
+        ndofs, ncdofs, lmn, lme, lmd = self.ndofs, self.ncdofs, self.lmn, self.lme, self.lmd
+        ndofs, ncdofs, lmn_r, lme_r, lmd_r = beam2d.localisation_matrix(self.nd, self.el, self.cs, 'rcm')
+        self.assertLessEqual(solvers.bandwidth_profile(lme_r, ndofs, ncdofs)[1],
+                             solvers.bandwidth_profile(lme, ndofs, ncdofs)[1])
+        # same node DOF is mapped to the same node and direction
+        self.assertTrue(np.all(lmd_r[lmn_r - 1] == lmd[lmn - 1]))
+
+    def test_reanalysis(self):
+        ndofs, ncdofs, lme, ke = self.ndofs, self.ncdofs, self.lme, self.ke
+        K = self.K
+        f = np.random.default_rng(7).random((ndofs, 2))
+        u, factor = solvers.linear_static(K, f, ncdofs)
+        eID = np.array([1, 3])
+        dke = 0.5 * ke[eID - 1]
+        ke = ke.copy()
+        ke[eID - 1] += dke
+        ur, factor_r = solvers.linear_static(solvers.assemble_global(lme, ke, ndofs, 'sparse'), f, ncdofs)
+        for method in ['woodbury', 'pcg']:
+            uw, Kw, factor_w = solvers.reanalysis(K, factor, u, f, ncdofs, lme, eID, dke, method)
+            self.assertTrue(np.allclose(ur, uw), msg=method)
+        # rank over limit falls back to refactoring
+        uw, Kw, factor_w = solvers.reanalysis(K, factor, u, f, ncdofs, lme, eID, dke, max_rank=1)
+        self.assertIsInstance(factor_w, solvers.Factorization)
+        self.assertTrue(np.allclose(ur, uw))
+
+
+class Sensitivity(FrameTestCase):
+    def setUp(self):
+        nd, el, mt, pt, lmn = self.nd, self.el, self.mt, self.pt, self.lmn
+        self.x1, self.x2 = nd[el[:, 2] - 1], nd[el[:, 3] - 1]
+        self.A, self.I = pt[el[:, 1] - 1, 0], pt[el[:, 1] - 1, 1]
+        self.ro, self.E = mt[el[:, 0] - 1, 0], mt[el[:, 0] - 1, 1]
+        self.dke = beam2d.beam2d_stiffness_derivative_batch(self.x1, self.x2, self.E)
+        self.f = np.zeros((self.ndofs, 1))
+        self.f[lmn[3] - 1, 0] = [1000.0, -500.0, 0.0]
+        self.G = np.zeros((self.ndofs, 1))
+        self.G[lmn[5, 0] - 1, 0] = 1.0
+
+    def matrices(self, A, I):
+        K = solvers.assemble_global(self.lme, beam2d.beam2d_stiffness_batch(self.x1, self.x2, A, I, self.E), self.ndofs)
+        M = solvers.assemble_global(self.lme, beam2d.beam2d_mass_batch(self.x1, self.x2, A, self.ro), self.ndofs)
+        return K, M
+
+    def test_static(self):
+        K, M = self.matrices(self.A, self.I)
+        u, factor = solvers.linear_static(K, self.f, self.ncdofs)
+        ds = solvers.static_sensitivity(K, factor, u, self.ncdofs, self.lme, self.dke, G=self.G)
+        dc = solvers.static_sensitivity(K, factor, u, self.ncdofs, self.lme, self.dke)
+        # central differences of second element
+        for k, p in enumerate([self.A, self.I]):
+            h = 1.0E-4 * p[1]
+            value = []
+            for sign in [1.0, -1.0]:
+                q = p.copy()
+                q[1] += sign * h
+                uh = solvers.linear_static(self.matrices(*((q, self.I) if k == 0 else (self.A, q)))[0], self.f,
+                                          self.ncdofs)[0]
+                value.append([(self.G.T @ uh)[0, 0], (self.f.T @ uh)[0, 0]])
+            fd = (np.array(value[0]) - np.array(value[1])) / (2.0 * h)
+            self.assertTrue(np.allclose([ds[k, 1, 0, 0], dc[k, 1, 0]], fd, rtol=1.0E-6))
+
+    def test_frequency(self):
+        K, M = self.matrices(self.A, self.I)
+        n = self.ncdofs
+        eigenvalue, x = scipy.linalg.eigh(K[n:, n:].toarray(), M[n:, n:].toarray(), subset_by_index=[0, 2])
+        phi = np.zeros((self.ndofs, 3))
+        phi[n:] = x
+        domega = eigen.frequency_sensitivity(eigenvalue, phi, self.lme, self.dke,
+                                              beam2d.beam2d_mass_derivative_batch(self.x1, self.x2, self.ro))
+        for k, p in enumerate([self.A, self.I]):
+            h = 1.0E-4 * p[1]
+            omega = []
+            for sign in [1.0, -1.0]:
+                q = p.copy()
+                q[1] += sign * h
+                Kh, Mh = self.matrices(*((q, self.I) if k == 0 else (self.A, q)))
+                omega.append(np.sqrt(scipy.linalg.eigh(Kh[n:, n:].toarray(), Mh[n:, n:].toarray(),
+                                                       eigvals_only=True, subset_by_index=[0, 2])))
+            self.assertTrue(np.allclose(domega[k, 1], (omega[0] - omega[1]) / (2.0 * h), rtol=1.0E-5))